@@ -57,6 +57,16 @@ export type AxeReportCounts = {
 
 export type AxeReportKeys = 'violations' | 'passes' | 'inapplicable' | 'incomplete';
 
+export type TabOrder = {
+    count: number;
+    order: string[];
+    positive_tabindex: number;
+    traps: string[];
+    validated: number;
+    mismatches: number;
+    tabbable: boolean;
+};
+
 export type ReportMinimized = {
     id: number;
     url: string;
@@ -77,7 +87,9 @@ export type Report = {
     videos: string[];
     imgs: string[];
     tabable: boolean;
+    tab_order: TabOrder | null;
     tags: string[];
+    axe_version: string | null;
     script_token: string;
     created_at: string;
     updated_at: string;
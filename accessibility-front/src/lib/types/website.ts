@@ -19,6 +19,11 @@ export type Website = {
     domain_id: string;
     sites: number[];
     rate_limit: number;
+    min_concurrency: number | null;
+    max_concurrency: number | null;
+    incremental_rescan: boolean;
+    resource_policy: 'off' | 'balanced' | 'strict' | null;
+    scan_profile: 'full' | 'issues' | 'violations' | null;
     active: boolean;
 };
 
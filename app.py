@@ -8,6 +8,7 @@ from models import db
 from authentication.login import jwt
 from models.user import Profile, User
 from models.api_key import ApiKey
+from models.crawl import CrawlCheckpoint
 from mail import mail
 from werkzeug.security import generate_password_hash
 import os
@@ -0,0 +1,50 @@
+"""
+Micro-benchmark for the crawl frontier.
+
+Simulates a crawl where every page links to a handful of already-known pages
+plus one new page, and prints the average cost of add/get/task_done per URL
+at increasing frontier sizes. The per-operation cost should stay flat.
+
+    python -m benchmarks.bench_frontier
+"""
+import asyncio
+import time
+
+from scanner.utils.queue import CrawlFrontier
+
+SIZES = [1_000, 10_000, 50_000, 100_000]
+LINKS_PER_PAGE = 20
+
+
+async def crawl(size: int) -> float:
+    frontier = CrawlFrontier()
+    frontier.add("https://example.com/0")
+    next_page = 1
+    operations = 0
+
+    start = time.perf_counter()
+    while frontier.queued:
+        url = await frontier.get()
+        # mostly links the crawl has already seen, like a shared site navigation
+        links = [f"https://example.com/{(next_page + i) % max(next_page, 1)}" for i in range(LINKS_PER_PAGE - 1)]
+        if next_page < size:
+            links.append(f"https://example.com/{next_page}")
+            next_page += 1
+        frontier.add_many(links)
+        frontier.task_done(url)
+        operations += len(links) + 2
+    elapsed = time.perf_counter() - start
+
+    assert frontier.done == size
+    return elapsed / operations
+
+
+def main():
+    print(f"{'urls':>10} {'ns/op':>10}")
+    for size in SIZES:
+        per_op = asyncio.run(crawl(size))
+        print(f"{size:>10} {per_op * 1e9:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
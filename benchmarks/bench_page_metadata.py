@@ -0,0 +1,88 @@
+"""
+Benchmark for page metadata extraction on link-heavy pages.
+
+Serves fixture pages with thousands of links (half of them repeats, as site
+navigation and footers produce, some with query strings) plus images and
+videos, and compares the five separate evaluate calls generate_report used to
+make with the one-shot PAGE_METADATA_JS. Needs Playwright's Chromium.
+
+    python -m benchmarks.bench_page_metadata
+"""
+import asyncio
+import time
+
+from playwright.async_api import async_playwright
+
+from scanner.browser.parse import get_page_metadata
+
+ORIGIN = "https://example.com"
+SIZES = [500, 5_000, 20_000]
+ROUNDS = 5
+
+# The extraction as it was before the one-shot script, for comparison
+_LEGACY_LINKS_JS = """(website) => {
+    var aTags = Array.from(document.querySelectorAll('a'));
+    var links = aTags.filter(a => a.href.startsWith(website) || a.href.startsWith('/')).map(a => a.href).filter(a => !a.includes('#')).filter(a => !(a == website || a == website + '/')).filter((value, index, self) => self.indexOf(value) === index);
+    return links.map(l => l.trim().split('?')[0]).filter(l => !/(.png|.jpg|.jpeg|.gif|.svg|.zip|.mp4|.webm|.pdf|.doc|.docx|.xls|.xlsx|.pptx|.ppt|.yaml|.yml)$/.test(l));
+}"""
+_LEGACY_VIDEOS_JS = "() => Array.from(document.querySelectorAll('video')).map(v => v.src || v.currentSrc).filter((value, index, self) => self.indexOf(value) === index)"
+_LEGACY_IMGS_JS = "() => Array.from(document.querySelectorAll('img')).map(img => img.src).filter((value, index, self) => self.indexOf(value) === index)"
+
+
+def fixture(links: int) -> str:
+    anchors = []
+    for i in range(links):
+        page = i % (links // 2)
+        suffix = f"?ref={i}" if i % 7 == 0 else ""
+        anchors.append(f'<a href="/page/{page}{suffix}">Page {page}</a>')
+    media = "".join(f'<img src="/img/{i % 50}.png" alt="">' for i in range(200))
+    media += "".join(f'<video src="/video/{i}.mp4"></video>' for i in range(5))
+    return f"<html><body><nav>{''.join(anchors)}</nav>{media}<a href='/report.pdf'>PDF</a></body></html>"
+
+
+async def legacy(page) -> int:
+    links = await page.evaluate(_LEGACY_LINKS_JS, ORIGIN)
+    await page.evaluate(_LEGACY_VIDEOS_JS)
+    await page.evaluate(_LEGACY_IMGS_JS)
+    await page.evaluate("() => { return !!document.querySelector('video'); }")
+    await page.evaluate("() => { return !!document.querySelector('img'); }")
+    return len(links)
+
+
+async def one_shot(page) -> int:
+    return len((await get_page_metadata(page))['links'])
+
+
+async def measure(page, extract) -> tuple[float, int]:
+    found = await extract(page)
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        await extract(page)
+    return (time.perf_counter() - start) / ROUNDS, found
+
+
+async def main():
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+        page = await browser.new_page()
+        print(f"{'links':>8} {'legacy ms':>10} {'one-shot ms':>12} {'legacy links':>13} {'one-shot links':>15}")
+        for size in SIZES:
+            html = fixture(size)
+
+            async def serve(route, html=html):
+                if route.request.resource_type == 'document':
+                    await route.fulfill(status=200, content_type='text/html', body=html)
+                else:
+                    await route.abort()
+
+            await page.unroute("**/*")
+            await page.route("**/*", serve)
+            await page.goto(ORIGIN + "/")
+            legacy_time, legacy_links = await measure(page, legacy)
+            one_shot_time, one_shot_links = await measure(page, one_shot)
+            print(f"{size:>8} {legacy_time * 1000:>10.1f} {one_shot_time * 1000:>12.1f} {legacy_links:>13} {one_shot_links:>15}")
+        await browser.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
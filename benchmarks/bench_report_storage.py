@@ -0,0 +1,100 @@
+"""
+Benchmark for the compressed report columns.
+
+Builds axe reports of increasing size, shaped like real results (many nodes
+with similar HTML snippets and failure summaries), and prints for plain JSON
+and each zlib level:
+
+- the stored size of the report
+- the cost of writing it (serialize and compress)
+- the cost of reading it back from a SQLite table with the column type the
+  model uses, plain JSON or CompressedJSON
+
+    python -m benchmarks.bench_report_storage
+"""
+import json
+import time
+
+from sqlalchemy import JSON, Column, Integer, LargeBinary, MetaData, Table, create_engine, insert, select
+
+from models.types import CompressedJSON, compress_json
+
+NODES = [10, 100, 1_000]
+LEVELS = [1, 6, 9]
+ROWS = 50
+RULES = ["color-contrast", "image-alt", "link-name", "label", "region", "heading-order"]
+
+
+def make_report(nodes: int) -> dict:
+    def result(rule: str, count: int) -> dict:
+        return {
+            "id": rule,
+            "impact": "serious",
+            "description": f"Ensures {rule} is correct",
+            "help": f"Elements must have {rule}",
+            "helpUrl": f"https://dequeuniversity.com/rules/axe/4.9/{rule}",
+            "tags": ["wcag2a", "wcag2aa", "cat.color"],
+            "nodes": [
+                {
+                    "html": f'<a class="nav-link" href="/section/{i}">Section {i}</a>',
+                    "target": [f"li:nth-child({i}) > .nav-link"],
+                    "failureSummary": "Fix any of the following:\n  Element has insufficient color contrast of 3.2",
+                    "any": [{"id": rule, "impact": "serious", "message": "Contrast is too low", "data": {"fgColor": "#777777", "bgColor": "#ffffff"}}],
+                    "all": [],
+                    "none": [],
+                }
+                for i in range(count)
+            ],
+        }
+
+    per_rule = max(nodes // len(RULES), 1)
+    return {
+        "violations": [result(rule, per_rule) for rule in RULES],
+        "passes": [result(rule, per_rule) for rule in RULES],
+        "incomplete": [],
+        "inapplicable": [],
+    }
+
+
+def read_time(column_type, stored: bytes, report: dict) -> float:
+    """Seconds to load one report from a table of ROWS of them, stored as the given bytes."""
+    engine = create_engine("sqlite://")
+    raw = Table("report", MetaData(), Column("id", Integer, primary_key=True), Column("report", LargeBinary))
+    table = Table("report", MetaData(), Column("id", Integer, primary_key=True), Column("report", column_type))
+    raw.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(raw), [{"report": stored} for _ in range(ROWS)])
+
+    with engine.connect() as conn:
+        start = time.perf_counter()
+        rows = conn.execute(select(table.c.report)).all()
+        elapsed = time.perf_counter() - start
+    assert rows[0].report == report
+    return elapsed / ROWS
+
+
+def write_time(encode, report: dict) -> float:
+    start = time.perf_counter()
+    for _ in range(ROWS):
+        encode(report)
+    return (time.perf_counter() - start) / ROWS
+
+
+def main():
+    print(f"{'nodes':>7} {'format':>8} {'bytes':>10} {'ratio':>7} {'write ms':>9} {'read ms':>8}")
+    for nodes in NODES:
+        report = make_report(nodes)
+        stored = json.dumps(report).encode()
+        plain = len(stored)
+        print(f"{nodes:>7} {'json':>8} {plain:>10} {1:>7.1f} "
+              f"{write_time(json.dumps, report) * 1e3:>9.2f} {read_time(JSON, stored, report) * 1e3:>8.2f}")
+        for level in LEVELS:
+            stored = compress_json(report, level)
+            write = write_time(lambda value: compress_json(value, level), report)
+            read = read_time(CompressedJSON(), stored, report)
+            print(f"{nodes:>7} {'zlib-' + str(level):>8} {len(stored):>10} {plain / len(stored):>7.1f} "
+                  f"{write * 1e3:>9.2f} {read * 1e3:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
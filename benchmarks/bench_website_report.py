@@ -0,0 +1,178 @@
+"""
+Benchmark for merging the page reports of a website (Website.get_report).
+
+Builds a synthetic website of PAGES pages in a throwaway SQLite database, each
+page with one stored report of a few dozen violated, passed and incomplete
+rules drawn from a pool shaped like axe's, then compares:
+
+- legacy: the merge as it was before, one query per page and a linear search
+  of the merged rules for every rule of every page
+- single-pass: Website.get_report, one streamed query and a dictionary keyed
+  by rule
+
+and prints the time and number of SQL statements of each. The reports are
+stored through the ingest path, building the website takes a few minutes.
+
+    python -m benchmarks.bench_website_report [pages]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+# Must be set before importing app/config/models.
+_DB_FILE = os.path.join(tempfile.gettempdir(), "a11y_bench_website_report.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_FILE}"
+os.environ.setdefault("TESTING", "True")
+
+from sqlalchemy import event  # noqa: E402
+
+from app import create_app  # noqa: E402
+from models import db  # noqa: E402
+from models.report import Report  # noqa: E402
+from models.settings import Settings  # noqa: E402
+from models.user import Profile, User  # noqa: E402
+from models.website import Domain, Site, Website  # noqa: E402
+
+PAGES = 5_000
+RULES = 90
+IMPACTS = ["critical", "serious", "moderate", "minor", None]
+ROUNDS = 3
+
+
+def make_rule(rule: int, page: int, nodes: int) -> dict:
+    return {
+        "id": f"rule-{rule}",
+        "impact": IMPACTS[rule % len(IMPACTS)],
+        "description": f"Ensures rule {rule} is followed",
+        "help": f"Elements must follow rule {rule}",
+        "helpUrl": f"https://dequeuniversity.com/rules/axe/4.9/rule-{rule}",
+        "tags": ["wcag2a", "wcag2aa"],
+        "nodes": [
+            {"html": f"<div id='p{page}-{i}'></div>", "target": [f"#p{page}-{i}"], "failureSummary": "Fix it"}
+            for i in range(nodes)
+        ],
+    }
+
+
+def make_report(page: int, url: str, rng: random.Random) -> dict:
+    rules = rng.sample(range(RULES), 60)
+    return {
+        "url": url,
+        "base_url": "https://example.com",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "axe_version": "4.9.0",
+        "report": {
+            "violations": [make_rule(rule, page, rng.randint(1, 5)) for rule in rules[:20]],
+            "passes": [make_rule(rule, page, 1) for rule in rules[20:50]],
+            "incomplete": [make_rule(rule, page, 1) for rule in rules[50:]],
+            "inapplicable": [],
+        },
+        "links": [],
+        "videos": [],
+        "imgs": [],
+        "tabable": True,
+        "photo": None,
+        "tags": ["wcag2a"],
+    }
+
+
+def build_website(pages: int) -> int:
+    db.drop_all()
+    db.create_all()
+    Settings.init_defaults()
+    user = User(username="bench", email="bench@rutgers.edu")
+    user.profile = Profile(user=user, is_admin=True)
+    db.session.add_all([user, Domain(domain="example.com")])
+    db.session.commit()
+    website = Website(url="https://example.com", user_id=user.id)
+    db.session.add(website)
+    db.session.commit()
+
+    rng = random.Random(0)
+    urls = [f"https://example.com/page/{page}" for page in range(pages)]
+    sites = Site.get_or_create_many(urls, website)
+    for page, url in enumerate(urls):
+        site = sites[url]
+        site.record_report(Report(make_report(page, url, rng), site.id))
+        # rules added by the open transaction aren't cached, commit early and often
+        if page % 100 == 0:
+            db.session.commit()
+    db.session.commit()
+    return website.id
+
+
+def legacy_report(website: Website) -> dict:
+    """Website.get_report as it was before the single-pass merge."""
+    report = {}
+    for site in website.sites:
+        current_report = site.get_full_current_report()
+        if current_report:
+            for key in ["violations", "passes", "incomplete", "inapplicable"]:
+                if key not in report:
+                    report[key] = []
+                for rule in current_report.report.get(key, []):
+                    existing_rule = next((r for r in report[key] if r.get('id') == rule.get('id')), None)
+                    site_report = {
+                        'url': site.url,
+                        'timestamp': current_report.report.get('timestamp'),
+                        'report_id': current_report.id
+                    }
+                    if existing_rule:
+                        existing_rule['reports'].append(site_report)
+                    else:
+                        new_rule = rule.copy()
+                        new_rule['reports'] = [site_report]
+                        report[key].append(new_rule)
+    for key in report:
+        report[key].sort(key=lambda x: x.get('impact') or 'none')
+    return report
+
+
+def measure(merge, website_id: int) -> tuple[float, int, dict]:
+    """Best time of ROUNDS merges from an empty session, and the statements of one."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    best = float("inf")
+    for _ in range(ROUNDS):
+        db.session.remove()
+        website = db.session.get(Website, website_id)
+        statements.clear()
+        event.listen(db.engine, "before_cursor_execute", capture)
+        try:
+            start = time.perf_counter()
+            report = merge(website)
+            best = min(best, time.perf_counter() - start)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", capture)
+    return best, len(statements), report
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else PAGES
+    app = create_app()
+    with app.app_context():
+        start = time.perf_counter()
+        website_id = build_website(pages)
+        print(f"built {pages} pages in {time.perf_counter() - start:.1f}s")
+
+        print(f"{'merge':>12} {'seconds':>9} {'queries':>8}")
+        reports = {}
+        for name, merge in [("legacy", legacy_report), ("single-pass", Website.get_report)]:
+            elapsed, queries, reports[name] = measure(merge, website_id)
+            print(f"{name:>12} {elapsed:>9.2f} {queries:>8}")
+
+        # same rules, listed on the same pages
+        for key, rules in reports["legacy"].items():
+            merged = {rule["id"]: len(rule["reports"]) for rule in reports["single-pass"][key]}
+            assert merged == {rule["id"]: len(rule["reports"]) for rule in rules}, key
+    os.remove(_DB_FILE)
+
+
+if __name__ == "__main__":
+    main()
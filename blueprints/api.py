@@ -148,7 +148,7 @@ def get_report(report_id):
       404:
         description: Report not found.
     """
-    return _serve_report(db.session.get(Report, report_id))
+    return _serve_report(db.session.get(Report, report_id, options=Report.loading('content', 'links')))
 
 
 @api_bp.route('/reports/latest', methods=['GET'])
@@ -192,6 +192,7 @@ def get_latest_report_by_url():
         return jsonify({'error': 'url query parameter is required'}), 400
     report = (
         db.session.query(Report)
+        .options(*Report.loading('content', 'links'))
         .filter(Report.url == url)
         .order_by(Report.timestamp.desc())
         .first()
@@ -330,15 +331,16 @@ def get_latest_report_by_website(website_id):
     if not website.can_view(g.api_user):
         return jsonify({'error': 'Unauthorized'}), 403
 
-    reports = []
-    for site in website.sites:
-        report = site.get_full_current_report()
-        if report:
-            reports.append(report)
+    reports = (
+        db.session.query(Report)
+        .options(*Report.loading('content', 'links'))
+        .filter(Report.id.in_(website.sites.filter(Site.latest_report_id.isnot(None)).with_entities(Site.latest_report_id)))
+        .order_by(Report.url)
+        .all()
+    )
     if not reports:
         return jsonify({'error': 'Report not found'}), 404
 
-    reports.sort(key=lambda r: r.url)
     return _render_report_list(website, reports)
 
 
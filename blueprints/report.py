@@ -1,14 +1,14 @@
 from flask import Blueprint, Response
 from flask import request, jsonify
 from flask_jwt_extended import jwt_required, current_user
-from sqlalchemy import func 
+from sqlalchemy import func, select
 from models.report import Report
+from models.report_violation import ReportViolation
 from models import db
-from PIL import Image
-import io
 
 from models.user import User
 from models.website import Site
+from utils.screenshots import load_photo
 from utils.style_generator import report_to_js
 from utils.jwt import decode_jwt_token
 
@@ -23,32 +23,48 @@ def get_reports():
     page = params.get('page', default=1, type=int)
     search = params.get('search', type=str)
     desc = params.get('desc', default=True, type=bool)
+    rule = params.get('rule', type=str)
+    impact = params.get('impact', type=str)
 
     order_by = Report.timestamp.desc() if desc else Report.timestamp.asc()
 
-    reports_q = db.session.query(Report).order_by(order_by, func.json_extract(Report.report_counts, '$.violations.total').desc())
+    reports_q = db.session.query(Report)
 
 
     if search:
         reports_q = reports_q.filter(Report.url.icontains(f"%{search}%"))
 
+    if rule or impact:
+        violated = select(ReportViolation.id).where(ReportViolation.report_id == Report.id)
+        if rule:
+            violated = violated.where(ReportViolation.rule_id == rule)
+        if impact:
+            violated = violated.where(ReportViolation.impact == impact)
+        reports_q = reports_q.filter(violated.exists())
+
     if not current_user:
         reports_q = reports_q.filter(Report.public)
 
     if current_user:
         reports_q = reports_q.filter(Report.can_view(current_user))
 
-    reports = reports_q.paginate(page=page, per_page=limit)
+    # counted on the filtered ids, paginate's own count would wrap every column of the report row
+    total = reports_q.with_entities(func.count(Report.id)).scalar()
+    reports = (
+        reports_q.options(*Report.loading('links'))
+        .order_by(order_by, Report.violations_total.desc())
+        .paginate(page=page, per_page=limit, count=False)
+    )
 
     return jsonify({
-        'count': reports.total,
+        'count': total,
         'items': [r.to_dict_without_report() for r in reports.items]
     }), 200
 
 @report_bp.route('/<int:report_id>/', methods=['GET'])
 @jwt_required(optional=True)
 def get_report_by_id(report_id):
-    report = db.session.get(Report, report_id)  
+    report = db.session.get(Report, report_id, options=Report.loading('content', 'links'))
     if not report:
         return jsonify({'error': 'Report not found'}), 404
     
@@ -64,7 +80,7 @@ def get_report_by_id(report_id):
 @report_bp.route('/<int:report_id>/pdf/', methods=['GET'])
 @jwt_required(optional=True)
 def get_report_pdf(report_id):
-    report = db.session.get(Report, report_id)  
+    report = db.session.get(Report, report_id, options=Report.loading('content', 'links'))
     if not report:
         return jsonify({'error': 'Report not found'}), 404
 
@@ -97,7 +113,7 @@ def get_report_script(token):
     if payload.get('error') or payload.get('scope') != 'report-script':
         return jsonify({'error': 'Invalid token'}), 401
 
-    report = db.session.get(Report, payload.get('report_id'))
+    report = db.session.get(Report, payload.get('report_id'), options=Report.loading('content'))
     if not report:
         return jsonify({'error': 'Report not found'}), 404
 
@@ -120,10 +136,13 @@ def get_report_photo(report_id):
     if not report.can_view(current_user):
         return jsonify({'error': 'Unauthorized'}), 403
 
-    image = Image.open(io.BytesIO(report.photo))
-
-    img_byte_arr = io.BytesIO()
-    image.save(img_byte_arr, format='PNG')
-    img_byte_arr.seek(0)
+    photo = load_photo(report)
+    if photo is None:
+        return jsonify({'error': 'Photo not found'}), 404
 
-    return Response(img_byte_arr, mimetype='image/png')
+    data, mimetype = photo
+    response = Response(data, mimetype=mimetype)
+    if report.photo_key:
+        # content-addressed, the bytes behind a key never change
+        response.headers['Cache-Control'] = 'private, max-age=31536000, immutable'
+    return response
@@ -4,13 +4,17 @@ from flask_jwt_extended import jwt_required, current_user
 from authentication.login import  admin_required
 from mail.emails import AdminNewWebsiteEmail, NewWebsiteEmail, ScanFinishedEmail
 from models.report import  Report
+from models.report_violation import ReportViolation
 from models.settings import Settings
 from models.user import Profile, User
 from models.website import Domain, Site, Site_Website_Assoc, Website 
 from models import db
-from sqlalchemy import case, func
+from sqlalchemy import case, func, select
 from flask_sqlalchemy import pagination
+from sqlalchemy.orm import joinedload
 
+from scanner.accessibility.ace import SCAN_PROFILES
+from scanner.browser.resources import POLICIES
 from scanner.utils.service import check_url
 from utils.urls import get_netloc, is_valid_url
 website_bp = Blueprint('website', __name__,  url_prefix="/websites")
@@ -187,6 +191,18 @@ def update_website(website_id):
                             type: string
                     rate_limit:
                         type: integer
+                    min_concurrency:
+                        type: integer
+                    max_concurrency:
+                        type: integer
+                    incremental_rescan:
+                        type: boolean
+                    resource_policy:
+                        type: string
+                        enum: [off, balanced, strict]
+                    scan_profile:
+                        type: string
+                        enum: [full, issues, violations]
                     hard_limit:
                         type: integer
                     email:
@@ -269,6 +285,25 @@ def update_website(website_id):
             website.rate_limit = data['rate_limit'] 
         if 'should_email' in data:
             website.should_email = data['should_email'] and True
+        # validate both limits before touching the website, a rejected value must not reach the session
+        limits = {key: data.get(key, getattr(website, key)) for key in ('min_concurrency', 'max_concurrency')}
+        for key, value in limits.items():
+            if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < 1):
+                return jsonify({'error': f'{key} must be a positive integer or null'}), 400
+        if limits['min_concurrency'] and limits['max_concurrency'] and limits['min_concurrency'] > limits['max_concurrency']:
+            return jsonify({'error': 'min_concurrency cannot be greater than max_concurrency'}), 400
+        for key, value in limits.items():
+            setattr(website, key, value)
+        if 'incremental_rescan' in data:
+            website.incremental_rescan = data['incremental_rescan'] and True
+        if 'resource_policy' in data:
+            if data['resource_policy'] is not None and data['resource_policy'] not in POLICIES:
+                return jsonify({'error': f"resource_policy must be one of {', '.join(POLICIES)} or null"}), 400
+            website.resource_policy = data['resource_policy']
+        if 'scan_profile' in data:
+            if data['scan_profile'] is not None and data['scan_profile'] not in SCAN_PROFILES:
+                return jsonify({'error': f"scan_profile must be one of {', '.join(SCAN_PROFILES)} or null"}), 400
+            website.scan_profile = data['scan_profile']
         if 'active' in data:
             domain = db.session.get(Domain, website.domain_id)
             # scanner can add websites without a domain. this is because if a manual scan was made its not obvious what the parent domain might be.
@@ -499,11 +534,12 @@ def get_websites():
         # make sure that non-admin users can only see public websites
         w_query = w_query.filter(Website.public == True)
 
+    # the counts of every listed website come with the page, the rows are updated in SQL
+    w_query = w_query.options(joinedload(Website.counts)).populate_existing()
 
 
-    if format == 'csv':
-        from sqlalchemy.orm import joinedload
 
+    if format == 'csv':
         w: pagination.Pagination[Website] = w_query.options(joinedload(Website.admin),joinedload(Website.users) ).paginate(page=page, per_page=limit)
         items: list[Website] = w.items
 
@@ -586,6 +622,16 @@ def get_website_sites(website_id):
             type: integer
             required: false
             default: 1
+        - in: query
+            name: rule
+            type: string
+            required: false
+            description: Only pages whose latest report violates this axe rule
+        - in: query
+            name: impact
+            type: string
+            required: false
+            description: Only pages whose latest report has a violation of this impact
     responses:
         200:
             description: List of sites for website
@@ -616,6 +662,8 @@ def get_website_sites(website_id):
     params = request.args
     limit = params.get('limit', default=10, type=int)
     page = params.get('page', default=1, type=int)
+    rule = params.get('rule', type=str)
+    impact = params.get('impact', type=str)
 
     website = db.session.get(Website, website_id)
     if not website:
@@ -630,28 +678,23 @@ def get_website_sites(website_id):
         if not website.public:
             return jsonify({'error': 'Unauthorized'}), 403
 
-    latest_report_subq = (
-        db.session.query(
-            Report.site_id,
-            func.max(Report.timestamp).label('max_timestamp')
-        )
-        .group_by(Report.site_id)
-        .subquery()
-    )
     site_subq = (
         db.session.query(Site.id).join(Site_Website_Assoc, Site_Website_Assoc.c.site_id == Site.id).filter(Site_Website_Assoc.c.website_id == website_id).subquery()
     )
-    # Join sites to their most recent report and order by violations
+    # Sites with a report, ordered by the violations of their most recent one
     sites_query = (
         db.session.query(Site).order_by(Site.url.asc()).where(Site.id.in_(site_subq.select()))
-        .join(Report, (Report.site_id == Site.id))
-        .join(
-            latest_report_subq,
-            (latest_report_subq.c.site_id == Report.site_id) &
-            (latest_report_subq.c.max_timestamp == Report.timestamp)
-        )
-        .order_by(func.json_extract(Report.report_counts, '$.violations.total').desc())
+        .filter(Site.latest_report_id.isnot(None))
+        .order_by(func.json_extract(Site.latest_report_counts, '$.violations.total').desc())
     )
+    if rule or impact:
+        # answered from the indexed violation rows of the latest reports
+        violated = select(ReportViolation.id).where(ReportViolation.report_id == Site.latest_report_id)
+        if rule:
+            violated = violated.where(ReportViolation.rule_id == rule)
+        if impact:
+            violated = violated.where(ReportViolation.impact == impact)
+        sites_query = sites_query.filter(violated.exists())
 
     sites = sites_query.paginate(page=page, per_page=limit)
 
@@ -37,3 +37,75 @@ MAIL_USE_TLS = os.environ.get("MAIL_USE_TLS", "True") == "True"
 CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "redis://localhost:6379/1")
 CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND", "redis://localhost:6379/1")
 
+# Number of long-lived Chromium instances each Celery worker process keeps open
+SCANNER_BROWSER_POOL_SIZE = int(os.environ.get("SCANNER_BROWSER_POOL_SIZE", 1))
+
+# Adaptive crawl concurrency, websites can override the min/max limits
+SCANNER_MIN_CONCURRENCY = int(os.environ.get("SCANNER_MIN_CONCURRENCY", 2))
+SCANNER_MAX_CONCURRENCY = int(os.environ.get("SCANNER_MAX_CONCURRENCY", 10))
+# Back off when page latency exceeds the fastest observed latency by this factor
+SCANNER_LATENCY_FACTOR = float(os.environ.get("SCANNER_LATENCY_FACTOR", 2.0))
+# Back off when more than this fraction of pages fail (429, 5xx, timeouts)
+SCANNER_MAX_ERROR_RATE = float(os.environ.get("SCANNER_MAX_ERROR_RATE", 0.2))
+# Back off when less than this fraction of host memory is available
+SCANNER_MIN_FREE_MEMORY = float(os.environ.get("SCANNER_MIN_FREE_MEMORY", 0.15))
+# Back off when more Chromium renderer processes than this are alive on the host
+SCANNER_MAX_RENDERERS = int(os.environ.get("SCANNER_MAX_RENDERERS", 40))
+
+# Politeness: token buckets shared through Redis by every worker, in requests per second
+SCANNER_REDIS_URL = os.environ.get("SCANNER_REDIS_URL", os.environ.get("CELERY_BROKER_URL", CELERY_BROKER_URL))
+SCANNER_HOST_RATE = float(os.environ.get("SCANNER_HOST_RATE", 5.0))
+SCANNER_HOST_BURST = float(os.environ.get("SCANNER_HOST_BURST", 10))
+SCANNER_DOMAIN_RATE = float(os.environ.get("SCANNER_DOMAIN_RATE", 20.0))
+SCANNER_DOMAIN_BURST = float(os.environ.get("SCANNER_DOMAIN_BURST", 40))
+
+# Crawl checkpoints, saved every N seconds and resumed when younger than the max age (hours)
+SCANNER_CHECKPOINT_INTERVAL = int(os.environ.get("SCANNER_CHECKPOINT_INTERVAL", 30))
+SCANNER_CHECKPOINT_MAX_AGE = int(os.environ.get("SCANNER_CHECKPOINT_MAX_AGE", 24))
+
+# Crawl mode: "local" crawls a website inside one task, "distributed" fans its pages out as Celery tasks
+SCANNER_CRAWL_MODE = os.environ.get("SCANNER_CRAWL_MODE", "local")
+# Pages scanned by each task in distributed mode
+SCANNER_PAGE_BATCH_SIZE = int(os.environ.get("SCANNER_PAGE_BATCH_SIZE", 5))
+# Seconds before the Redis state of an abandoned distributed crawl expires
+SCANNER_CRAWL_STATE_TTL = int(os.environ.get("SCANNER_CRAWL_STATE_TTL", 86400))
+
+# Most URLs a crawl is seeded with from sitemaps and the website's known pages
+SCANNER_SEED_LIMIT = int(os.environ.get("SCANNER_SEED_LIMIT", 10000))
+
+# Scan results are written in batches of up to N reports, or every N seconds
+SCANNER_WRITE_BATCH_SIZE = int(os.environ.get("SCANNER_WRITE_BATCH_SIZE", 20))
+SCANNER_WRITE_FLUSH_INTERVAL = float(os.environ.get("SCANNER_WRITE_FLUSH_INTERVAL", 2.0))
+
+# Browser contexts are reused across pages, recycled after N pages or when the page JS heap grows by N MB
+SCANNER_CONTEXT_MAX_PAGES = int(os.environ.get("SCANNER_CONTEXT_MAX_PAGES", 50))
+SCANNER_CONTEXT_MAX_HEAP_GROWTH = float(os.environ.get("SCANNER_CONTEXT_MAX_HEAP_GROWTH", 200))
+
+# Requests blocked during page loads ("off", "balanced" or "strict"), websites can opt in with their own
+SCANNER_RESOURCE_POLICY = os.environ.get("SCANNER_RESOURCE_POLICY", "off")
+
+# Detail axe collects per page ("full", "issues" or "violations"), websites can override it
+SCANNER_SCAN_PROFILE = os.environ.get("SCANNER_SCAN_PROFILE", "full")
+
+# Report screenshots: format ("webp" or "jpeg"), quality, page height cap in pixels and encoder threads
+SCREENSHOT_FORMAT = os.environ.get("SCREENSHOT_FORMAT", "webp")
+SCREENSHOT_QUALITY = int(os.environ.get("SCREENSHOT_QUALITY", 70))
+SCREENSHOT_MAX_HEIGHT = int(os.environ.get("SCREENSHOT_MAX_HEIGHT", 8000))
+SCREENSHOT_WORKERS = int(os.environ.get("SCREENSHOT_WORKERS", 2))
+# Content-addressed screenshot store, shared by the API and the workers
+SCREENSHOT_STORE_PATH = os.environ.get("SCREENSHOT_STORE_PATH", "data/screenshots")
+
+# Page settle budgets are learned from the last N settle timings of a website, once it has at least the minimum
+SCANNER_SETTLE_HISTORY = int(os.environ.get("SCANNER_SETTLE_HISTORY", 200))
+SCANNER_SETTLE_MIN_SAMPLES = int(os.environ.get("SCANNER_SETTLE_MIN_SAMPLES", 20))
+
+# Real Tab presses per page used to validate the computed tab order and find focus traps
+SCANNER_TAB_SAMPLES = int(os.environ.get("SCANNER_TAB_SAMPLES", 8))
+
+# zlib level of the stored axe results, links and images (0 stores plain JSON) and rows converted per compress_reports batch
+REPORT_COMPRESSION_LEVEL = int(os.environ.get("REPORT_COMPRESSION_LEVEL", 6))
+REPORT_COMPRESSION_BATCH_SIZE = int(os.environ.get("REPORT_COMPRESSION_BATCH_SIZE", 200))
+# Reports per backfill_report_violations batch, and sites per repair_latest_reports batch
+REPORT_BACKFILL_BATCH_SIZE = int(os.environ.get("REPORT_BACKFILL_BATCH_SIZE", 200))
+# Page reports fetched at a time while merging a website report
+WEBSITE_REPORT_BATCH_SIZE = int(os.environ.get("WEBSITE_REPORT_BATCH_SIZE", 100))
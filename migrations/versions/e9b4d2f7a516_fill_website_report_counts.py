@@ -0,0 +1,56 @@
+"""fill website report counts
+
+Revision ID: e9b4d2f7a516
+Revises: d1f6b3e9a274
+Create Date: 2026-10-19 01:00:00.000000
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9b4d2f7a516'
+down_revision = 'd1f6b3e9a274'
+branch_labels = None
+depends_on = None
+
+CATEGORIES = ('violations', 'inaccessible', 'incomplete', 'passes')
+IMPACTS = ('total', 'critical', 'serious', 'moderate', 'minor')
+
+
+def upgrade():
+    # Reading the counts doesn't create rows, store one for every website that has none yet
+    conn = op.get_bind()
+    columns = [f"{category}_{impact}" for category in CATEGORIES for impact in IMPACTS]
+    counts_table = sa.table('website_report_counts', sa.column('website_id'), *[sa.column(name) for name in columns])
+
+    existing = {row[0] for row in conn.execute(sa.text("SELECT website_id FROM website_report_counts"))}
+    totals = {
+        row[0]: dict.fromkeys(columns, 0)
+        for row in conn.execute(sa.text("SELECT id FROM website"))
+        if row[0] not in existing
+    }
+    pages = conn.execute(sa.text("""
+        SELECT site_website_assoc.website_id, site.latest_report_counts
+        FROM site JOIN site_website_assoc ON site_website_assoc.site_id = site.id
+        WHERE site.latest_report_counts IS NOT NULL
+    """))
+    for website_id, counts in pages:
+        if website_id not in totals:
+            continue
+        if isinstance(counts, (str, bytes)):
+            counts = json.loads(counts)
+        for category in CATEGORIES:
+            for impact in IMPACTS:
+                totals[website_id][f"{category}_{impact}"] += (counts or {}).get(category, {}).get(impact, 0)
+
+    if totals:
+        op.bulk_insert(counts_table, [{'website_id': website_id, **values} for website_id, values in totals.items()])
+
+
+def downgrade():
+    # the rows stay valid, there is nothing to undo
+    pass
@@ -0,0 +1,59 @@
+"""compress report json
+
+Revision ID: f6c2a8d4b137
+Revises: e4a9c7b2d015
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6c2a8d4b137'
+down_revision = 'e4a9c7b2d015'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ('report', 'links', 'imgs')
+
+
+def upgrade():
+    # The stored JSON text is kept as is and read as uncompressed, existing rows
+    # are compressed in the background by scanner.tasks.compress_reports
+    with op.batch_alter_table('report', schema=None) as batch_op:
+        for name in COLUMNS:
+            batch_op.alter_column(name,
+                   existing_type=sa.JSON(),
+                   type_=sa.LargeBinary(length=2**32 - 1),
+                   existing_nullable=False)
+
+
+def downgrade():
+    conn = op.get_bind()
+    report = sa.table('report', sa.column('id', sa.Integer), *(sa.column(name, sa.LargeBinary) for name in COLUMNS))
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(report).where(report.c.id > last_id).order_by(report.c.id).limit(500)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            values = {}
+            for name in COLUMNS:
+                value = getattr(row, name)
+                if isinstance(value, bytes) and value[:1] == b'\x01':
+                    values[name] = zlib.decompress(value[1:])
+            if values:
+                conn.execute(report.update().where(report.c.id == row.id).values(**values))
+        last_id = rows[-1].id
+
+    with op.batch_alter_table('report', schema=None) as batch_op:
+        for name in COLUMNS:
+            batch_op.alter_column(name,
+                   existing_type=sa.LargeBinary(length=2**32 - 1),
+                   type_=sa.JSON(),
+                   existing_nullable=False)
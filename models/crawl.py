@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy.orm import Mapped
+
+from models import db
+
+
+class CrawlCheckpoint(db.Model):
+    """
+    Saved progress of a website crawl, so a scan that was interrupted (worker
+    recycled, soft time limit) resumes where it stopped instead of restarting
+    from the root URL. Removed once the crawl finishes.
+    """
+    __tablename__ = 'crawl_checkpoint'
+
+    id: Mapped[int] = db.Column(db.Integer, primary_key=True)
+    website_id: Mapped[int] = db.Column(db.Integer, db.ForeignKey('website.id', ondelete='CASCADE'), nullable=False, unique=True)
+    # URLs still to scan, including pages that were in flight when the checkpoint was taken
+    pending: Mapped[List[str]] = db.Column(db.JSON, nullable=False)
+    # URLs already visited, whether or not they produced a report
+    done: Mapped[List[str]] = db.Column(db.JSON, nullable=False)
+    # URLs that produced a report, used for the orphaned site cleanup at the end of the crawl
+    found: Mapped[List[str]] = db.Column(db.JSON, nullable=False)
+    created_at: Mapped[datetime] = db.Column(db.DateTime, default=db.func.current_timestamp())
+    updated_at: Mapped[datetime] = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+
+    def __repr__(self):
+        return f"<CrawlCheckpoint website={self.website_id} pending={len(self.pending)} done={len(self.done)}>"
+
+    @staticmethod
+    def get_resumable(website_id: int, max_age: timedelta) -> 'CrawlCheckpoint | None':
+        checkpoint = db.session.query(CrawlCheckpoint).filter_by(website_id=website_id).first()
+        if checkpoint is None:
+            return None
+        if checkpoint.updated_at and datetime.now() - checkpoint.updated_at > max_age:
+            return None
+        return checkpoint
+
+    @staticmethod
+    def save(website_id: int, pending: List[str], done: List[str], found: List[str]) -> None:
+        checkpoint = db.session.query(CrawlCheckpoint).filter_by(website_id=website_id).first()
+        if checkpoint is None:
+            checkpoint = CrawlCheckpoint(website_id=website_id)
+            db.session.add(checkpoint)
+        checkpoint.pending = pending
+        checkpoint.done = done
+        checkpoint.found = found
+        # JSON columns aren't change tracked in place, touch the timestamp explicitly
+        checkpoint.updated_at = datetime.now()
+
+    @staticmethod
+    def clear(website_id: int) -> None:
+        db.session.query(CrawlCheckpoint).filter_by(website_id=website_id).delete()
@@ -1,17 +1,21 @@
 from datetime import datetime, timezone
 from select import select
-from typing import List, TypedDict
-from sqlalchemy import LargeBinary
+from typing import List, Literal, TypedDict
+from sqlalchemy import LargeBinary, bindparam, select, type_coerce, update
 from sqlalchemy.dialects.mysql import LONGBLOB
 
 from models.user import User
 
 from . import db
+from .types import CompressedJSON, compress_json, decompress_json, is_compressed
+from .rule_metadata import compact_report, hydrate_report
+from .report_violation import ReportViolation
+from config import REPORT_COMPRESSION_BATCH_SIZE
 from utils.jwt import generate_jwt_token
 from scanner.browser.report import AccessibilityReport
 from scanner.accessibility.ace import AxeReport, AxeReportKeys, AxeResult
 from sqlalchemy.ext.hybrid import hybrid_property, hybrid_method
-from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import Mapped, deferred, undefer_group
 class AxeReportCounts(TypedDict, total=False):
     total: int
     critical: int
@@ -26,6 +30,12 @@ class ReportMinimized(TypedDict):
     report_counts:dict[AxeReportKeys, AxeReportCounts]
     timestamp: str
 
+# Groups of deferred Report columns, see Report.loading
+ReportColumns = Literal['content', 'links', 'photo']
+
+# Columns stored as CompressedJSON
+COMPRESSED_COLUMNS = ('report', 'links', 'imgs')
+
 class ReportDict(TypedDict):
     id: int
     url: str
@@ -38,37 +48,127 @@ class ReportDict(TypedDict):
     videos: List[str]
     imgs: List[str]
     tabable: bool
+    tab_order: dict | None
+    axe_version: str | None
     created_at: str
     updated_at: str
     
 
 class Report(db.Model):
     __tablename__ = 'report'
+    __table_args__ = (
+        db.Index('ix_report_timestamp_violations', 'timestamp', 'violations_total'),
+    )
     
     id: Mapped[str] = db.Column(db.Integer, primary_key=True)
     site_id: Mapped[int] = db.Column(db.Integer, db.ForeignKey('site.id'))
-    site = db.relationship("Site", back_populates="reports")
+    site = db.relationship("Site", back_populates="reports", foreign_keys=[site_id])
+    # the violated rules, one row each, see models/report_violation.py
+    violation_rows: Mapped[List[ReportViolation]] = db.relationship(ReportViolation, lazy=True, cascade="all, delete-orphan")
     error: Mapped[str | None] = db.Column(db.String(255), nullable=True)
     response_code: Mapped[int | None] = db.Column(db.Integer, nullable=True)
     url: Mapped[str] = db.Column(db.String(255), nullable=False)
     base_url: Mapped[str] = db.Column(db.String(255), nullable=False)
     timestamp: Mapped[datetime] = db.Column(db.DateTime, nullable=False)
-    report: AxeReport = db.Column(db.JSON, nullable=False)
+    # The heavy columns are deferred, loading a Report reads only its metadata.
+    # Read paths that need them opt in with Report.loading('content', 'links', ...),
+    # otherwise the first access loads the column's group with one more query.
+    # The largest are compressed, see COMPRESSED_COLUMNS and Report.compress_batch.
+    # The axe results are stored without their rule metadata, see the report property.
+    _report: Mapped[AxeReport] = deferred(db.Column('report', CompressedJSON, nullable=False), group='content')
     report_counts: Mapped[dict[AxeReportKeys, AxeReportCounts]] = db.Column(db.JSON, nullable=False)
-    links: Mapped[List[str]] = db.Column(db.JSON, nullable=False)
-    videos: Mapped[List[str]] = db.Column(db.JSON, nullable=False)
-    imgs: Mapped[List[str]] = db.Column(db.JSON, nullable=False)
+    # report_counts['violations']['total'] in a column of its own, the report list sorts on it
+    violations_total: Mapped[int] = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    links: Mapped[List[str]] = deferred(db.Column(CompressedJSON, nullable=False), group='links')
+    videos: Mapped[List[str]] = deferred(db.Column(db.JSON, nullable=False), group='links')
+    imgs: Mapped[List[str]] = deferred(db.Column(CompressedJSON, nullable=False), group='links')
     tabable: Mapped[bool] = db.Column(db.Boolean, nullable=False)
-    photo: Mapped[bytes] = db.Column(LargeBinary(2**32 -1), nullable=True)
+    tab_order: Mapped[dict | None] = deferred(db.Column(db.JSON, nullable=True), group='content')
+    # PNG screenshot of reports from before the screenshot store, newer reports keep photo_key instead
+    photo: Mapped[bytes] = deferred(db.Column(LargeBinary(2**32 -1), nullable=True), group='photo')
+    photo_key: Mapped[str | None] = db.Column(db.String(80), nullable=True)
     tags: Mapped[List[str]] = db.Column(db.JSON, nullable=True)
+    axe_version: Mapped[str | None] = db.Column(db.String(20), nullable=True)
     created_at: Mapped[datetime] = db.Column(db.DateTime, default=db.func.current_timestamp())
     updated_at: Mapped[datetime] = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
 
     def __repr__(self):
         return f"<Report {self.id} for site {self.site_id} - {self.url}>"
+
+    @property
+    def report(self) -> AxeReport:
+        """The axe results, with the rule metadata from the rule dictionary (models/rule_metadata.py)."""
+        stored = self._report
+        hydrated = self.__dict__.get('_hydrated_report')
+        if hydrated is None or hydrated[0] is not stored:
+            hydrated = (stored, hydrate_report(self.axe_version, stored))
+            self._hydrated_report = hydrated
+        return hydrated[1]
+
+    @report.setter
+    def report(self, report: AxeReport):
+        self._report = compact_report(self.axe_version, report)
+
+    @staticmethod
+    def loading(*groups: ReportColumns) -> list:
+        """Query options loading the given groups of deferred columns with the report itself.
+
+        content: axe results and tab order, links: links, videos and images, photo: legacy PNG
+        """
+        return [undefer_group(group) for group in groups]
+
+    @staticmethod
+    def compress_batch(after_id: int = 0, batch_size: int = REPORT_COMPRESSION_BATCH_SIZE) -> tuple[int | None, int]:
+        """Compress the stored JSON of the reports following after_id, in id order.
+
+        Rows written before the columns were compressed, or whose axe results
+        still carry the rule metadata, are rewritten, the others are skipped.
+        Returns the last id looked at (None once there are no more reports) and
+        the number of reports rewritten.
+        """
+        table = Report.__table__
+        # read and write the stored bytes, bypassing CompressedJSON
+        raw = [type_coerce(table.c[name], LargeBinary).label(name) for name in COMPRESSED_COLUMNS]
+        rows = db.session.execute(
+            select(table.c.id, table.c.axe_version, *raw).where(table.c.id > after_id).order_by(table.c.id).limit(batch_size)
+        ).all()
+        if not rows:
+            return None, 0
+
+        updates = []
+        for row in rows:
+            values = {name: getattr(row, name) for name in COMPRESSED_COLUMNS}
+            # decoded values of the columns to rewrite
+            rewrite = {
+                name: decompress_json(value)
+                for name, value in values.items() if value is not None and not is_compressed(value)
+            }
+            if row.axe_version and values['report'] is not None:
+                stored = rewrite['report'] if 'report' in rewrite else decompress_json(values['report'])
+                compacted = compact_report(row.axe_version, stored)
+                if compacted != stored:
+                    rewrite['report'] = compacted
+            if not rewrite:
+                continue
+            updates.append({
+                '_id': row.id,
+                **values,
+                **{name: compress_json(value) for name, value in rewrite.items()},
+            })
+
+        if updates:
+            db.session.execute(
+                update(table).where(table.c.id == bindparam('_id')).values(
+                    {name: bindparam(name, type_=LargeBinary) for name in COMPRESSED_COLUMNS}
+                ),
+                updates,
+            )
+        db.session.commit()
+        return rows[-1].id, len(updates)
     def __init__(self, data: AccessibilityReport, site_id):
         self.from_dict(data)
         self.site_id = site_id
+        self.violation_rows = ReportViolation.from_report(self.report, site_id)
         
     @hybrid_method
     def get_date_iso(self, property):
@@ -163,6 +263,8 @@ class Report(db.Model):
         self.response_code = data.get('response_code', None)
         self.base_url = data.get('base_url', '')
         self.timestamp = datetime.fromisoformat(data['timestamp']).replace(tzinfo=timezone.utc)
+        # the rule dictionary is per axe version
+        self.axe_version = data.get('axe_version')
         self.report = data['report']
         self.report_counts = {
             'violations': {
@@ -194,11 +296,14 @@ class Report(db.Model):
                 'minor': self._count_axe("passes", "minor")
             }
         }
+        self.violations_total = self.report_counts['violations']['total']
         self.links = data['links']
         self.videos = data['videos']
         self.imgs = data['imgs']
         self.tabable = data['tabable']
-        self.photo = data['photo']
+        self.tab_order = data.get('tab_order')
+        self.photo = data.get('photo')
+        self.photo_key = data.get('photo_key')
         self.tags = data.get('tags', [])
     def generate_pdf(self) -> bytes:
         from utils.pdf import generate_pdf
@@ -218,6 +323,9 @@ class Report(db.Model):
             'imgs': self.imgs,
             'tabable': self.tabable,
             'tags': self.tags,
+            # only the full report carries the tab order, list rows keep the key
+            'tab_order': None,
+            'axe_version': self.axe_version,
             'created_at': self.created_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
             'updated_at': self.updated_at.strftime("%Y-%m-%dT%H:%M:%SZ")
         }
@@ -236,7 +344,9 @@ class Report(db.Model):
             'videos': self.videos,
             'imgs': self.imgs,
             'tabable': self.tabable,
+            'tab_order': self.tab_order,
             'tags': self.tags,
+            'axe_version': self.axe_version,
             # Capability token for the anonymous report-script endpoint. Signed,
             # so it can't be forged or enumerated; only viewers of this (access
             # controlled) report receive it.
@@ -0,0 +1,94 @@
+import hashlib
+import json
+from typing import List
+
+from sqlalchemy.orm import Mapped
+
+from models import db
+from scanner.accessibility.ace import AxeReport, AxeResult
+from config import REPORT_BACKFILL_BATCH_SIZE
+
+
+class ReportViolation(db.Model):
+    """
+    One violated rule of a report, written with the report.
+
+    Filters by rule and impact, of the report list and of the pages of a
+    website, are answered from this table and its indexes, without reading
+    and parsing the axe results of every report.
+    """
+    __tablename__ = 'report_violation'
+    __table_args__ = (
+        db.Index('ix_report_violation_rule_impact', 'rule_id', 'impact'),
+        db.Index('ix_report_violation_impact', 'impact'),
+    )
+
+    id: Mapped[int] = db.Column(db.Integer, primary_key=True)
+    report_id: Mapped[int] = db.Column(db.Integer, db.ForeignKey('report.id', ondelete='CASCADE'), nullable=False, index=True)
+    site_id: Mapped[int | None] = db.Column(db.Integer, db.ForeignKey('site.id', ondelete='CASCADE'), nullable=True, index=True)
+    rule_id: Mapped[str] = db.Column(db.String(255), nullable=False)
+    impact: Mapped[str | None] = db.Column(db.String(20), nullable=True)
+    node_count: Mapped[int] = db.Column(db.Integer, nullable=False)
+    # Identifies the same issue (rule and failing elements) across scans of a page
+    fingerprint: Mapped[str] = db.Column(db.String(40), nullable=False)
+
+    def __repr__(self):
+        return f"<ReportViolation {self.rule_id} ({self.impact}) report={self.report_id}>"
+
+    @staticmethod
+    def fingerprint_of(result: AxeResult) -> str:
+        targets = sorted(json.dumps(node.get('target')) for node in result.get('nodes', []))
+        return hashlib.sha1("\n".join([result.get('id', '')] + targets).encode()).hexdigest()
+
+    @staticmethod
+    def from_report(report: AxeReport, site_id: int | None) -> List['ReportViolation']:
+        if not isinstance(report, dict):
+            return []
+        return [
+            ReportViolation(
+                site_id=site_id,
+                rule_id=result['id'],
+                impact=result.get('impact'),
+                node_count=len(result.get('nodes', [])),
+                fingerprint=ReportViolation.fingerprint_of(result),
+            )
+            for result in report.get('violations', [])
+            if result.get('id')
+        ]
+
+    @staticmethod
+    def backfill_batch(after_id: int = 0, batch_size: int = REPORT_BACKFILL_BATCH_SIZE) -> tuple[int | None, int]:
+        """Add the violation rows of the reports following after_id that were stored without them.
+
+        Returns the last report id looked at (None once there are no more
+        reports) and the number of rows added.
+        """
+        from models.report import Report
+
+        reports = (
+            db.session.query(Report)
+            .options(*Report.loading('content'))
+            .filter(Report.id > after_id)
+            .order_by(Report.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not reports:
+            return None, 0
+
+        ids = [report.id for report in reports]
+        done = {
+            report_id for (report_id,) in
+            db.session.query(ReportViolation.report_id).filter(ReportViolation.report_id.in_(ids)).distinct()
+        }
+        added = 0
+        for report in reports:
+            if report.id in done:
+                continue
+            rows = ReportViolation.from_report(report.report, report.site_id)
+            for row in rows:
+                row.report_id = report.id
+            db.session.add_all(rows)
+            added += len(rows)
+        db.session.commit()
+        return ids[-1], added
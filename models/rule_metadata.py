@@ -0,0 +1,150 @@
+"""
+Dictionary of axe rule metadata, shared by the stored reports.
+
+axe repeats the description, help, help URL and tags of a rule in every
+result, on every page of every scan. Reports store results without them when
+they match this dictionary, keyed by axe version and rule id, and get them
+back from it on read. A field that differs from the dictionary (a custom
+rule edited since its first report) stays in the result and takes precedence.
+"""
+from typing import Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Mapped
+
+from models import db
+from scanner.accessibility.ace import AxeReport, AxeResult
+
+# Fields of an axe result that only depend on its rule
+RULE_FIELDS = ('description', 'help', 'helpUrl', 'tags')
+
+# axe version -> rule id -> fields, only ever filled from committed rows
+_dictionary: Dict[str, Dict[str, dict]] = {}
+# session.info key of the transaction that added rules, they aren't cached until it commits
+_ADDED_IN = 'rule_metadata_added_in'
+
+
+class RuleMetadata(db.Model):
+    __tablename__ = 'rule_metadata'
+    __table_args__ = (db.UniqueConstraint('axe_version', 'rule_id'),)
+
+    id: Mapped[int] = db.Column(db.Integer, primary_key=True)
+    axe_version: Mapped[str] = db.Column(db.String(20), nullable=False)
+    rule_id: Mapped[str] = db.Column(db.String(255), nullable=False)
+    description: Mapped[str | None] = db.Column(db.Text, nullable=True)
+    help: Mapped[str | None] = db.Column(db.Text, nullable=True)
+    help_url: Mapped[str | None] = db.Column(db.Text, nullable=True)
+    tags: Mapped[List[str] | None] = db.Column(db.JSON, nullable=True)
+
+    def __repr__(self):
+        return f"<RuleMetadata {self.rule_id} axe {self.axe_version}>"
+
+    def to_result(self) -> dict:
+        return {
+            'description': self.description,
+            'help': self.help,
+            'helpUrl': self.help_url,
+            'tags': self.tags,
+        }
+
+
+def rule_metadata(axe_version: str, reload: bool = False) -> Dict[str, dict]:
+    """The dictionary of an axe version, queried once per process."""
+    if reload or axe_version not in _dictionary:
+        rows = db.session.query(RuleMetadata).filter_by(axe_version=axe_version).all()
+        loaded = {row.rule_id: row.to_result() for row in rows}
+        added_in = db.session.info.get(_ADDED_IN)
+        if added_in is not None and added_in is db.session().get_transaction():
+            # may include rules this transaction added and could still roll back
+            return loaded
+        _dictionary[axe_version] = loaded
+    return _dictionary[axe_version]
+
+
+def _results(report: AxeReport):
+    for results in report.values():
+        if isinstance(results, list):
+            for result in results:
+                if isinstance(result, dict) and result.get('id'):
+                    yield result
+
+
+def compact_report(axe_version: str | None, report: AxeReport) -> AxeReport:
+    """The report without the rule fields found in the dictionary, for storage.
+
+    Rules not in the dictionary yet are added to it in the current transaction,
+    so they are committed with the report that needs them. The given report is
+    not modified.
+    """
+    if not axe_version or not isinstance(report, dict):
+        return report
+
+    rules: Dict[str, AxeResult] = {}
+    for result in _results(report):
+        rules.setdefault(result['id'], result)
+
+    known = rule_metadata(axe_version)
+    if any(rule_id not in known for rule_id in rules):
+        known = rule_metadata(axe_version, reload=True)
+        new = {
+            rule_id: {field: result.get(field) for field in RULE_FIELDS}
+            for rule_id, result in rules.items() if rule_id not in known
+        }
+        if new:
+            # another worker may add the same rules concurrently, the first one wins
+            db.session.execute(
+                insert(RuleMetadata.__table__)
+                .prefix_with('IGNORE', dialect='mysql')
+                .prefix_with('IGNORE', dialect='mariadb')
+                .prefix_with('OR IGNORE', dialect='sqlite'),
+                [
+                    {
+                        'axe_version': axe_version,
+                        'rule_id': rule_id,
+                        'description': fields['description'],
+                        'help': fields['help'],
+                        'help_url': fields['helpUrl'],
+                        'tags': fields['tags'],
+                    }
+                    for rule_id, fields in new.items()
+                ],
+            )
+            db.session.info[_ADDED_IN] = db.session().get_transaction()
+            known = {**known, **new}
+
+    def strip(result):
+        if not isinstance(result, dict) or result.get('id') not in known:
+            return result
+        fields = known[result['id']]
+        return {key: value for key, value in result.items() if key not in RULE_FIELDS or fields[key] != value}
+
+    return {
+        key: [strip(result) for result in value] if isinstance(value, list) else value
+        for key, value in report.items()
+    }
+
+
+def hydrate_report(axe_version: str | None, report: AxeReport, known: Dict[str, dict] | None = None) -> AxeReport:
+    """A stored report with the rule fields of its results filled in from the dictionary.
+
+    Callers streaming reports pass the dictionary of the version, loaded
+    beforehand, so nothing is queried while their cursor is open.
+    """
+    if not axe_version or not isinstance(report, dict):
+        return report
+
+    if known is None:
+        rule_ids = {result['id'] for result in _results(report)}
+        known = rule_metadata(axe_version)
+        if not rule_ids.issubset(known):
+            known = rule_metadata(axe_version, reload=True)
+
+    def fill(result):
+        if not isinstance(result, dict) or result.get('id') not in known:
+            return result
+        return {**known[result['id']], **result}
+
+    return {
+        key: [fill(result) for result in value] if isinstance(value, list) else value
+        for key, value in report.items()
+    }
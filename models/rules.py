@@ -1,9 +1,11 @@
 
 import re
 from models import db
-from sqlalchemy.orm import Mapped
+from models.settings import RULES_VERSION, Settings
+from sqlalchemy import Integer, Text, cast, event, inspect, or_, update
+from sqlalchemy.orm import Mapped, Session
 from datetime import datetime
-from typing import List, Literal
+from typing import Dict, List, Literal, Tuple
 import json
 
 from utils.javascript import is_single_arrow_function, is_valid_js, is_valid_object
@@ -356,9 +358,15 @@ class Rule(db.Model):
             all_rules.append(rule.to_js_object())
             all_checks.update(rule.getChecksJson())
         
-        # Generate the final configuration JSON string
-        config = f"""{{ "checks": [{','.join(list(all_checks))}],"rules": [{','.join(list(all_rules))}]}}"""
+        # Generate the final configuration JSON string, checks sorted so the same rules always give the same config
+        config = f"""{{ "checks": [{','.join(sorted(all_checks))}],"rules": [{','.join(list(all_rules))}]}}"""
         return config
+
+    @staticmethod
+    def for_tags(tags: List[str]) -> List['Rule']:
+        """Enabled rules matching any of the tags."""
+        filter = [Rule.tags.like(f"%{tag.strip()}%") for tag in tags]
+        return db.session.query(Rule).filter(Rule.enabled == True, or_(*filter)).distinct().order_by(Rule.id).all()
     
     # for use in axe report
     def to_js_object(self, update = False, force = False) -> str:
@@ -406,3 +414,56 @@ class Rule(db.Model):
         return js_object
 
 
+def rules_version() -> str:
+    """
+    Changes whenever a Rule or Check is added, edited or deleted.
+
+    A counter in the settings table, bumped in the same transaction as the
+    change, so Flask and every Celery worker agree on it without sharing state.
+    """
+    return Settings.get(RULES_VERSION, "0")
+
+
+def _changes_rules(obj) -> bool:
+    # json only caches the other fields, filling it in doesn't change the rules
+    return any(attr.history.has_changes() for attr in inspect(obj).attrs if attr.key not in ('json', 'updated_at'))
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_rules_version(session, flush_context, instances):
+    models = (Rule, Check)
+    if not (any(isinstance(obj, models) for obj in session.new)
+            or any(isinstance(obj, models) for obj in session.deleted)
+            or any(isinstance(obj, models) and _changes_rules(obj) for obj in session.dirty)):
+        return
+    settings = Settings.__table__
+    bumped = session.connection().execute(
+        update(settings)
+        .where(settings.c.key == RULES_VERSION)
+        .values(value=cast(cast(settings.c.value, Integer) + 1, Text))
+    )
+    if bumped.rowcount == 0:
+        session.connection().execute(settings.insert().values(key=RULES_VERSION, value="1"))
+
+
+# Compiled axe configs of the current rules version, keyed by tag set
+_compiled_configs: Dict[Tuple[str, ...], str] = {}
+_compiled_version: str | None = None
+
+
+def get_compiled_axe_config(tags: List[str]) -> str:
+    """The axe-core configuration for a tag set, compiled once per rules version."""
+    global _compiled_version
+    key = tuple(sorted({tag.strip() for tag in tags if tag.strip()}))
+    if not key:
+        return ""
+
+    version = rules_version()
+    if version != _compiled_version:
+        _compiled_configs.clear()
+        _compiled_version = version
+
+    config = _compiled_configs.get(key)
+    if config is None:
+        config = _compiled_configs[key] = Rule.get_axe_config(Rule.for_tags(list(key)))
+    return config
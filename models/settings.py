@@ -15,6 +15,8 @@ AppSetting = Literal[
     "default_email_domain",
 ]
 APP_SETTINGS: list[AppSetting] = list(get_args(AppSetting))
+# Bumped on every Rule or Check change (see models/rules.py), not editable through the API
+RULES_VERSION = "rules_version"
 
 class Settings(db.Model):
     __tablename__ = 'settings'
@@ -64,7 +66,7 @@ class Settings(db.Model):
     @staticmethod
     def to_dict() -> dict:
         settings = db.session.query(Settings).all()
-        return {setting.key: setting.value for setting in settings}
+        return {setting.key: setting.value for setting in settings if setting.key != RULES_VERSION}
     
     @staticmethod
     def init_defaults() -> None:
@@ -75,6 +77,7 @@ class Settings(db.Model):
             "default_should_auto_activate": "false",
             "default_notify_on_completion": "true",
             "default_email_domain": "",
+            RULES_VERSION: "0",
         }
         for key, value in defaults.items():
             if not db.session.query(Settings).filter_by(key=key).first():
@@ -0,0 +1,66 @@
+"""
+Column types shared by the models.
+
+CompressedJSON stores a JSON document zlib-compressed behind a one byte
+format header, in a binary column:
+
+- 0x01: zlib (deflate, the gzip algorithm without the gzip framing)
+
+JSON text never starts with a control byte, so values written before the
+column was compressed, or with REPORT_COMPRESSION_LEVEL=0, are read back as
+plain JSON. Rows can be converted in place at any time, see
+Report.compress_batch.
+"""
+import json
+import zlib
+from typing import Any
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+from config import REPORT_COMPRESSION_LEVEL
+
+ZLIB_HEADER = b"\x01"
+
+
+def is_compressed(data: bytes | str | None) -> bool:
+    return isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[:1]) == ZLIB_HEADER
+
+
+def compress_json(value: Any, level: int = REPORT_COMPRESSION_LEVEL) -> bytes:
+    """Serialize a value, compressed unless level is 0."""
+    data = json.dumps(value, separators=(",", ":")).encode("utf-8")
+    if level <= 0:
+        return data
+    return ZLIB_HEADER + zlib.compress(data, level)
+
+
+def decompress_json(data: bytes | str) -> Any:
+    """Read a value written by compress_json, or plain JSON text."""
+    if isinstance(data, str):
+        return json.loads(data)
+    data = bytes(data)
+    if data[:1] == ZLIB_HEADER:
+        data = zlib.decompress(data[1:])
+    return json.loads(data)
+
+
+class CompressedJSON(TypeDecorator):
+    """A JSON value stored compressed in a (LONG)BLOB.
+
+    The value is decompressed when its row is loaded, keep large columns of this
+    type deferred so that only read paths that use them pay for it. The column
+    can't be queried with JSON functions.
+    """
+    impl = LargeBinary(2**32 - 1)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_json(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return decompress_json(value)
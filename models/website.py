@@ -1,17 +1,22 @@
 
 from datetime import datetime
-from typing import List, TypedDict
-from sqlalchemy import and_, case, func, or_, select
+from typing import Dict, List, TypedDict
+from sqlalchemy import LargeBinary, and_, case, func, insert, inspect, select, type_coerce, update
 from models import db
 from sqlalchemy.ext.hybrid import hybrid_method,hybrid_property
 from sqlalchemy.orm import Mapped
+from sqlalchemy.orm.attributes import set_committed_value
 from models.assoc import UserWebsiteAssoc
 from models.report import AxeReportCounts, Report, ReportMinimized
-from models.rules import Rule
+from models.rule_metadata import hydrate_report, rule_metadata
+from models.rules import get_compiled_axe_config
 from models.settings import Settings
+from models.types import decompress_json
 from models.user import User
-from scanner.accessibility.ace import AxeReportKeys, AxeResult, WebsiteAxeReport
+from scanner.accessibility.ace import AxeReportKeys, AxeResult, WebsiteAxeReport, WebsiteAxeResult
+from scanner.utils.incremental import PageValidators
 from utils.urls import get_netloc, is_valid_url
+from config import SCANNER_MAX_CONCURRENCY, SCANNER_MIN_CONCURRENCY, SCANNER_RESOURCE_POLICY, SCANNER_SCAN_PROFILE, SCANNER_SETTLE_HISTORY, WEBSITE_REPORT_BATCH_SIZE
 
 class SiteDict(TypedDict):
     id: int
@@ -39,49 +44,188 @@ class Site(db.Model):
     url: Mapped[str] = db.Column(db.String(500), nullable=False)
     last_scanned: Mapped[datetime] = db.Column(db.DateTime, nullable=True)
     websites: Mapped[List['Website']] = db.relationship('Website', secondary=Site_Website_Assoc, back_populates='sites', lazy='dynamic')
-    reports: Mapped[List['Report']] = db.relationship('Report', back_populates='site', lazy='dynamic' , cascade="all, delete-orphan")
+    reports: Mapped[List['Report']] = db.relationship('Report', back_populates='site', lazy='dynamic' , cascade="all, delete-orphan", foreign_keys='Report.site_id')
     active: Mapped[bool] = db.Column(db.Boolean, default=True)
     scanning: Mapped[bool] = db.Column(db.Boolean, default=False)
+    # Version of the page the latest report describes, incremental rescans skip the page while it matches
+    etag: Mapped[str | None] = db.Column(db.String(255), nullable=True)
+    last_modified: Mapped[str | None] = db.Column(db.String(64), nullable=True)
+    content_hash: Mapped[str | None] = db.Column(db.String(64), nullable=True)
+    rules_fingerprint: Mapped[str | None] = db.Column(db.String(64), nullable=True)
+    # The latest report of the page, with its timestamp and counts, set by record_report
+    latest_report_id: Mapped[int | None] = db.Column(
+        db.Integer, db.ForeignKey('report.id', ondelete='SET NULL', use_alter=True, name='fk_site_latest_report_id'), nullable=True
+    )
+    latest_report: Mapped['Report | None'] = db.relationship('Report', foreign_keys=[latest_report_id], post_update=True, lazy=True)
+    latest_report_at: Mapped[datetime | None] = db.Column(db.DateTime, nullable=True)
+    latest_report_counts: Mapped[dict[AxeReportKeys, AxeReportCounts] | None] = db.Column(db.JSON, nullable=True)
     created_at: Mapped[datetime] = db.Column(db.DateTime, default=db.func.current_timestamp())
     updated_at: Mapped[datetime] = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
 
     @hybrid_method
     def get_recent_report(self) -> ReportMinimized | None:
-        report = self.reports.order_by(Report.timestamp.desc()).with_entities(Report.id, Report.url, Report.report_counts, Report.timestamp).first()
-        report = {
-            'id': report.id,
-            'url': report.url,
-            'report_counts': report.report_counts,
-            'timestamp': report.timestamp.strftime("%Y-%m-%dT%H:%M:%SZ") if report.timestamp else None
+        if self.latest_report_id is None:
+            return None
+        return {
+            'id': self.latest_report_id,
+            'url': self.url,
+            'report_counts': self.latest_report_counts,
+            'timestamp': self.latest_report_at.strftime("%Y-%m-%dT%H:%M:%SZ") if self.latest_report_at else None
         }
-        return report
     
     @get_recent_report.expression
     def get_recent_report(cls):
         from models.report import Report
-        from sqlalchemy import select
-        # Subquery: get the latest report timestamp for this site
-        latest_report_ts = (
-            select(func.max(Report.timestamp))
-            .where(Report.site_id == cls.id)
-            .scalar_subquery()
-        )
-        # Subquery: get the report with that timestamp for this site
         return (
             select(Report)
-            .where(
-                Report.site_id == cls.id,
-                Report.timestamp == latest_report_ts
-            )
-            .limit(1)
+            .where(Report.id == cls.latest_report_id)
             .scalar_subquery()
         )
     
+    def get_validators(self) -> PageValidators:
+        return {
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'content_hash': self.content_hash,
+            'rules_fingerprint': self.rules_fingerprint,
+        }
+
+    def set_validators(self, validators: PageValidators):
+        self.etag = validators.get('etag')
+        self.last_modified = validators.get('last_modified')
+        self.content_hash = validators.get('content_hash')
+        self.rules_fingerprint = validators.get('rules_fingerprint')
+
+    @staticmethod
+    def get_or_create_many(urls: List[str], website: 'Website') -> Dict[str, 'Site']:
+        """
+        Resolve page URLs to Site rows attached to ``website`` in a few bulk
+        statements, creating the missing ones. Skips the per-row validation of
+        the constructor, the URLs must already be known pages of the website.
+        """
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+        sites = {site.url: site for site in db.session.query(Site).filter(Site.url.in_(urls)).all()}
+        missing = [url for url in urls if url not in sites]
+        if missing:
+            db.session.execute(insert(Site), [{'url': url, 'active': True, 'scanning': False} for url in missing])
+            sites.update({site.url: site for site in db.session.query(Site).filter(Site.url.in_(missing)).all()})
+
+        site_ids = [site.id for site in sites.values()]
+        attached = set(db.session.execute(
+            select(Site_Website_Assoc.c.site_id).where(
+                Site_Website_Assoc.c.website_id == website.id,
+                Site_Website_Assoc.c.site_id.in_(site_ids)
+            )
+        ).scalars())
+        unattached = [{'site_id': site_id, 'website_id': website.id} for site_id in site_ids if site_id not in attached]
+        if unattached:
+            db.session.execute(insert(Site_Website_Assoc), unattached)
+            existing = {site.id for url, site in sites.items() if url not in missing}
+            if any(row['site_id'] in existing for row in unattached):
+                # pages that may have reports joined the website
+                WebsiteReportCounts.refresh(website.id)
+        return sites
+
+    def record_report(self, report: Report):
+        """Store a new report of this site, see record_reports."""
+        Site.record_reports([(self, report)])
+
+    @staticmethod
+    def record_reports(reports: List[tuple['Site', Report]]):
+        """Store new reports of sites in the current transaction.
+
+        Unless it is older than the latest report of its site, each report
+        becomes the latest one and replaces that report in the counts of the
+        site's websites.
+
+        The pointers are read again under a lock held until the transaction
+        ends, so concurrent writers of a page (a crawl and a rescan) replace
+        each other's counts instead of the same previous ones. Every lock is
+        taken in one order, the site rows by id up front, then the counts rows
+        by website id, one relative update each at the end. Writers of batches
+        sharing pages wait for each other but can't deadlock.
+        """
+        if not reports:
+            return
+        sites = {site.id: site for site, _ in reports}
+        locked = db.session.execute(
+            select(Site.id, Site.latest_report_id, Site.latest_report_at, Site.latest_report_counts)
+            .where(Site.id.in_(sites))
+            .order_by(Site.id)
+            .with_for_update()
+        ).all()
+        for row in locked:
+            site = sites[row.id]
+            for key in ('latest_report_id', 'latest_report_at', 'latest_report_counts'):
+                set_committed_value(site, key, getattr(row, key))
+        # reports from before the pointer was kept
+        Site.repair_latest_reports([site_id for site_id, site in sites.items() if site.latest_report_id is None])
+
+        website_ids: Dict[int, List[int]] = {}
+        for site_id, website_id in db.session.execute(
+            select(Site_Website_Assoc.c.site_id, Site_Website_Assoc.c.website_id).where(Site_Website_Assoc.c.site_id.in_(sites))
+        ):
+            website_ids.setdefault(site_id, []).append(website_id)
+
+        changes: Dict[int, Dict[str, int]] = {}
+        for site, report in reports:
+            report.site_id = site.id
+            db.session.add(report)
+            timestamp = report.timestamp.replace(tzinfo=None)
+            if site.latest_report_at and site.latest_report_at > timestamp:
+                # an older report, the latest one still counts
+                continue
+            previous = site.latest_report_counts if site.latest_report_id is not None else None
+            site.latest_report = report
+            site.latest_report_at = timestamp
+            site.latest_report_counts = report.report_counts
+            for website_id in website_ids.get(site.id, []):
+                website_changes = changes.setdefault(website_id, {})
+                for column, change in WebsiteReportCounts.changes(report.report_counts, previous).items():
+                    website_changes[column] = website_changes.get(column, 0) + change
+        WebsiteReportCounts.add(changes)
+
+    @staticmethod
+    def repair_latest_reports(site_ids: List[int]) -> int:
+        """Point the given sites at their latest report, found from the reports table.
+
+        Returns the number of sites whose pointer changed.
+        """
+        if not site_ids:
+            return 0
+        latest_ts = (
+            select(Report.site_id, func.max(Report.timestamp).label('max_timestamp'))
+            .where(Report.site_id.in_(site_ids))
+            .group_by(Report.site_id)
+            .subquery()
+        )
+        rows = db.session.execute(
+            select(Report.site_id, Report.id, Report.timestamp, Report.report_counts)
+            .join(latest_ts, and_(Report.site_id == latest_ts.c.site_id, Report.timestamp == latest_ts.c.max_timestamp))
+        ).all()
+        # reports stored at the same time, the last one stored is the latest
+        latest = {}
+        for row in sorted(rows, key=lambda row: row.id):
+            latest[row.site_id] = row
+
+        changed = 0
+        for site in db.session.query(Site).filter(Site.id.in_(site_ids)):
+            row = latest.get(site.id)
+            report_id = row.id if row else None
+            if site.latest_report_id == report_id:
+                continue
+            site.latest_report_id = report_id
+            site.latest_report_at = row.timestamp if row else None
+            site.latest_report_counts = row.report_counts if row else None
+            changed += 1
+        return changed
+
     def get_full_current_report(self) -> Report | None:
-        report:Report = self.reports.order_by(Report.timestamp.desc()).first()
-        if report:
-            return report
-        return None
+        if self.latest_report_id is None:
+            return None
+        return db.session.get(Report, self.latest_report_id, options=Report.loading('content', 'links'))
 
     def can_scan(self, user: User) -> bool:
         if not self.websites:
@@ -217,6 +361,11 @@ class Site(db.Model):
 
 
 
+# Result types merged by Website.get_report, and the order of impacts in it
+WEBSITE_REPORT_KEYS = ("violations", "passes", "incomplete", "inapplicable")
+IMPACT_ORDER = {'critical': 0, 'serious': 1, 'moderate': 2, 'minor': 3}
+
+
 class WebsiteDict(TypedDict,total=False):
     id: int
     base_url: str
@@ -229,6 +378,11 @@ class WebsiteDict(TypedDict,total=False):
     should_email: bool
     active: bool
     rate_limit: int
+    min_concurrency: int | None
+    max_concurrency: int | None
+    incremental_rescan: bool
+    resource_policy: str | None
+    scan_profile: str | None
     public: bool
     created_at: datetime
     updated_at: datetime
@@ -254,6 +408,18 @@ class Website(db.Model):
     tags: Mapped[str] = db.Column(db.Text, nullable=True) # comma separated list of tags
     categories: Mapped[str] = db.Column(db.Text, default="") # comma separated list of categories
     description: Mapped[str] = db.Column(db.Text, nullable=True)
+    # Bounds for the adaptive number of pages scanned at once, falls back to the scanner defaults when unset
+    min_concurrency: Mapped[int | None] = db.Column(db.Integer, nullable=True)
+    max_concurrency: Mapped[int | None] = db.Column(db.Integer, nullable=True)
+    # Carry reports of unchanged pages forward on rescans instead of analysing them again
+    incremental_rescan: Mapped[bool] = db.Column(db.Boolean, default=False)
+    # Which requests page loads skip (off, balanced, strict), falls back to the scanner default when unset
+    resource_policy: Mapped[str | None] = db.Column(db.String(20), nullable=True)
+    # How much detail axe collects (full, issues, violations), falls back to the scanner default when unset
+    scan_profile: Mapped[str | None] = db.Column(db.String(20), nullable=True)
+    # Recent page settle timings in ms ({'network': [...], 'dom': [...]}), settle budgets are learned from them
+    settle_stats: Mapped[dict | None] = db.Column(db.JSON, nullable=True)
+    counts: Mapped['WebsiteReportCounts'] = db.relationship('WebsiteReportCounts', uselist=False, lazy=True, cascade="all, delete-orphan")
     created_at: Mapped[datetime] = db.Column(db.DateTime, default=db.func.current_timestamp())
     updated_at: Mapped[datetime] = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
 
@@ -339,6 +505,27 @@ class Website(db.Model):
         all_tags = sorted(set(websiteTags + defaultTags))
         return all_tags 
 
+    def get_concurrency_limits(self) -> tuple[int, int]:
+        """Returns the (min, max) number of pages to scan at once for this website."""
+        min_limit = self.min_concurrency or SCANNER_MIN_CONCURRENCY
+        max_limit = self.max_concurrency or SCANNER_MAX_CONCURRENCY
+        return min_limit, max(min_limit, max_limit)
+
+    def get_resource_policy(self) -> str:
+        return self.resource_policy or SCANNER_RESOURCE_POLICY
+
+    def get_scan_profile(self) -> str:
+        return self.scan_profile or SCANNER_SCAN_PROFILE
+
+    def record_settle_samples(self, network: List[int], dom: List[int]):
+        """Append page settle timings, keeping the most recent SCANNER_SETTLE_HISTORY of each."""
+        stats = self.settle_stats or {}
+        # assign a new dict, JSON columns aren't change tracked in place
+        self.settle_stats = {
+            'network': (list(stats.get('network', [])) + list(network))[-SCANNER_SETTLE_HISTORY:],
+            'dom': (list(stats.get('dom', [])) + list(dom))[-SCANNER_SETTLE_HISTORY:],
+        }
+
     @hybrid_method
     def get_categories(self) -> List[str]:
         if not self.categories:
@@ -350,129 +537,89 @@ class Website(db.Model):
         return func.string_to_array(func.coalesce(cls.categories, ''), ',')
     
     def get_ace_config(self) -> str:
-
-        all_tags = self.get_tags()
-        if not all_tags:
-            print("No tags found for ACE config")
-            return ""
-        
-        filter = [Rule.tags.like(f"%{tag.strip()}%") for tag in all_tags]
-        rules = db.session.query(Rule).filter(Rule.enabled == True, or_(*filter)).distinct().all()
-        print(f"Generating ACE config for website {self.id} with tags {self.tags} found {len(rules)} rules")
-        all_rules = [rule.to_js_object() for rule in rules]
-        all_checks = set()
-        
-        for rule in rules:
-            all_checks.update(rule.getChecksJson())
-
-        config = f"""{{ "checks": [{','.join(list(all_checks))}],"rules": [{','.join(all_rules)}]}}"""
-        return config
+        """The axe-core configuration for the website's tags, see get_compiled_axe_config."""
+        return get_compiled_axe_config(self.get_tags())
 
         
 
     @hybrid_method
     def get_report_counts(self) -> AxeReportCounts | None:
-        sites = self.sites.all()
-        if not sites:
-            sites: List[Site] = []
-
-        total_counts = {
-            'violations': {'total': 0, 'critical': 0, 'serious': 0, 'moderate': 0, 'minor': 0},
-            'inaccessible': {'total': 0, 'critical': 0, 'serious': 0, 'moderate': 0, 'minor': 0},
-            'incomplete': {'total': 0, 'critical': 0, 'serious': 0, 'moderate': 0, 'minor': 0},
-            'passes': {'total': 0, 'critical': 0, 'serious': 0, 'moderate': 0, 'minor': 0}
-        }
-
-        for site in sites:
-            current_report = site.get_recent_report()
-            if current_report and 'report_counts' in current_report:
-                for key in total_counts:
-                    for subkey in total_counts[key]:
-                        total_counts[key][subkey] += current_report['report_counts'][key][subkey]
-
-        return total_counts
+        if 'counts' not in inspect(self).unloaded:
+            # loaded with the website, as listings do
+            return self.counts.to_dict() if self.counts else _nested(WebsiteReportCounts._totals(self.id))
+        return WebsiteReportCounts.get(self.id)
     
     
     @get_report_counts.expression
     def get_report_counts(cls):
-        from sqlalchemy import select, func, cast, Integer
-
-        # Get all site IDs for this website
-        # Subquery: get latest report timestamp per site
-        latest_report_subq = (
-            db.session.query(
-                Report.site_id,
-                func.max(Report.timestamp).label('max_timestamp')
-            )
-            .group_by(Report.site_id)
-            .subquery()
-        )
-       
-        # Join reports to latest_report_subq to get only the latest report per site
-        latest_reports = (
-            db.session.query(Report)
-            .join(
-                latest_report_subq,
-                and_(
-                    Report.site_id == latest_report_subq.c.site_id,
-                    Report.timestamp == latest_report_subq.c.max_timestamp
-                )
-            )
-            .subquery()
-        )
-        
-        # 3. Join: website -> site_website_assoc -> site -> latest_reports
-        result = (
-            db.session.query(
-                Website.id.label('website_id'),
-                func.coalesce(func.sum(func.json_extract(latest_reports.c.report_counts, '$.violations.total')), 0).label('violations_total'),
-                func.coalesce(func.sum(func.json_extract(latest_reports.c.report_counts, '$.violations.critical')), 0).label('violations_critical'),
-                func.coalesce(func.sum(func.json_extract(latest_reports.c.report_counts, '$.violations.serious')), 0).label('violations_serious'),
-                func.coalesce(func.sum(func.json_extract(latest_reports.c.report_counts, '$.violations.moderate')), 0).label('violations_moderate'),
-                func.coalesce(func.sum(func.json_extract(latest_reports.c.report_counts, '$.violations.minor')), 0).label('violations_minor'),
-            )
-            .join(Site_Website_Assoc, Site_Website_Assoc.c.website_id == Website.id)
-            .join(Site, Site.id == Site_Website_Assoc.c.site_id)
-            .join(latest_reports, latest_reports.c.site_id == Site.id)
-            .group_by(Website.id)
+        # the materialized counts, see WebsiteReportCounts
+        return select(
+            WebsiteReportCounts.website_id,
+            *(getattr(WebsiteReportCounts, _column('violations', impact)) for impact in ('total', 'critical', 'serious', 'moderate', 'minor')),
         ).subquery()
 
-        return result
-
 
 
     def get_report(self) -> WebsiteAxeReport:
+        """The latest report of every page, merged by rule.
+
+        Each rule of each result type is listed once with the pages it was found
+        on, most severe first. The reports are read in one query, streamed in
+        batches of WEBSITE_REPORT_BATCH_SIZE, and each is only decoded when it
+        is merged, so one page's axe results are held at a time.
+        """
+        def latest_reports(*columns):
+            return (
+                select(*columns)
+                .join(Site, Site.latest_report_id == Report.id)
+                .join(Site_Website_Assoc, Site_Website_Assoc.c.site_id == Site.id)
+                .where(Site_Website_Assoc.c.website_id == self.id)
+            )
+
+        # streaming holds the connection, MariaDB can't run another query on it until
+        # the stream is read, so the rule dictionaries are loaded up front
+        dictionaries = {
+            version: rule_metadata(version, reload=True)
+            for version in db.session.scalars(latest_reports(Report.axe_version).distinct())
+            if version
+        }
+        reports = db.session.execute(
+            latest_reports(
+                Report.id,
+                Report.axe_version,
+                # the stored bytes, decoded below one report at a time
+                type_coerce(Report.__table__.c.report, LargeBinary).label('report'),
+                Site.url,
+            )
+            .order_by(Site.url),
+            execution_options={'yield_per': WEBSITE_REPORT_BATCH_SIZE},
+        )
+
         report = {}
-        for site in self.sites:
-            current_report = site.get_full_current_report()
-            if current_report:
-                for key in ["violations", "passes", "incomplete", "inapplicable"]:
-                    if key not in report:
-                        # initialize the key with an empty list
-                        report[key] = []
-                    for item in current_report.report.get(key, []):
-                        rule: AxeResult = item
-                        rule_id = rule.get('id')
-                        existing_rule = next((r for r in report[key] if r.get('id') == rule_id), None)
-                        site_report = {
-                            'url': site.url,
-                            'timestamp': current_report.report.get('timestamp'),
-                            'report_id': current_report.id
-                        }
-                        if existing_rule:
-                            existing_rule['reports'].append(site_report)
-                        else:
-                            new_rule = rule.copy()
-                            new_rule['reports'] = [site_report]
-                            report[key].append(new_rule)
-
-        # sort by report cirticality
+        # (result type, rule id) -> the rule's entry in report[result type]
+        rules: Dict[tuple, WebsiteAxeResult] = {}
+        for report_id, axe_version, stored, site_url in reports:
+            axe_report = hydrate_report(axe_version, decompress_json(stored), dictionaries.get(axe_version))
+            site_report = {
+                'url': site_url,
+                'timestamp': axe_report.get('timestamp'),
+                'report_id': report_id
+            }
+            for key in WEBSITE_REPORT_KEYS:
+                results = report.setdefault(key, [])
+                for rule in axe_report.get(key, []):
+                    existing_rule = rules.get((key, rule.get('id')))
+                    if existing_rule:
+                        existing_rule['reports'].append(site_report)
+                    else:
+                        new_rule = rule.copy()
+                        new_rule['reports'] = [site_report]
+                        rules[(key, rule.get('id'))] = new_rule
+                        results.append(new_rule)
+
+        # most severe first, then by rule
         for key in report:
-            report[key].sort(key=lambda x: ('critical' if x.get('impact') == 'critical' else
-                                            'serious' if x.get('impact') == 'serious' else
-                                            'moderate' if x.get('impact') == 'moderate' else
-                                            'minor' if x.get('impact') == 'minor' else
-                                            'none'))
+            report[key].sort(key=lambda rule: (IMPACT_ORDER.get(rule.get('impact'), len(IMPACT_ORDER)), rule.get('id') or ''))
 
         return report
 
@@ -506,6 +653,11 @@ class Website(db.Model):
             'report_counts': self.get_report_counts(),
             'active': self.active,
             'rate_limit': self.rate_limit,
+            'min_concurrency': self.min_concurrency,
+            'max_concurrency': self.max_concurrency,
+            'incremental_rescan': self.incremental_rescan,
+            'resource_policy': self.resource_policy,
+            'scan_profile': self.scan_profile,
             'public': self.public,
             'description': self.description,
             'categories': [cat.strip() for cat in self.categories.split(",")] if self.categories else [],
@@ -583,6 +735,150 @@ class Website(db.Model):
         return f'<Website {self.id} url={self.url} admin={self.admin_id} categories={self.categories} tags={self.tags}>'
 
 
+# (category, impact) of each count in a report's report_counts
+COUNT_KEYS = [
+    (category, impact)
+    for category in ('violations', 'inaccessible', 'incomplete', 'passes')
+    for impact in ('total', 'critical', 'serious', 'moderate', 'minor')
+]
+
+
+def _column(category: str, impact: str) -> str:
+    return f"{category}_{impact}"
+
+
+def _nested(values: dict) -> dict[AxeReportKeys, AxeReportCounts]:
+    counts = {}
+    for category, impact in COUNT_KEYS:
+        counts.setdefault(category, {})[impact] = values.get(_column(category, impact)) or 0
+    return counts
+
+
+class WebsiteReportCounts(db.Model):
+    """
+    The report_counts of a website: the sum of the counts of the latest report
+    of each of its pages.
+
+    Kept up to date as reports are stored (Site.record_reports adds the
+    difference to the previous latest report of the page) and recomputed
+    with refresh when pages join or leave the website, so listings and emails
+    read a single row. Reads never write, a website without a row (created
+    since the rows were filled, with no report yet) has its counts computed.
+    """
+    __tablename__ = 'website_report_counts'
+
+    website_id: Mapped[int] = db.Column(db.Integer, db.ForeignKey('website.id', ondelete='CASCADE'), primary_key=True)
+    violations_total: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    violations_critical: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    violations_serious: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    violations_moderate: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    violations_minor: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    inaccessible_total: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    inaccessible_critical: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    inaccessible_serious: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    inaccessible_moderate: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    inaccessible_minor: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    incomplete_total: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    incomplete_critical: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    incomplete_serious: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    incomplete_moderate: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    incomplete_minor: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    passes_total: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    passes_critical: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    passes_serious: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    passes_moderate: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    passes_minor: Mapped[int] = db.Column(db.Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+
+    def __repr__(self):
+        return f"<WebsiteReportCounts website={self.website_id} violations={self.violations_total}>"
+
+    def to_dict(self) -> dict[AxeReportKeys, AxeReportCounts]:
+        return _nested({_column(*key): getattr(self, _column(*key)) for key in COUNT_KEYS})
+
+    @staticmethod
+    def _ensure_rows(website_ids: List[int]):
+        # concurrent writers may create the same row, the first one wins
+        db.session.execute(
+            insert(WebsiteReportCounts)
+            .prefix_with('IGNORE', dialect='mysql')
+            .prefix_with('IGNORE', dialect='mariadb')
+            .prefix_with('OR IGNORE', dialect='sqlite'),
+            [{'website_id': website_id, **{_column(*key): 0 for key in COUNT_KEYS}} for website_id in website_ids],
+        )
+
+    @staticmethod
+    def get(website_id: int) -> dict[AxeReportKeys, AxeReportCounts]:
+        # the row is updated in SQL, don't trust a copy in the session
+        row = db.session.get(WebsiteReportCounts, website_id, populate_existing=True)
+        if row is None:
+            return _nested(WebsiteReportCounts._totals(website_id))
+        return row.to_dict()
+
+    @staticmethod
+    def _totals(website_id: int) -> dict:
+        """Sum of the latest report counts of the pages of a website, by column."""
+        pages = (
+            select(Site.latest_report_counts)
+            .join(Site_Website_Assoc, Site_Website_Assoc.c.site_id == Site.id)
+            .where(Site_Website_Assoc.c.website_id == website_id)
+        )
+        totals = {_column(*key): 0 for key in COUNT_KEYS}
+        for counts in db.session.execute(pages).scalars():
+            for category, impact in COUNT_KEYS:
+                totals[_column(category, impact)] += (counts or {}).get(category, {}).get(impact, 0)
+        return totals
+
+    @staticmethod
+    def refresh(website_id: int) -> dict[AxeReportKeys, AxeReportCounts]:
+        """Recompute and store the counts of a website from the latest report of each of its pages."""
+        unknown = db.session.execute(
+            select(Site.id)
+            .join(Site_Website_Assoc, Site_Website_Assoc.c.site_id == Site.id)
+            .where(Site_Website_Assoc.c.website_id == website_id, Site.latest_report_id.is_(None))
+        ).scalars().all()
+        Site.repair_latest_reports(unknown)
+        totals = WebsiteReportCounts._totals(website_id)
+
+        WebsiteReportCounts._ensure_rows([website_id])
+        db.session.execute(
+            update(WebsiteReportCounts).where(WebsiteReportCounts.website_id == website_id).values(totals)
+        )
+        return _nested(totals)
+
+    @staticmethod
+    def changes(counts: dict, previous: dict | None = None) -> Dict[str, int]:
+        """The changes of the count columns when a page's previous counts are replaced by new ones."""
+        return {
+            _column(category, impact): (counts or {}).get(category, {}).get(impact, 0) - (previous or {}).get(category, {}).get(impact, 0)
+            for category, impact in COUNT_KEYS
+        }
+
+    @staticmethod
+    def add(changes: Dict[int, Dict[str, int]]):
+        """Add changes of the count columns to the counts of websites, keyed by website id."""
+        if not changes:
+            return
+        existing = set(db.session.execute(
+            select(WebsiteReportCounts.website_id).where(WebsiteReportCounts.website_id.in_(changes))
+        ).scalars())
+        # in website id order, the rows stay locked until the transaction ends
+        for website_id in sorted(changes):
+            if website_id not in existing:
+                # never counted, the new reports are already in the session
+                WebsiteReportCounts.refresh(website_id)
+                continue
+            values = {
+                column: getattr(WebsiteReportCounts, column) + change
+                for column, change in changes[website_id].items() if change
+            }
+            if values:
+                # relative updates, pages of the same website are stored concurrently
+                db.session.execute(
+                    update(WebsiteReportCounts).where(WebsiteReportCounts.website_id == website_id).values(values)
+                )
+
+
 # Domains can only be created by the admins
 class Domain(db.Model):
     __tablename__ = 'domains'
@@ -1,4 +1,7 @@
-from requests import request
+import hashlib
+import os
+import re
+from functools import lru_cache
 from playwright.async_api import Page
 from typing import TypedDict, List, Literal, Optional
 
@@ -62,7 +65,43 @@ class WebsiteAxeReport(TypedDict):
 
 AxeReportKeys = Literal["violations", "passes", "incomplete", "inapplicable"]
 
+# How much detail an axe run collects, per website:
+# - full: every node of every result type
+# - issues: axe resultTypes limits passes and inapplicable to one node per rule
+# - violations: as issues, and the remaining pass/inapplicable nodes are dropped
+#   in the page before the report is serialized
+# Every rule keeps its entry in each result type, so rule counts stay exact.
+ScanProfile = Literal["full", "issues", "violations"]
+SCAN_PROFILES = ("full", "issues", "violations")
 
+# axe-core ships with the scanner, pinned to the version in this file's header
+AXE_SOURCE_PATH = os.path.join(os.path.dirname(__file__), "axe.min.js")
+
+
+@lru_cache(maxsize=1)
+def get_axe_source() -> str:
+    """The bundled axe-core source, read once per process.
+
+    Browser contexts register it as an init script (see
+    scanner/browser/context_pool.py), so axe is defined in every frame before
+    the page's own scripts run, without a network fetch per page.
+    """
+    with open(AXE_SOURCE_PATH, encoding="utf-8") as f:
+        return f.read()
+
+
+@lru_cache(maxsize=1)
+def get_axe_version() -> str:
+    match = re.match(r"/\*! axe v([\w.\-]+)", get_axe_source())
+    return match.group(1) if match else "unknown"
+
+
+
+
+@lru_cache(maxsize=32)
+def get_axe_config_key(axe_config: str) -> str:
+    """Short identifier of a compiled config, recorded in the page once axe is configured with it."""
+    return hashlib.sha1(axe_config.encode()).hexdigest()[:16]
 
 
 def get_axe_config(axe_config:str) -> str:
@@ -70,6 +109,7 @@ def get_axe_config(axe_config:str) -> str:
         return f"""async () => {{
             if (typeof axe.configure === 'function') {{
                 axe.configure({axe_config});
+                window.__a11yAxeConfig = '{get_axe_config_key(axe_config)}';
                 return true;
             }} else {{
                 throw new Error('axe.configure is not a function' + JSON.stringify(axe, null, 4));
@@ -77,15 +117,36 @@ def get_axe_config(axe_config:str) -> str:
         }}"""
     return ""
 
-def get_axe_js(tags: List[str]) -> str:
+
+@lru_cache(maxsize=32)
+def get_axe_config_init_js(axe_config: str) -> str:
+    """Init script applying a compiled config as soon as the bundled axe is defined in a frame.
+
+    A config that fails to apply leaves the key unset, get_accessibility_report
+    then configures the page itself and reports the error.
+    """
+    return f"""
+(() => {{
+    if (!window.axe || typeof axe.configure !== 'function') return;
+    axe.configure({axe_config});
+    window.__a11yAxeConfig = '{get_axe_config_key(axe_config)}';
+}})();
+"""
+
+def get_axe_js(tags: List[str], profile: ScanProfile = "full") -> str:
     tags_str = ', '.join([f"'{tag.strip()}'" for tag in tags])
+    result_types = "" if profile == "full" else "resultTypes: ['violations', 'incomplete'],"
+    # the passed and inapplicable rules still count, only their nodes are dropped
+    drop_nodes = "for (const result of report.passes.concat(report.inapplicable)) result.nodes = [];" if profile == "violations" else ""
     return f"""async () => {{
             const report = await axe.run({{
                 runOnly: {{
                     type: 'tag',
                     values: [{tags_str}]
-                }}
+                }},
+                {result_types}
             }});
+            {drop_nodes}
             
             report.testEngine = 'LCSRAccessibility';
             // convert errors to strings
@@ -110,25 +171,25 @@ def get_axe_js(tags: List[str]) -> str:
             return cleanErrors(report);
             
         }}"""
-async def get_accessibility_report(page: Page, tags:List[str] = ['wcag2a', 'wcag2aa', 'wcag21a', 'wcag21aa'], axe_config: str = "") -> AxeReport:
-    
-    axe_min_js_url = "https://cdnjs.cloudflare.com/ajax/libs/axe-core/4.10.3/axe.min.js"
+async def get_accessibility_report(page: Page, tags:List[str] = ['wcag2a', 'wcag2aa', 'wcag21a', 'wcag21aa'], axe_config: str = "", profile: ScanProfile = "full") -> AxeReport:
+
     try:
-        try:
-            await page.add_script_tag(url=axe_min_js_url)
-        except Exception as e:
-            log_message(f"Error adding axe script tag loading from file: {e}", 'error')
-            # Fallback to loading from CDN manually
-            res = request(method="GET", url=axe_min_js_url)
-            content = res.text
-            await page.add_script_tag(content=content)
-            log_message(f"Loaded axe from manual CDN fallback", 'info')
-
-        await page.wait_for_function("window.axe !== undefined")
-        if axe_config:
+        config_key = get_axe_config_key(axe_config) if axe_config else None
+        state = await page.evaluate(
+            "(version) => ({ loaded: !!window.axe && window.axe.version === version, config: window.__a11yAxeConfig || null })",
+            get_axe_version(),
+        )
+        if not state['loaded']:
+            # the page wasn't opened through a ContextPool, or its own scripts replaced window.axe
+            log_message(f"axe {get_axe_version()} not registered on {page.url}, injecting it", 'debug')
+            await page.evaluate(get_axe_source())
+            state['config'] = None
+
+        # unless the context's init script configured the page already
+        if axe_config and state['config'] != config_key:
             await page.evaluate(get_axe_config(axe_config))
 
-        result: AxeReport = await page.evaluate(get_axe_js(tags))
+        result: AxeReport = await page.evaluate(get_axe_js(tags, profile))
         return result
     except Exception as e:
         log_message(f"Error injecting or running axe-core: {e}", 'error')
@@ -0,0 +1,145 @@
+"""
+Browser contexts reused across the pages of a crawl.
+
+Creating a context per page costs a round trip to the browser and, since the
+contexts were never closed, kept every one of them alive until the browser
+went away. A ContextPool hands each page a context from a small idle list
+instead. Between pages the context is reset: cookies are cleared, and before
+its page closes the page's local/session storage, IndexedDB databases and
+Cache Storage are wiped. Service workers are blocked so none outlive a page.
+The HTTP cache is kept on purpose, pages of one website share most assets.
+
+A context is closed instead of reused once it has served ``max_pages`` pages,
+or when the JS heap of its last page grew more than ``max_heap_growth`` MB
+past the first page it served. Everything still open is closed with the pool.
+
+When the pool has a ResourcePolicy, every context it creates routes its
+requests through it. Contexts also get init scripts for the bundled axe-core
+and the crawl's compiled axe config (scanner/accessibility/ace.py), and for
+the settle observer (scanner/browser/wait.py).
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List
+
+from playwright.async_api import Browser, BrowserContext, Page
+
+from config import SCANNER_CONTEXT_MAX_HEAP_GROWTH, SCANNER_CONTEXT_MAX_PAGES
+from scanner.accessibility.ace import get_axe_config_init_js, get_axe_source
+from scanner.browser.resources import ResourcePolicy
+from scanner.browser.wait import SETTLE_INIT_JS
+from scanner.log import log_message
+
+ACCESSIBILITY_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3 LCSRAccessibility/1.0"
+
+# Clears the storage the page's origin left behind, returns the JS heap in use (Chromium only)
+_RESET_PAGE_JS = """async () => {
+    try { localStorage.clear(); } catch (e) {}
+    try { sessionStorage.clear(); } catch (e) {}
+    try {
+        if (indexedDB.databases) {
+            for (const db of await indexedDB.databases()) indexedDB.deleteDatabase(db.name);
+        }
+    } catch (e) {}
+    try {
+        for (const key of await caches.keys()) await caches.delete(key);
+    } catch (e) {}
+    return (performance.memory && performance.memory.usedJSHeapSize) || 0;
+}"""
+
+_MB = 1024 * 1024
+
+
+class PooledContext():
+
+    def __init__(self, context: BrowserContext):
+        self.context = context
+        self.pages = 0
+        # JS heap of the first page served, the baseline for the growth check
+        self.baseline_heap: int | None = None
+
+
+class ContextPool():
+
+    def __init__(self, browser: Browser, max_pages: int = SCANNER_CONTEXT_MAX_PAGES, max_heap_growth: float = SCANNER_CONTEXT_MAX_HEAP_GROWTH, policy: ResourcePolicy | None = None, axe_config: str = ""):
+        self.browser = browser
+        self.axe_config = axe_config
+        self.policy = policy
+        self.max_pages = max(1, max_pages)
+        self.max_heap_growth = max_heap_growth * _MB
+        self._idle: List[PooledContext] = []
+        self._leased: List[PooledContext] = []
+        self.created = 0
+        self.recycled = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def acquire(self) -> PooledContext:
+        if self._idle:
+            pooled = self._idle.pop()
+        else:
+            context = await self.browser.new_context(user_agent=ACCESSIBILITY_USER_AGENT, service_workers='block')
+            await context.add_init_script(get_axe_source())
+            if self.axe_config:
+                await context.add_init_script(get_axe_config_init_js(self.axe_config))
+            await context.add_init_script(SETTLE_INIT_JS)
+            if self.policy is not None:
+                await self.policy.attach(context)
+            pooled = PooledContext(context)
+            self.created += 1
+        self._leased.append(pooled)
+        return pooled
+
+    async def release(self, pooled: PooledContext, page: Page | None = None):
+        """Reset a context after a page and return it to the pool, or close it when it's due for recycling."""
+        self._leased.remove(pooled)
+        pooled.pages += 1
+        reusable = pooled.pages < self.max_pages
+        try:
+            if page is not None and not page.is_closed():
+                heap = await page.evaluate(_RESET_PAGE_JS)
+                await page.close()
+                if pooled.baseline_heap is None:
+                    pooled.baseline_heap = heap
+                elif heap - pooled.baseline_heap > self.max_heap_growth:
+                    log_message(f"Recycling browser context, JS heap grew {(heap - pooled.baseline_heap) / _MB:.0f}MB over {pooled.pages} pages", 'debug')
+                    reusable = False
+            await pooled.context.clear_cookies()
+        except Exception as e:
+            # a crashed or wedged page makes the whole context suspect
+            log_message(f"Could not reset browser context, closing it: {e}", 'debug')
+            reusable = False
+
+        if reusable and self.browser.is_connected():
+            self._idle.append(pooled)
+        else:
+            self.recycled += 1
+            await self._close_context(pooled)
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """A new page in a pooled context, closed and reset on exit."""
+        pooled = await self.acquire()
+        page = None
+        try:
+            page = await pooled.context.new_page()
+            yield page
+        finally:
+            await self.release(pooled, page)
+
+    async def _close_context(self, pooled: PooledContext):
+        try:
+            await pooled.context.close()
+        except Exception:
+            pass
+
+    async def close(self):
+        if self.created:
+            log_message(f"Browser context pool used {self.created} context(s), recycled {self.recycled}", 'debug')
+        for pooled in self._idle + self._leased:
+            await self._close_context(pooled)
+        self._idle = []
+        self._leased = []
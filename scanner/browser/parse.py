@@ -1,69 +1,56 @@
-from typing import List
+from typing import List, TypedDict
 
-from scanner.accessibility.ace import get_accessibility_report
 from playwright.async_api import Page
 
-from utils.urls import get_full_url, get_netloc, get_website_url
-
-
-def get_link_js(website):
-    """JavaScript function to extract links from the page. 
-       It filters out links that are not part of the same website and removes duplicates and certain file types.
-       
-       
-       Notes: used to find all the pages on a url.
-    """
-    
-    return f"""() => {{
-        var aTags = Array.from(document.querySelectorAll('a'));
-        var links = aTags.filter(a => a.href.startsWith('{website}') || a.href.startsWith('/')).map(a=> a.href).filter(a => !a.includes('#')).filter(a =>!(a == '{website}' ||  a == '{website}/')).filter((value, index, self) => self.indexOf(value) === index);
-        
-        links = links.map(l => {{
-            if (!l) return l;
-            
-            l = l.trim();
-            
-            // remove parameters from url, This helps to reduce duplicate urls and unnecessary scans
-            l = l.split('?')[0];
-
-            if (l.startsWith('{website}')) {{
-                return l;
-            }}
-            if (l.startsWith('/')) {{
-                return '{website}' + l;
-            }}
-            return l;
-        }}).filter(l => !/(.png|.jpg|.jpeg|.gif|.svg|.zip|.mp4|.webm|.pdf|.doc|.docx|.xls|.xlsx|.pptx|.ppt|.yaml|.yml)$/.test(l))
-        return links;
-}}"""
-
-def get_videos_js():
-    return f"""() => {{
-        var videoTags = Array.from(document.querySelectorAll('video'));
-        var links = videoTags.map(v => {{
-            var src = v.src || v.currentSrc;
-            return src;
-        }}).filter((value, index, self) => self.indexOf(value) === index);
-        return links;
-}}"""
-
-def get_imgs_js():
-    return f"""() => {{
-        var imgTags = Array.from(document.querySelectorAll('img'));
-        var links = imgTags.map(img => img.src).filter((value, index, self) => self.indexOf(value) === index);
-        return links;
-}}"""
-
-
-async def get_links(page:  Page) -> List[str]:
-    current_page = get_website_url(page.url)
-    links = await page.evaluate(get_link_js(current_page))
-    return links
-
-async def get_videos(page: Page) -> List[str]:
-    videos = await page.evaluate(get_videos_js())
-    return videos
-
-async def get_imgs(page: Page) -> List[str]:
-    imgs = await page.evaluate(get_imgs_js())
-    return imgs
\ No newline at end of file
+from utils.urls import get_website_url
+
+# Links to documents and media files aren't pages to crawl
+SKIPPED_FILES_PATTERN = r"\.(png|jpg|jpeg|gif|svg|zip|mp4|webm|pdf|doc|docx|xls|xlsx|pptx|ppt|yaml|yml)$"
+
+
+class PageMetadata(TypedDict):
+    links: List[str]
+    videos: List[str]
+    imgs: List[str]
+    has_video: bool
+    has_img: bool
+
+
+PAGE_METADATA_JS = """
+([website, skippedFiles]) => {
+    const skipped = new RegExp(skippedFiles);
+
+    // Links to pages of the same website, used to find all the pages on a url.
+    // Anchors are skipped, and parameters are removed which helps to reduce
+    // duplicate urls and unnecessary scans.
+    const links = new Set();
+    for (const a of document.querySelectorAll('a[href]')) {
+        let href = a.href.trim();
+        if (!href.startsWith(website) || href.includes('#')) continue;
+        href = href.split('?')[0];
+        if (href === website || href === website + '/' || skipped.test(href)) continue;
+        links.add(href);
+    }
+
+    const videoTags = document.querySelectorAll('video');
+    const videos = new Set();
+    for (const v of videoTags) videos.add(v.src || v.currentSrc);
+
+    const imgTags = document.querySelectorAll('img');
+    const imgs = new Set();
+    for (const img of imgTags) imgs.add(img.src);
+
+    return {
+        links: Array.from(links),
+        videos: Array.from(videos),
+        imgs: Array.from(imgs),
+        has_video: videoTags.length > 0,
+        has_img: imgTags.length > 0,
+    };
+}
+"""
+
+
+async def get_page_metadata(page: Page) -> PageMetadata:
+    """Links, videos and images of a page, collected in one round trip."""
+    return await page.evaluate(PAGE_METADATA_JS, [get_website_url(page.url), SKIPPED_FILES_PATTERN])
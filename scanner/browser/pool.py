@@ -0,0 +1,220 @@
+"""
+Worker-lifetime Chromium pool.
+
+Each Celery worker process owns a single BrowserPool, started from the
+``worker_process_init`` signal (see scanner/tasks.py). Scan tasks lease a
+browser from the pool instead of launching Playwright + Chromium themselves,
+so a single page rescan no longer pays seconds of browser startup.
+
+Playwright objects are bound to the event loop that created them, so the pool
+also owns the event loop every scan task runs on. Tasks should go through
+``run_async`` instead of creating their own loop. It cancels whatever a task
+leaves running on the loop (a soft time limit or an error interrupts a crawl
+with its workers still pending), so nothing of it resumes in the next task.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Coroutine, List, Set, TypeVar
+
+from playwright.async_api import Browser, Playwright, async_playwright
+
+from config import SCANNER_BROWSER_POOL_SIZE
+from scanner.log import log_message
+
+CHROMIUM_ARGS = ['--no-sandbox', '--disable-setuid-sandbox']
+# Seconds tasks left behind by a run get to finish their cleanup once cancelled
+CANCEL_TIMEOUT = 30
+
+T = TypeVar('T')
+
+
+async def launch_browser(playwright: Playwright) -> Browser:
+    return await playwright.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+
+
+class BrowserPool():
+    """A fixed number of long-lived browsers handed out one lease at a time."""
+
+    def __init__(self, size: int = SCANNER_BROWSER_POOL_SIZE):
+        self.size = max(1, size)
+        self.loop = asyncio.new_event_loop()
+        self._playwright: Playwright | None = None
+        self._idle: asyncio.Queue[Browser] | None = None
+        self._browsers: List[Browser] = []
+        # tasks of the Playwright driver connection, they outlive every run
+        self._own: Set[asyncio.Task] = set()
+
+    def start(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self._start())
+
+    def close(self):
+        try:
+            self.loop.run_until_complete(self._close())
+        finally:
+            self.loop.close()
+
+    async def _start_playwright(self):
+        before = asyncio.all_tasks()
+        self._playwright = await async_playwright().start()
+        self._own = {task for task in self._own if not task.done()} | (asyncio.all_tasks() - before)
+
+    async def _start(self):
+        await self._start_playwright()
+        self._idle = asyncio.Queue()
+        for _ in range(self.size):
+            browser = await launch_browser(self._playwright)
+            self._browsers.append(browser)
+            self._idle.put_nowait(browser)
+        log_message(f"Browser pool started with {self.size} browser(s)", 'info')
+
+    async def _close(self):
+        for browser in self._browsers:
+            try:
+                await browser.close()
+            except Exception as e:
+                log_message(f"Error closing pooled browser: {e}", 'warning')
+        self._browsers = []
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _relaunch(self, browser: Browser) -> Browser:
+        """Replace a crashed browser, restarting the Playwright driver if it died too."""
+        if browser in self._browsers:
+            self._browsers.remove(browser)
+        try:
+            await browser.close()
+        except Exception:
+            pass
+
+        try:
+            replacement = await launch_browser(self._playwright)
+        except Exception as e:
+            log_message(f"Relaunch failed ({e}), restarting Playwright", 'warning')
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            await self._start_playwright()
+            replacement = await launch_browser(self._playwright)
+
+        self._browsers.append(replacement)
+        return replacement
+
+    async def _healthy(self, browser: Browser) -> Browser:
+        if browser.is_connected():
+            return browser
+        log_message("Pooled browser is no longer connected, relaunching", 'warning')
+        return await self._relaunch(browser)
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[Browser]:
+        browser = await self._idle.get()
+        try:
+            browser = await self._healthy(browser)
+        except Exception:
+            # keep the pool at full size, the next lease will retry the launch
+            self._idle.put_nowait(browser)
+            raise
+
+        try:
+            yield browser
+        finally:
+            # Don't hand contexts left behind by this task to the next lease
+            if browser.is_connected():
+                for context in list(browser.contexts):
+                    try:
+                        await context.close()
+                    except Exception:
+                        pass
+            self._idle.put_nowait(browser)
+
+
+_pool: BrowserPool | None = None
+
+
+def get_browser_pool() -> BrowserPool | None:
+    return _pool
+
+
+def init_browser_pool(size: int = SCANNER_BROWSER_POOL_SIZE) -> BrowserPool | None:
+    """Start the pool for this process. On failure tasks fall back to launching their own browser."""
+    global _pool
+    if _pool is not None:
+        return _pool
+    pool = BrowserPool(size=size)
+    try:
+        pool.start()
+    except Exception as e:
+        log_message(f"Could not start browser pool, scans will launch their own browser: {e}", 'error')
+        try:
+            pool.close()
+        except Exception:
+            pass
+        return None
+    _pool = pool
+    return _pool
+
+
+def shutdown_browser_pool():
+    global _pool
+    if _pool is None:
+        return
+    pool, _pool = _pool, None
+    try:
+        pool.close()
+    except Exception as e:
+        log_message(f"Error shutting down browser pool: {e}", 'warning')
+
+
+def cancel_leftover_tasks(loop: asyncio.AbstractEventLoop, keep: Set[asyncio.Task] = frozenset()):
+    """Cancel the tasks pending on a loop that isn't running, except the ones to keep, and wait for them."""
+    leftovers = [task for task in asyncio.all_tasks(loop) if task not in keep]
+    if not leftovers:
+        return
+    for task in leftovers:
+        task.cancel()
+    try:
+        loop.run_until_complete(asyncio.wait_for(asyncio.gather(*leftovers, return_exceptions=True), CANCEL_TIMEOUT))
+    except asyncio.TimeoutError:
+        log_message(f"Tasks left by the previous run did not finish within {CANCEL_TIMEOUT}s of being cancelled", 'warning')
+    log_message(f"Cancelled {len(leftovers)} task(s) left running by the previous run", 'warning')
+
+
+def run_async(coro: Coroutine[None, None, T]) -> T:
+    """Run a coroutine to completion on the pool's loop, or on a throwaway loop when there is no pool.
+
+    The tasks it leaves running, when it fails or is interrupted, are cancelled.
+    """
+    if _pool is not None:
+        asyncio.set_event_loop(_pool.loop)
+        try:
+            return _pool.loop.run_until_complete(coro)
+        finally:
+            cancel_leftover_tasks(_pool.loop, keep=_pool._own)
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        try:
+            cancel_leftover_tasks(loop)
+        finally:
+            loop.close()
+
+
+@asynccontextmanager
+async def lease_browser() -> AsyncIterator[Browser]:
+    """Lease a pooled browser, or launch a temporary one outside of a pooled worker (CLI, tests)."""
+    if _pool is not None and _pool.loop is asyncio.get_running_loop():
+        async with _pool.lease() as browser:
+            yield browser
+    else:
+        async with async_playwright() as p:
+            browser = await launch_browser(p)
+            try:
+                yield browser
+            finally:
+                await browser.close()
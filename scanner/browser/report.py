@@ -1,18 +1,19 @@
 
 from datetime import datetime, timezone
 from typing import List, TypedDict
-from scanner.accessibility.ace import AxeReport, get_accessibility_report
-from scanner.browser.parse import  get_imgs, get_links, get_videos
+from scanner.accessibility.ace import AxeReport, ScanProfile, get_accessibility_report, get_axe_version
+from scanner.browser.parse import get_page_metadata
 from playwright.async_api import Browser
 import time 
-from scanner.browser.tabbable import is_page_tabbable
-from scanner.browser.wait import wait_for_page_settled
+from config import SCREENSHOT_MAX_HEIGHT
+from scanner.browser.context_pool import ACCESSIBILITY_USER_AGENT, ContextPool
+from scanner.browser.tabbable import TabOrder, analyze_tab_order
+from scanner.browser.wait import SettleTracker, wait_for_page_settled
 from scanner.log import log_message
 from utils.style_generator import report_to_js
+from utils.screenshots import store_screenshot_async
 from utils.urls import get_website_url
 
-ACCESSIBILITY_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3 LCSRAccessibility/1.0"
-
 class AccessibilityReport(TypedDict, total=False):
     url: str
     response_code: int
@@ -23,9 +24,16 @@ class AccessibilityReport(TypedDict, total=False):
     videos: List[str]
     imgs: List[str]
     tabable: bool
+    tab_order: TabOrder
     timestamp: str
     photo: bytes
+    # key of the screenshot in the content-addressed store, see utils/screenshots.py
+    photo_key: str
     tags: List[str]
+    # version of the bundled axe-core that produced the report
+    axe_version: str
+    # set when an incremental rescan kept the previous report of an unchanged page
+    carried_forward: bool
     
 class AccessibilitySummary(TypedDict, total=False):
     """
@@ -42,61 +50,80 @@ class AccessibilitySummary(TypedDict, total=False):
 
 
 
+async def _store_screenshot(page) -> str | None:
+    """Full-page screenshot capped at SCREENSHOT_MAX_HEIGHT, encoded and stored off the event loop."""
+    try:
+        height = await page.evaluate("() => document.documentElement.scrollHeight")
+        viewport = page.viewport_size or {'width': 1280}
+        clip = None
+        if SCREENSHOT_MAX_HEIGHT and height > SCREENSHOT_MAX_HEIGHT:
+            clip = {'x': 0, 'y': 0, 'width': viewport['width'], 'height': SCREENSHOT_MAX_HEIGHT}
+        png = await page.screenshot(full_page=True, clip=clip)
+        return await store_screenshot_async(png)
+    except Exception as e:
+        # the report is still worth keeping without its screenshot
+        log_message(f"Could not store screenshot of {page.url}: {e}", 'warning')
+        return None
+
+
 # Generates a AccessibilityReport for a given site
-async def generate_report(browser: Browser, website: str = "https://cs.rutgers.edu", tags: List[str] = [], ace_config: str = "") -> AccessibilityReport:
+async def generate_report(browser: Browser, website: str = "https://cs.rutgers.edu", tags: List[str] = [], ace_config: str = "", contexts: ContextPool | None = None, settle: SettleTracker | None = None, profile: ScanProfile = "full") -> AccessibilityReport:
+    """Scan one page. Crawls pass their ContextPool, otherwise a one-off context is used and closed."""
     result = AccessibilityReport()
     result['timestamp'] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    pool = contexts or ContextPool(browser, max_pages=1, axe_config=ace_config)
     try:
-        context = await browser.new_context(user_agent=ACCESSIBILITY_USER_AGENT)
-        page = await context.new_page()
-        res = await page.goto(website, wait_until="domcontentloaded")
-        result['url'] = website
-        result['response_code'] = res.status if res else 0
-        if res is None or res.status >= 400:
-            await page.close()
-            result['error'] = f"Failed to load page, status code: {res.status if res else 'No Response'}"
-            return result
-        await wait_for_page_settled(page)
-    except Exception as e:
-        return {"error": str(e)}
+        async with pool.page() as page:
+            try:
+                res = await page.goto(website, wait_until="domcontentloaded")
+                result['url'] = website
+                result['response_code'] = res.status if res else 0
+                if res is None or res.status >= 400:
+                    result['error'] = f"Failed to load page, status code: {res.status if res else 'No Response'}"
+                    return result
+                await wait_for_page_settled(page, tracker=settle)
+            except Exception as e:
+                return {"error": str(e)}
 
-    try:
-        base_url = get_website_url(page.url)
-        report = await get_accessibility_report(page, tags=tags, axe_config=ace_config)
-        if 'error' in report and report['error'] is not None:
-            await page.close()
-            return {"error": report['error']}
-        links = await get_links(page)
-        videos = await get_videos(page)
-        imgs = await get_imgs(page)
+            try:
+                base_url = get_website_url(page.url)
+                report = await get_accessibility_report(page, tags=tags, axe_config=ace_config, profile=profile)
+                if 'error' in report and report['error'] is not None:
+                    return {"error": report['error']}
+                metadata = await get_page_metadata(page)
 
-        tabable = await is_page_tabbable(page)
-        has_video = await page.evaluate("() => { return !!document.querySelector('video'); }")
-        has_img = await page.evaluate("() => { return !!document.querySelector('img'); }")
-        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+                tab_order = await analyze_tab_order(page)
+                timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
-        js_report = report_to_js(report['violations'], page.url, report_mode=True)
-        context = await page.evaluate(f"(function () {{ {js_report} }})()")
-        
-        photo = await page.screenshot(full_page=True)
+                js_report = report_to_js(report['violations'], page.url, report_mode=True)
+                context = await page.evaluate(f"(function () {{ {js_report} }})()")
+                
+                photo_key = await _store_screenshot(page)
 
-        await page.close()
-        # Process the report as needed
-        
-        result['base_url'] = base_url
-        result['report'] = report
-        result['links'] = links
-        result['videos'] = videos
-        result['imgs'] = imgs
-        result['tabable'] = tabable
-        result['has_video'] = has_video
-        result['has_img'] = has_img
-        result['timestamp'] = timestamp
-        result['photo'] = photo
-        result['tags'] = tags or []
+                # Process the report as needed
+                
+                result['base_url'] = base_url
+                result['report'] = report
+                result['links'] = metadata['links']
+                result['videos'] = metadata['videos']
+                result['imgs'] = metadata['imgs']
+                result['tabable'] = tab_order['tabbable']
+                result['tab_order'] = tab_order
+                result['has_video'] = metadata['has_video']
+                result['has_img'] = metadata['has_img']
+                result['timestamp'] = timestamp
+                result['photo'] = None
+                result['photo_key'] = photo_key
+                result['tags'] = tags or []
+                result['axe_version'] = get_axe_version()
 
-        return result
+                return result
+            except Exception as e:
+                log_message(f"Error generating report for {website}: {e}", 'error')
+                return {"error": str(e)}
     except Exception as e:
-        await page.close()
-        log_message(f"Error generating report for {website}: {e}", 'error')
-        return {"error": str(e)}
\ No newline at end of file
+        # the browser couldn't give us a page at all
+        return {"error": str(e)}
+    finally:
+        if contexts is None:
+            await pool.close()
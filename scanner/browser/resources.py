@@ -0,0 +1,129 @@
+"""
+Request interception policies for page loads.
+
+A scan only needs what axe looks at: the DOM, CSS and layout. Media bodies,
+analytics beacons and ad networks add bytes and keep the network busy (long
+polling analytics used to hold ``networkidle`` for its full timeout), so the
+context pool routes every request through a ResourcePolicy:
+
+- ``off``: load everything
+- ``balanced``: abort audio/video bodies, beacons and event streams, and stub
+  scripts and requests of known analytics and ad hosts with empty responses
+  so pages that call them don't break
+- ``strict``: balanced, plus web fonts and text tracks are aborted and image
+  bodies are replaced with a 1x1 transparent GIF. ``<img>`` elements and their
+  alt text stay in the DOM, but images without width/height attributes lose
+  their intrinsic size, which can shift layout
+
+Blocked requests are never sent, so their size is unknown. The counters report
+the requests saved per category, and the bytes actually loaded (from response
+Content-Length), which is what drops when a policy is tightened.
+"""
+import base64
+from typing import Dict, Literal
+from urllib.parse import urlparse
+
+from playwright.async_api import Request, Response, Route
+
+from scanner.log import log_message
+
+PolicyName = Literal['off', 'balanced', 'strict']
+POLICIES = ('off', 'balanced', 'strict')
+
+# Analytics, tag managers, session recorders and ad networks, matched on the host suffix
+TRACKER_HOSTS = (
+    'google-analytics.com', 'analytics.google.com', 'googletagmanager.com', 'googletagservices.com',
+    'doubleclick.net', 'googlesyndication.com', 'googleadservices.com', 'adservice.google.com',
+    'facebook.net', 'connect.facebook.net', 'hotjar.com', 'hotjar.io', 'clarity.ms',
+    'segment.io', 'segment.com', 'mixpanel.com', 'fullstory.com', 'newrelic.com', 'nr-data.net',
+    'quantserve.com', 'scorecardresearch.com', 'adnxs.com', 'taboola.com', 'outbrain.com',
+    'criteo.com', 'criteo.net', 'amazon-adsystem.com', 'bat.bing.com', 'ads.linkedin.com',
+    'px.ads.linkedin.com', 'snap.licdn.com', 'siteimproveanalytics.com', 'siteimproveanalytics.io',
+)
+
+_BALANCED_ABORT = {'media', 'ping', 'eventsource'}
+_STRICT_ABORT = _BALANCED_ABORT | {'font', 'texttrack'}
+_TRANSPARENT_GIF = base64.b64decode("R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7")
+
+
+def is_tracker(url: str) -> bool:
+    host = (urlparse(url).hostname or '').lower()
+    return any(host == tracker or host.endswith('.' + tracker) for tracker in TRACKER_HOSTS)
+
+
+class ResourcePolicy():
+    """Decides per request whether to load, abort or stub it, and counts what it saved."""
+
+    def __init__(self, name: PolicyName = 'off'):
+        if name not in POLICIES:
+            log_message(f"Unknown resource policy {name!r}, using 'off'", 'warning')
+            name = 'off'
+        self.name = name
+        self.aborted: Dict[str, int] = {}
+        self.stubbed: Dict[str, int] = {}
+        self.loaded_requests = 0
+        self.loaded_bytes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.name != 'off'
+
+    def decide(self, resource_type: str, url: str) -> Literal['continue', 'abort', 'stub']:
+        if not self.enabled:
+            return 'continue'
+        if is_tracker(url):
+            return 'stub'
+        if resource_type == 'document':
+            return 'continue'
+        aborted = _STRICT_ABORT if self.name == 'strict' else _BALANCED_ABORT
+        if resource_type in aborted:
+            return 'abort'
+        if self.name == 'strict' and resource_type == 'image':
+            return 'stub'
+        return 'continue'
+
+    async def handle(self, route: Route, request: Request):
+        resource_type = request.resource_type
+        action = self.decide(resource_type, request.url)
+        try:
+            if action == 'abort':
+                self.aborted[resource_type] = self.aborted.get(resource_type, 0) + 1
+                await route.abort('blockedbyclient')
+            elif action == 'stub':
+                self.stubbed[resource_type] = self.stubbed.get(resource_type, 0) + 1
+                await route.fulfill(**self._stub(resource_type))
+            else:
+                await route.continue_()
+        except Exception as e:
+            # the page navigated away or closed while the request was pending
+            log_message(f"Could not route {request.url}: {e}", 'debug')
+
+    def _stub(self, resource_type: str) -> dict:
+        if resource_type == 'image':
+            return {'status': 200, 'content_type': 'image/gif', 'body': _TRANSPARENT_GIF}
+        if resource_type == 'script':
+            return {'status': 200, 'content_type': 'application/javascript', 'body': ''}
+        return {'status': 204, 'body': ''}
+
+    def on_response(self, response: Response):
+        self.loaded_requests += 1
+        try:
+            self.loaded_bytes += int(response.headers.get('content-length', 0))
+        except ValueError:
+            pass
+
+    async def attach(self, context):
+        """Route every request of a browser context through this policy."""
+        context.on("response", self.on_response)
+        if self.enabled:
+            await context.route("**/*", self.handle)
+
+    def stats(self) -> dict:
+        return {
+            'policy': self.name,
+            'aborted': dict(self.aborted),
+            'stubbed': dict(self.stubbed),
+            'requests_saved': sum(self.aborted.values()) + sum(self.stubbed.values()),
+            'loaded_requests': self.loaded_requests,
+            'loaded_bytes': self.loaded_bytes,
+        }
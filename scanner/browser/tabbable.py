@@ -1,37 +1,217 @@
+"""
+Sequential focus order of a page.
+
+The order is computed by one in-page script instead of pressing Tab and
+reading ``document.activeElement`` once per step (up to 10,000 round trips).
+The script follows the browser's rules closely enough to predict where Tab
+goes next: focusable elements that are rendered, enabled, not inert and not
+in a closed <details>, with positive tabindex values first (ascending, then
+document order) followed by everything else in document order. Like the
+browser, it orders each document, open shadow root and slot on its own and
+puts the result where its host, slot or iframe sits. An iframe with
+focusable content isn't a stop itself, Tab goes straight into it.
+
+A few real Tab presses then validate the prediction. Each sampled element is
+focused and Tab is pressed once. Focus staying on the element means a focus
+trap (a keydown handler swallowing Tab). Focus landing somewhere other than
+the predicted next element is counted as a mismatch, e.g. a script moving
+focus around.
+"""
+from typing import List, TypedDict
+
 from playwright.async_api import Page
 
+from config import SCANNER_TAB_SAMPLES
+
+# Most elements of the order kept in the report, the count is always exact
+MAX_ORDER = 500
+
+
+class TabOrder(TypedDict):
+    # number of elements in the sequential focus order
+    count: int
+    # short descriptors (tag#id.class) of the first MAX_ORDER elements, in order
+    order: List[str]
+    # elements with a positive tabindex, which override the document order
+    positive_tabindex: int
+    # elements where a real Tab press didn't move focus
+    traps: List[str]
+    # sampled Tab presses and how many landed somewhere other than predicted
+    validated: int
+    mismatches: int
+    # the page can be navigated with Tab: something is focusable and no trap was found
+    tabbable: bool
+
+
+_TAB_ORDER_JS = """
+(maxOrder) => {
+    const FOCUSABLE = 'a[href], area[href], button, input, select, textarea, iframe, summary, ' +
+        '[tabindex], [contenteditable]:not([contenteditable="false"]), audio[controls], video[controls]';
+
+    const rendered = (el) => {
+        if (el.closest('[inert]')) return false;
+        const style = el.ownerDocument.defaultView.getComputedStyle(el);
+        if (style.visibility === 'hidden' || style.visibility === 'collapse') return false;
+        return el.getClientRects().length > 0;
+    };
+
+    const inClosedDetails = (el) => {
+        const details = el.parentElement && el.parentElement.closest('details:not([open])');
+        if (!details) return false;
+        // the summary of a closed details element stays focusable
+        return !(el.tagName === 'SUMMARY' && el.parentElement === details);
+    };
+
+    const tabIndexOf = (el) => {
+        if (el.tagName === 'SUMMARY' && !(el.parentElement && el.parentElement.tagName === 'DETAILS' &&
+            el.parentElement.querySelector(':scope > summary') === el) && !el.hasAttribute('tabindex')) {
+            return -1;
+        }
+        return el.tabIndex;
+    };
+
+    const focusable = (el) => {
+        if (!el.matches(FOCUSABLE) || el.disabled) return false;
+        if (el.tagName === 'INPUT' && el.type === 'hidden') return false;
+        if (tabIndexOf(el) < 0) return false;
+        return !inClosedDetails(el) && rendered(el);
+    };
+
+    // Shadow hosts and slots without a tabindex of their own take their place in document order
+    const ownerTabIndex = (el) => focusable(el) ? tabIndexOf(el) : (el.hasAttribute('tabindex') ? el.tabIndex : 0);
+
+    // Positive tabindex first, then document order, within one document, shadow root or slot.
+    // An entry is an element and the order of the scope it owns, if any.
+    const ordered = (entries) => {
+        const positive = entries.filter(entry => entry.tabIndex > 0).sort((a, b) => a.tabIndex - b.tabIndex);
+        const order = [];
+        for (const entry of positive.concat(entries.filter(entry => entry.tabIndex === 0))) {
+            if (entry.el) order.push(entry.el);
+            if (entry.inner) order.push(...entry.inner);
+        }
+        return order;
+    };
+
+    const visit = (el, entries) => {
+        if (el.tagName === 'IFRAME') {
+            let inner = [];
+            try {
+                const doc = el.contentDocument;
+                if (doc) inner = scope(doc.body ? [doc.body] : [], true);
+            } catch (e) {}
+            // Tab goes straight to the first element of a frame, the frame itself is only a stop when it has none
+            if (inner.length) entries.push({ el: null, inner, tabIndex: el.tabIndex });
+            else if (focusable(el)) entries.push({ el, inner: null, tabIndex: tabIndexOf(el) });
+            return;
+        }
+        if (el.tagName === 'SLOT' && el.getRootNode().nodeType === Node.DOCUMENT_FRAGMENT_NODE) {
+            // assigned elements, or the fallback content when nothing is assigned
+            entries.push({ el: null, inner: scope(el.assignedElements({ flatten: true }), false), tabIndex: ownerTabIndex(el) });
+            return;
+        }
+        if (el.shadowRoot) {
+            // the light children are reached through the slots of the shadow root
+            entries.push({ el: focusable(el) ? el : null, inner: scope([el.shadowRoot], true), tabIndex: ownerTabIndex(el) });
+            return;
+        }
+        if (focusable(el)) entries.push({ el, inner: null, tabIndex: tabIndexOf(el) });
+        for (const child of el.children) visit(child, entries);
+    };
 
-async def _get_current_focus(page: Page) -> str:
-    return await page.evaluate("""
-            () => {
-                const el = document.activeElement;
-                if (!el) return null;
-                return {
-                    tag: el.tagName,
-                    id: el.id,
-                    class: el.className,
-                    type: el.type || null,
-                    name: el.name || null,
-                    value: el.value || null,
-                    html: el.innerHTML || null
-                };
-            }
-        """)
-
-timeout_count = 10000
-
-async def is_page_tabbable(page:Page)-> bool:
-    count = timeout_count
-    await page.keyboard.press('Tab')
-    begin_element = await _get_current_focus(page)
-    while count > 0:
-        count -= 1
+    // The order of a scope given its roots, a root's own element is skipped for documents and shadow roots
+    const scope = (roots, childrenOnly) => {
+        const entries = [];
+        for (const root of roots) {
+            if (childrenOnly) for (const child of root.children) visit(child, entries);
+            else visit(root, entries);
+        }
+        return ordered(entries);
+    };
+
+    const root = document.body || document.documentElement;
+    const order = scope([root], true);
+    const positive = order.filter(el => el.tabIndex > 0);
+    window.__a11yTabOrder = order;
+
+    const describe = (el) => {
+        let text = el.tagName.toLowerCase();
+        if (el.id) text += '#' + el.id;
+        const cls = typeof el.className === 'string' ? el.className.trim().split(/\\s+/)[0] : '';
+        if (cls) text += '.' + cls;
+        return text.slice(0, 100);
+    };
+
+    return {
+        count: order.length,
+        order: order.slice(0, maxOrder).map(describe),
+        positive_tabindex: positive.length,
+    };
+}
+"""
+
+# Focus a sampled element of the computed order, the Tab press follows. Elements in a
+# shadow root or frame are the active element of their own root, not of the document
+_FOCUS_JS = "(i) => { const el = window.__a11yTabOrder[i]; el.focus({ preventScroll: true }); return el.getRootNode().activeElement === el; }"
+
+# Where the Tab press after _FOCUS_JS landed relative to the prediction
+_CHECK_JS = """
+(i) => {
+    const order = window.__a11yTabOrder;
+    let active = document.activeElement;
+    // focus inside a same-origin frame or shadow root reports the host, follow it down
+    while (active && (active.shadowRoot && active.shadowRoot.activeElement || active.contentDocument && active.contentDocument.activeElement)) {
+        const inner = active.shadowRoot ? active.shadowRoot.activeElement : active.contentDocument.activeElement;
+        if (!inner || inner === active || inner.tagName === 'BODY') break;
+        active = inner;
+    }
+    if (active === order[i]) return 'same';
+    if (active === order[i + 1]) return 'next';
+    return 'other';
+}
+"""
+
+
+def sample_indices(count: int, samples: int) -> List[int]:
+    """Evenly spread elements to validate, the last one is skipped as Tab leaves the page from there."""
+    candidates = count - 1
+    if candidates <= 0 or samples <= 0:
+        return []
+    if candidates <= samples:
+        return list(range(candidates))
+    step = candidates / samples
+    return sorted({int(i * step) for i in range(samples)})
+
+
+async def analyze_tab_order(page: Page, samples: int = SCANNER_TAB_SAMPLES) -> TabOrder:
+    result = await page.evaluate(_TAB_ORDER_JS, MAX_ORDER)
+    traps: List[str] = []
+    validated = 0
+    mismatches = 0
+
+    for i in sample_indices(result['count'], samples):
+        if not await page.evaluate(_FOCUS_JS, i):
+            # focus() was refused, nothing to learn from a Tab press here
+            continue
         await page.keyboard.press('Tab')
-        new_element = await _get_current_focus(page)
-        if begin_element == new_element:
-            # Assume that if tabbing happens between 2 counts and element is unchanged then we have a problem. 
-            if(count > timeout_count - 2):
-                return False
-            return True
-
-    return False
\ No newline at end of file
+        landed = await page.evaluate(_CHECK_JS, i)
+        validated += 1
+        if landed == 'same':
+            traps.append(result['order'][i] if i < len(result['order']) else f"element {i}")
+        elif landed == 'other':
+            mismatches += 1
+
+    await page.evaluate("() => { if (document.activeElement) document.activeElement.blur(); delete window.__a11yTabOrder; }")
+
+    return {
+        'count': result['count'],
+        'order': result['order'],
+        'positive_tabindex': result['positive_tabindex'],
+        'traps': traps,
+        'validated': validated,
+        'mismatches': mismatches,
+        'tabbable': result['count'] > 0 and not traps,
+    }
+
+
+async def is_page_tabbable(page: Page) -> bool:
+    return (await analyze_tab_order(page))['tabbable']
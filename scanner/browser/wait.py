@@ -1,10 +1,44 @@
 import asyncio
+import time
+from typing import Dict, List
 from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+from config import SCANNER_SETTLE_HISTORY, SCANNER_SETTLE_MIN_SAMPLES
 from scanner.log import log_message
 
+# Installed on every context as an init script, so it runs before any page
+# script. Records when the DOM last changed from the first mutation onwards,
+# letting the quiet check count time the page was already quiet.
+SETTLE_INIT_JS = """
+(() => {
+    const state = window.__a11ySettle = { last: performance.now(), mutations: 0 };
+    new MutationObserver(() => {
+        state.last = performance.now();
+        state.mutations++;
+    }).observe(document, {
+        childList: true, subtree: true, attributes: true, characterData: true
+    });
+})();
+"""
+
+# Resolves once the DOM recorded by SETTLE_INIT_JS has been quiet for `quietMs`,
+# or when the `maxMs` hard cap is reached.
+_DOM_QUIET_JS = """
+([quietMs, maxMs]) => new Promise((resolve) => {
+    const state = window.__a11ySettle;
+    const started = performance.now();
+    const check = () => {
+        const now = performance.now();
+        if (now - state.last >= quietMs) return resolve(true);
+        if (now - started >= maxMs) return resolve(false);
+        setTimeout(check, Math.min(quietMs - (now - state.last), maxMs - (now - started)));
+    };
+    check();
+})
+"""
+
 # JS that resolves once the DOM has stopped mutating for `quietMs`, or when the
 # `maxMs` hard cap is reached. Catches React/SPA re-renders that happen after the
-# network has gone idle.
+# network has gone idle. Used for pages opened without the init script.
 _DOM_STABLE_JS = """
 ([quietMs, maxMs]) => new Promise((resolve) => {
     let timer;
@@ -21,12 +55,63 @@ _DOM_STABLE_JS = """
 })
 """
 
+NETWORKIDLE_TIMEOUT = 15000
+DOM_TIMEOUT = 10000
+
+
+def percentile(samples: List[int], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class SettleTracker():
+    """
+    Settle timings of one website's pages and the budgets learned from them.
+
+    Until ``min_samples`` pages have been timed the fixed timeouts apply. After
+    that each phase gets 1.5x its 95th percentile plus 500ms, bounded by the
+    fixed timeout. A page that hits its budget records the budget, so a site
+    that needs more time sees its percentile, and its budget, grow again.
+    """
+
+    def __init__(self, stats: Dict[str, List[int]] | None = None, min_samples: int = SCANNER_SETTLE_MIN_SAMPLES, history: int = SCANNER_SETTLE_HISTORY):
+        stats = stats or {}
+        self.history = history
+        self.min_samples = min_samples
+        self.network: List[int] = list(stats.get('network', []))[-history:]
+        self.dom: List[int] = list(stats.get('dom', []))[-history:]
+        # timings of this run, not yet saved to the website
+        self.new_network: List[int] = []
+        self.new_dom: List[int] = []
+
+    def _budget(self, samples: List[int], floor: int, cap: int) -> int:
+        if len(samples) < self.min_samples:
+            return cap
+        return int(min(cap, max(floor, percentile(samples, 0.95) * 1.5 + 500)))
+
+    def network_budget(self) -> int:
+        return self._budget(self.network, 2000, NETWORKIDLE_TIMEOUT)
+
+    def dom_budget(self) -> int:
+        return self._budget(self.dom, 1000, DOM_TIMEOUT)
+
+    def record(self, network_ms: int, dom_ms: int):
+        for samples, new, value in ((self.network, self.new_network, network_ms), (self.dom, self.new_dom, dom_ms)):
+            samples.append(value)
+            new.append(value)
+            del samples[:-self.history]
+
+    def to_dict(self) -> Dict[str, List[int]]:
+        return {'network': self.network, 'dom': self.dom}
+
 
 async def wait_for_page_settled(
     page: Page,
-    networkidle_timeout: int = 15000,
+    networkidle_timeout: int = NETWORKIDLE_TIMEOUT,
     dom_quiet_ms: int = 500,
-    dom_timeout: int = 10000,
+    dom_timeout: int = DOM_TIMEOUT,
+    tracker: SettleTracker | None = None,
 ) -> bool:
     """
     Wait for a page (incl. React/SPA) to finish loading and rendering.
@@ -34,12 +119,17 @@ async def wait_for_page_settled(
     1. Wait for network to go idle (no requests for ~500ms).
     2. Wait until the DOM stops mutating for `dom_quiet_ms` (MutationObserver).
 
-    Each phase is bounded by its own timeout. On timeout we log a warning and
-    return False (the caller still scans the current DOM). Returns True when the
-    page settled cleanly.
+    Each phase is bounded by its own timeout, or by the budget the website's
+    SettleTracker learned. On timeout we log a warning and return False (the
+    caller still scans the current DOM). Returns True when the page settled
+    cleanly.
     """
     settled = True
+    if tracker is not None:
+        networkidle_timeout = tracker.network_budget()
+        dom_timeout = tracker.dom_budget()
 
+    started = time.perf_counter()
     try:
         await page.wait_for_load_state("networkidle", timeout=networkidle_timeout)
     except PlaywrightTimeoutError:
@@ -49,13 +139,18 @@ async def wait_for_page_settled(
             'warning',
         )
         settled = False
+    network_ms = int((time.perf_counter() - started) * 1000)
 
+    started = time.perf_counter()
     try:
+        has_observer = await page.evaluate("() => !!window.__a11ySettle")
         # asyncio guard in case page.evaluate itself hangs past the JS hard cap.
-        await asyncio.wait_for(
-            page.evaluate(_DOM_STABLE_JS, [dom_quiet_ms, dom_timeout]),
+        quiet = await asyncio.wait_for(
+            page.evaluate(_DOM_QUIET_JS if has_observer else _DOM_STABLE_JS, [dom_quiet_ms, dom_timeout]),
             timeout=(dom_timeout / 1000) + 5,
         )
+        if not quiet:
+            raise asyncio.TimeoutError()
     except (asyncio.TimeoutError, PlaywrightTimeoutError):
         log_message(
             f"DOM did not stabilize within {dom_timeout}ms for {page.url}, "
@@ -63,5 +158,8 @@ async def wait_for_page_settled(
             'warning',
         )
         settled = False
+    dom_ms = int((time.perf_counter() - started) * 1000)
 
+    if tracker is not None:
+        tracker.record(min(network_ms, networkidle_timeout), min(dom_ms, dom_timeout))
     return settled
@@ -1,145 +1,150 @@
 import asyncio
-from typing import List
+from typing import Iterable, List, Set, Tuple
 import celery
-import time
-from playwright.async_api import async_playwright
 from mail.emails import ScanFinishedEmail
+from scanner.browser.context_pool import ContextPool
+from scanner.browser.pool import lease_browser, run_async
+from scanner.browser.resources import ResourcePolicy
+from scanner.browser.wait import SettleTracker
 from scanner.browser.report import AccessibilityReport, AccessibilitySummary, generate_report
 from scanner.log import log_message
 from app import create_app
 from models import db
-from models.website import Site, Site_Website_Assoc, Website 
+from models.website import Site, Site_Website_Assoc, Website, WebsiteReportCounts
 from models.report import Report
-from scanner.utils.queue import ListQueue
+from scanner.utils.checkpoint import CrawlCheckpointer
+from scanner.utils.concurrency import ConcurrencyController
+from scanner.utils.db import commit_with_retry
+from scanner.utils.distributed import SharedFrontier
+from scanner.utils.incremental import PageValidators, probe_page, rules_fingerprint
+from scanner.utils.politeness import PolitenessScheduler
+from scanner.utils.queue import CrawlFrontier
+from scanner.utils.seed import seed_urls
+from scanner.utils.writer import ReportWriter
 from scanner.utils.service import check_url
+from config import SCANNER_RESOURCE_POLICY
 from utils.urls import get_full_url, get_netloc, get_site_netloc
-from sqlalchemy.exc import OperationalError
 
 
-# Global sets for tracking scan progress
-sites_done: set[str] = set()
-currently_processing: set[str] = set()
-
-
-def commit_with_retry(max_retries=3, retry_delay=1):
-    """
-    Commit database changes with retry logic for handling database locks.
-    Useful for SQLite which can have concurrent access issues.
-    """
-    for attempt in range(max_retries):
-        try:
-            db.session.commit()
-            return True
-        except OperationalError as e:
-            if 'database is locked' in str(e) and attempt < max_retries - 1:
-                log_message(f"Database locked, retrying in {retry_delay}s (attempt {attempt + 1}/{max_retries})", 'warning')
-                db.session.rollback()
-                time.sleep(retry_delay)
-            else:
-                log_message(f"Database commit failed after {attempt + 1} attempts: {str(e)}", 'error')
-                db.session.rollback()
-                raise
-    return False
-
-
-async def process_website(name: int, ace_config:str, tags:List[str], browser, queue: ListQueue, results: List[AccessibilitySummary], sites_done: set[str], currently_processing: set[str], website_obj: Website = None, app = None, progress_callback=None, total_sites_ref=None) -> AccessibilityReport:
+async def process_website(name: int, ace_config:str, tags:List[str], browser, contexts: ContextPool, frontier: CrawlFrontier, results: List[AccessibilitySummary], controller: ConcurrencyController, politeness: PolitenessScheduler, settle: SettleTracker | None = None, website_obj: Website = None, app = None, writer: ReportWriter | None = None, progress_callback=None, profile: str = 'full') -> AccessibilityReport:
     while True:
-        site = await queue.get()
+        site = await frontier.get()
         if site is None:  # sentinel to shut down
-            queue.task_done()
+            frontier.task_done(None)
             break
 
-        if site in currently_processing:
-            queue.task_done()
-            continue
-        currently_processing.add(site)
         try:
-            res = await generate_report(browser, website=site, tags=tags, ace_config=ace_config)
+            # Respect the shared per-host / per-domain rate before taking a slot
+            await politeness.wait(site)
+            res, validators = await carry_forward(site, website_obj, app)
+            if res is not None:
+                log_message(f"[Worker {name}] {site} is unchanged, keeping its previous report", 'info')
+            else:
+                # Wait for the adaptive limit to allow another page in flight
+                async with controller.slot() as outcome:
+                    res = await generate_report(browser, website=site, tags=tags, ace_config=ace_config, contexts=contexts, settle=settle, profile=profile)
+                    outcome['error'] = _is_server_error(res)
             
             if 'error' in res and res['error'] is not None:
                 log_message(f"[Worker {name}] Error for {site}: {res['error']}", 'error')
             else:
-                # Store report immediately to database
-                if website_obj and app:
-                    await store_report_to_db(res, website_obj, app)
+                # Hand the report to the writer, which stores it with the next batch
+                if writer and not res.get('carried_forward'):
+                    await writer.put(res, validators)
                 
-                # add links to queue if not already processing
-                for site_link in res.get('links', []):
-                    if not site_link in sites_done and not site_link in currently_processing and not queue.exists(site_link):
-                        await queue.put(site_link)
-                        # Update total discovered sites
-                        if total_sites_ref is not None:
-                            total_sites_ref['count'] = queue.qsize() + len(currently_processing) + len(sites_done)
+                # the frontier ignores links it has already seen
+                frontier.add_many(res.get('links', []))
 
                 summary = AccessibilitySummary(res)
                 results.append(summary)
 
                 # Update progress after each successful scan
-                if progress_callback and total_sites_ref:
-                    current = len(sites_done)
-                    total = total_sites_ref['count']
-                    progress_callback(current, total)
+                if progress_callback:
+                    progress_callback(frontier.done, frontier.total)
                     
         except Exception as e:
             log_message(f"[Worker {name}] Exception for {site}: {str(e)}", 'error')
         finally:
-            sites_done.add(site)
-            currently_processing.remove(site)
-            queue.task_done()
-            log_message(f"[Worker {name}] Processed {site}, websites left: {queue.qsize()} currently processing: {len(currently_processing)} sites_done: {len(sites_done)}", 'info')
+            frontier.task_done(site)
+            log_message(f"[Worker {name}] Processed {site}, websites left: {frontier.queued} currently processing: {frontier.in_flight} sites_done: {frontier.done}", 'info')
+
+
+class WebsiteProxy:
+    """A simple website object to pass to workers (ID, URL and incremental rescan settings)."""
+    def __init__(self, id, url, incremental: bool = False, rules_fingerprint: str | None = None):
+        self.id = id
+        self.url = url
+        self.incremental = incremental
+        self.rules_fingerprint = rules_fingerprint
 
 
-async def store_report_to_db(site_report: AccessibilityReport, website: Website, app):
-    """Store a single report to the database immediately after scanning."""
-    def _store_in_db():
+def _is_server_error(res: AccessibilityReport) -> bool:
+    """Whether a page result means the target server is struggling (throttling, 5xx, timeouts)."""
+    code = res.get('response_code') or 0
+    if code == 429 or code >= 500:
+        return True
+    return bool(res.get('error')) and not code
+
+
+async def carry_forward(site_url: str, website: WebsiteProxy | None, app) -> Tuple[AccessibilityReport | None, PageValidators | None]:
+    """
+    Incremental rescans: probe a page and, when neither the page nor the rule
+    set changed since its latest report, keep that report instead of scanning.
+    
+    Returns a stand-in result carrying the previous report's links (None when
+    the page needs a full scan) and the validators to store with a new report.
+    """
+    if website is None or app is None or not website.incremental:
+        return None, None
+
+    def _probe():
         with app.app_context():
             try:
-                # Check if site url is based on website domain
-                site_netloc = get_netloc(site_report['url'])
-                website_netloc = get_netloc(website.url)
-                if site_netloc != website_netloc:
-                    log_message(f"Skipping site {site_report['url']} as it is not part of the website domain {website_netloc}", 'warning')
-                    return None
-                
-                # Re-query website in this session
-                website_db = db.session.query(Website).filter_by(id=website.id).first()
-                if not website_db:
-                    log_message(f"Website {website.id} not found in database", 'error')
-                    return None
-                
-                # Check if site exists if not create one
-                site = db.session.query(Site).filter_by(url=site_report['url']).first()
-                
-                if site is None:
-                    site = Site(url=site_report['url'], website=website_db)
-                    db.session.add(site)
+                site = db.session.query(Site).filter_by(url=site_url).first()
+                previous = site.get_validators() if site else None
+                probe = probe_page(site_url, previous)
+                validators: PageValidators = {
+                    'etag': probe.get('etag'),
+                    'last_modified': probe.get('last_modified'),
+                    'content_hash': probe.get('content_hash'),
+                    'rules_fingerprint': website.rules_fingerprint,
+                }
+                if site is None or not probe['unchanged'] or previous['rules_fingerprint'] != website.rules_fingerprint:
+                    return None, validators
+
+                report = db.session.query(Report).filter(Report.id == site.latest_report_id).with_entities(
+                    Report.base_url, Report.response_code, Report.links
+                ).first()
+                if report is None:
+                    return None, validators
+
+                website_db = db.session.get(Website, website.id)
+                if website_db and site not in website_db.sites:
+                    website_db.sites.append(site)
                     db.session.flush()
-                else:
-                    if site not in website_db.sites:
-                        website_db.sites.append(site)
-                
-                report = Report(site_report, site_id=site.id)
-                site.reports.append(report)
+                    WebsiteReportCounts.refresh(website_db.id)
+                site.set_validators(validators)
                 site.last_scanned = db.func.current_timestamp()
                 site.scanning = False
-                db.session.add(report)
                 db.session.add(site)
                 commit_with_retry()
-                return site.id
+                return {
+                    'url': site_url,
+                    'base_url': report.base_url,
+                    'response_code': report.response_code or probe['status'],
+                    'links': report.links or [],
+                    'carried_forward': True,
+                }, validators
             except Exception as e:
-                log_message(f"Error storing report for {site_report['url']}: {str(e)}", 'error')
+                log_message(f"Error probing {site_url} for changes: {str(e)}", 'warning')
                 db.session.rollback()
-                return None
+                return None, None
             finally:
-                # Always remove the session to prevent 'prepared' state issues
                 db.session.remove()
-    
-    # Run the database operation in a thread to avoid blocking
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, _store_in_db)
 
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, _probe)
 
-        
 
 async def generate_single_site_report(site_url:str) -> AccessibilityReport:
     app = create_app()
@@ -155,6 +160,11 @@ async def generate_single_site_report(site_url:str) -> AccessibilityReport:
             
             tags = site.get_tags()
             ace_config:str = site.ace_config()
+            website = site.websites.first()
+            domain_name = website.domain.domain if website and website.domain else None
+            policy = ResourcePolicy(website.get_resource_policy() if website else SCANNER_RESOURCE_POLICY)
+            settle = SettleTracker(website.settle_stats if website else None)
+            profile = website.get_scan_profile() if website else 'full'
             if not tags:
                 tags = ['wcag2a', 'wcag2aa', 'wcag21a', 'wcag21aa']
             log_message(f"Using tags: {tags} for site {site.url}", 'info')
@@ -162,26 +172,24 @@ async def generate_single_site_report(site_url:str) -> AccessibilityReport:
             db.session.add(site)
             commit_with_retry()
 
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True, args=['--no-sandbox', '--disable-setuid-sandbox'])
+            async with lease_browser() as browser, ContextPool(browser, max_pages=1, policy=policy, axe_config=ace_config) as contexts, \
+                    PolitenessScheduler(domain=domain_name) as politeness:
+                await politeness.wait(site_url)
                 log_message(f"Generating report for {site_url}", 'info')
-                report = await generate_report(browser, website=site_url, tags=tags, ace_config=ace_config)
+                report = await generate_report(browser, website=site_url, tags=tags, ace_config=ace_config, contexts=contexts, settle=settle, profile=profile)
                 
                 if 'error' in report and report['error'] is not None:
                     log_message(f"Error for {site_url}: {report['error']}", 'error')
                     scan_error = ValueError(report['error'])
                 else:
-                    await browser.close()
-
                     site = db.session.query(Site).filter_by(url=site_url).first()
                     if site is None:
                         scan_error = ValueError("Site not found after scan")
                     else:
                         report_obj = Report(report, site_id=site.id)
-                        site.reports.append(report_obj)
+                        site.record_report(report_obj)
                         site.last_scanned = db.func.current_timestamp()
                         
-                        db.session.add(report_obj)
                         db.session.add(site)
                         commit_with_retry()
                         report_result = report
@@ -217,14 +225,165 @@ async def generate_single_site_report(site_url:str) -> AccessibilityReport:
     
     return report_result
 
-async def generate_reports(target_website: str = "https://resources.cs.rutgers.edu", progress_callback=None, task_id: str = None) -> List[AccessibilitySummary]:
+def finalize_crawl(website: Website, found_urls: Iterable[str]) -> Set[str]:
+    """
+    Remove the website's sites that were not found by the crawl and mark the
+    website scanned. Returns the URLs of other websites that lost a shared site
+    and should be rescanned. Call inside an app context.
+    """
+    # Get list of site IDs found in this scan
+    sitesFound = set()
+    website_netloc = get_netloc(website.url)
+    for site_url in found_urls:
+        # Check if the site URL matches the website domain
+        if get_netloc(site_url) == website_netloc:
+            site = db.session.query(Site).filter_by(url=site_url).first()
+            if site:
+                sitesFound.add(site.id)
+
+    websitesToScan = set()
+    # Remove any sites that were not found in this scan from the website
+    for site in list(website.sites):  # Use list() to avoid modification during iteration
+        if site.id not in sitesFound:
+            log_message(f"Removing site {site.id} from website {website.id} as it was not found in this scan", 'info')
+            
+            associated_websites = site.websites.all() 
+            
+            # If site has multiple websites, remove only the association
+            if len(associated_websites) > 1:
+                site.websites.remove(website)
+                
+                for w in associated_websites:
+                    if w.id != website.id:
+                        websitesToScan.add(w.url)
+                
+                db.session.add(site)
+                commit_with_retry()
+            else:
+                # Safe to delete the site entirely
+                website.sites.remove(site)
+                Site_Website_Assoc.delete().where(Site_Website_Assoc.c.site_id == site.id)
+                db.session.delete(site)
+                db.session.add(website)
+                commit_with_retry()
     
-    global sites_done, currently_processing
+    # pages left the website
+    WebsiteReportCounts.refresh(website.id)
+    website.last_scanned = db.func.current_timestamp()
+    website.current_task_id = None
+    db.session.add(website)
+    commit_with_retry()
+    return websitesToScan
+
 
+def begin_distributed_crawl(target_website: str, crawl_id: str) -> Tuple[int, List[str]] | None:
+    """
+    Prepare a website for a distributed crawl tracked under ``crawl_id`` and
+    start its shared frontier. Returns the website ID and the URLs to seed the
+    crawl with, or None when the website isn't reachable or another crawl of
+    it is still running.
+    """
+    app = create_app()
+    with app.app_context():
+        try:
+            website = db.session.query(Website).filter_by(url=target_website).first()
+            if website is None:
+                website = Website(url=target_website)
+                website.active = True
+                db.session.add(website)
+                commit_with_retry()
+
+            frontier = SharedFrontier(website.id)
+            if not frontier.start(crawl_id, target_website):
+                log_message(f"Crawl {frontier.crawl_id} of {target_website} is still running, not starting another", 'warning')
+                return None
+            website.current_task_id = crawl_id
+            db.session.add(website)
+            commit_with_retry()
+
+            if not check_url(target_website):
+                log_message(f"Website {target_website} is not accessible, aborting scan", 'error')
+                frontier.clear()
+                website.current_task_id = None
+                db.session.add(website)
+                commit_with_retry()
+                return None
+            website_id = website.id
+            known_urls = [row.url for row in website.sites.with_entities(Site.url).all()]
+        finally:
+            db.session.remove()
+    return website_id, seed_urls(target_website, known_urls)
+
+
+def save_settle_samples(app, website_id: int, settle: SettleTracker):
+    """Add the settle timings of this run to the website's history."""
+    if not settle.new_network:
+        return
+    with app.app_context():
+        try:
+            website = db.session.get(Website, website_id)
+            if website:
+                website.record_settle_samples(settle.new_network, settle.new_dom)
+                commit_with_retry()
+        except Exception as e:
+            log_message(f"Error saving settle timings for website {website_id}: {str(e)}", 'warning')
+            db.session.rollback()
+        finally:
+            db.session.remove()
+
+
+async def generate_page_batch(website_id: int, urls: List[str]) -> Tuple[List[AccessibilitySummary], List[str]]:
+    """
+    Scan a batch of pages of a distributed crawl and store their reports.
+    Returns the summaries and every link found on the batch's pages.
+    """
+    app = create_app()
+    with app.app_context():
+        try:
+            website = db.session.get(Website, website_id)
+            if website is None:
+                raise ValueError(f"Website with ID {website_id} not found")
+            domain_name = website.domain.domain if website.domain else None
+            tags = website.get_tags()
+            ace_config = website.get_ace_config()
+            if not tags:
+                tags = ['wcag2a', 'wcag2aa', 'wcag21a', 'wcag21aa']
+            profile = website.get_scan_profile()
+            website_proxy = WebsiteProxy(website.id, website.url, website.incremental_rescan, rules_fingerprint(tags, ace_config, profile))
+            policy = ResourcePolicy(website.get_resource_policy())
+            settle = SettleTracker(website.settle_stats)
+        finally:
+            db.session.remove()
+
+    results: List[AccessibilitySummary] = []
+    links: List[str] = []
+
+    async with lease_browser() as browser, ContextPool(browser, policy=policy, axe_config=ace_config) as contexts, \
+            PolitenessScheduler(domain=domain_name) as politeness, ReportWriter(app, website_proxy) as writer:
+        async def scan(site: str):
+            try:
+                await politeness.wait(site)
+                res, validators = await carry_forward(site, website_proxy, app)
+                if res is None:
+                    res = await generate_report(browser, website=site, tags=tags, ace_config=ace_config, contexts=contexts, settle=settle, profile=profile)
+                    if 'error' in res and res['error'] is not None:
+                        log_message(f"Error for {site}: {res['error']}", 'error')
+                        return
+                    await writer.put(res, validators)
+                links.extend(res.get('links', []))
+                results.append(AccessibilitySummary(res))
+            except Exception as e:
+                log_message(f"Exception for {site}: {str(e)}", 'error')
+
+        await asyncio.gather(*(scan(site) for site in urls))
+
+    save_settle_samples(app, website_id, settle)
+    return results, links
+
+
+async def generate_reports(target_website: str = "https://resources.cs.rutgers.edu", progress_callback=None, task_id: str = None) -> List[AccessibilitySummary]:
+    
     results: List[AccessibilitySummary] = []
-    sites_done = set()
-    currently_processing = set()
-    total_sites = 0  # Track total discovered sites
     app = create_app()
 
     with app.app_context():
@@ -237,13 +396,21 @@ async def generate_reports(target_website: str = "https://resources.cs.rutgers.e
         
         
         website.current_task_id = task_id  # Set the current task ID (creation or scan task)
+        min_concurrency, max_concurrency = website.get_concurrency_limits()
+        domain_name = website.domain.domain if website.domain else None
         tags = website.get_tags()
         ace_config = website.get_ace_config()
         if not tags:
             tags = ['wcag2a', 'wcag2aa', 'wcag21a', 'wcag21aa']
+        incremental = bool(website.incremental_rescan)
+        policy = ResourcePolicy(website.get_resource_policy())
+        settle = SettleTracker(website.settle_stats)
+        profile = website.get_scan_profile()
+        fingerprint = rules_fingerprint(tags, ace_config, profile)
         log_message(f"Using tags: {tags} for website {website.url}", 'info')
         db.session.add(website)
         commit_with_retry()
+        known_urls = [row.url for row in website.sites.with_entities(Site.url).all()]
 
 
     log_message(f"Starting scan for website: {target_website}", 'info')
@@ -261,49 +428,72 @@ async def generate_reports(target_website: str = "https://resources.cs.rutgers.e
             log_message(f"Website {target_website} is not accessible, aborting scan", 'error')
             return []
 
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True,args=['--no-sandbox', '--disable-setuid-sandbox'],)
-            q = ListQueue()
-            await q.put(target_website)
-            # Launch N workers
-            num_workers = 10
-            
-            # Create a simple website object to pass to workers (just ID and URL)
-            class WebsiteProxy:
-                def __init__(self, id, url):
-                    self.id = id
-                    self.url = url
-            
-            website_proxy = WebsiteProxy(website_id, target_website) if website_id else None
+        async with lease_browser() as browser, ContextPool(browser, policy=policy, axe_config=ace_config) as contexts, \
+                PolitenessScheduler(domain=domain_name) as politeness:
+            frontier = CrawlFrontier()
+            # Pick up where an interrupted run of this crawl stopped, otherwise start from the root
+            checkpointer = CrawlCheckpointer(app, website_id, frontier, results) if website_id else None
+            if not (checkpointer and checkpointer.restore()):
+                frontier.add(target_website)
+                # Seed known and sitemap pages so every worker has work from the start
+                loop = asyncio.get_running_loop()
+                frontier.add_many(await loop.run_in_executor(None, seed_urls, target_website, known_urls))
+            # Launch enough workers for the upper limit, the controller decides how many load pages at once
+            controller = ConcurrencyController(min_limit=min_concurrency, max_limit=max_concurrency)
+            num_workers = controller.max_limit
             
-            # Create a mutable reference for tracking total sites discovered
-            total_sites_ref = {'count': 1}  # Start with 1 (the initial site)
+            website_proxy = WebsiteProxy(website_id, target_website, incremental, fingerprint) if website_id else None
+            # Single writer stage, workers only queue their reports
+            writer = ReportWriter(app, website_proxy) if website_proxy else None
+            if writer:
+                writer.start()
             
             workers = [
                 asyncio.create_task(process_website(
                     name=i, 
                     browser=browser, 
-                    queue=q, 
+                    contexts=contexts,
+                    frontier=frontier, 
                     results=results, 
-                    sites_done=sites_done, 
-                    currently_processing=currently_processing, 
+                    controller=controller,
+                    politeness=politeness,
+                    settle=settle,
                     tags=tags, 
                     ace_config=ace_config,
+                    profile=profile,
                     website_obj=website_proxy,
                     app=app,
-                    progress_callback=progress_callback,
-                    total_sites_ref=total_sites_ref
+                    writer=writer,
+                    progress_callback=progress_callback
                 ))
                 for i in range(num_workers)
             ]
 
-            # Wait until all items are processed
-            await q.join()
+            saver = asyncio.create_task(checkpointer.run()) if checkpointer else None
+            try:
+                # Wait until all items are processed
+                await frontier.join()
 
-            # Stop workers
-            for _ in range(num_workers):
-                await q.put(None)
-            await asyncio.gather(*workers)
+                # Stop workers
+                await frontier.close(num_workers)
+                await asyncio.gather(*workers)
+            except Exception:
+                # Keep this run's progress for the next attempt
+                if checkpointer:
+                    await checkpointer.save()
+                raise
+            finally:
+                if saver:
+                    saver.cancel()
+                # Store the reports still queued before the orphan cleanup looks at the sites
+                if writer:
+                    await writer.close()
+            if politeness.waited:
+                log_message(f"Politeness delays for {target_website} totalled {politeness.waited:.1f}s", 'info')
+            log_message(f"Resource policy for {target_website}: {policy.stats()}", 'info')
+            log_message(f"Settle budgets for {target_website}: network {settle.network_budget()}ms, DOM {settle.dom_budget()}ms", 'info')
+        if website_id:
+            save_settle_samples(app, website_id, settle)
             
         # Cleanup: Remove orphaned sites and finalize scan
         with app.app_context():
@@ -318,47 +508,11 @@ async def generate_reports(target_website: str = "https://resources.cs.rutgers.e
                 if not website.domain_id:
                     log_message(f"Warning: website {website.url} doesn't have an associated domain", 'warning')
 
-                # Get list of site IDs found in this scan
-                sitesFound = set()
-                for site_report in results:
-                    # Check if the site URL matches the website domain
-                    site_netloc = get_netloc(site_report['url'])
-                    website_netloc = get_netloc(website.url)
-                    if site_netloc == website_netloc:
-                        site = db.session.query(Site).filter_by(url=site_report['url']).first()
-                        if site:
-                            sitesFound.add(site.id)
-
-                websitesToScan = set()
-                # Remove any sites that were not found in this scan from the website
-                for site in list(website.sites):  # Use list() to avoid modification during iteration
-                    if site.id not in sitesFound:
-                        log_message(f"Removing site {site.id} from website {website.id} as it was not found in this scan", 'info')
-                        
-                        associated_websites = site.websites.all() 
-                        
-                        # If site has multiple websites, remove only the association
-                        if len(associated_websites) > 1:
-                            site.websites.remove(website)
-                            
-                            for w in associated_websites:
-                                if w.id != website.id:
-                                    websitesToScan.add(w.url)
-                            
-                            db.session.add(site)
-                            commit_with_retry()
-                        else:
-                            # Safe to delete the site entirely
-                            website.sites.remove(site)
-                            Site_Website_Assoc.delete().where(Site_Website_Assoc.c.site_id == site.id)
-                            db.session.delete(site)
-                            db.session.add(website)
-                            commit_with_retry()
-                
-                website.last_scanned = db.func.current_timestamp()
-                website.current_task_id = None
-                db.session.add(website)
-                commit_with_retry()
+                # Pages found in this scan, including pages from a resumed checkpoint
+                found_urls = checkpointer.found_urls() if checkpointer else {r['url'] for r in results}
+                if checkpointer:
+                    checkpointer.clear()
+                websitesToScan = finalize_crawl(website, found_urls)
                 
                 # Queue any websites that need rescanning
                 for url in websitesToScan:
@@ -392,10 +546,10 @@ async def generate_reports(target_website: str = "https://resources.cs.rutgers.e
                 db.session.remove()
 
 def run_scan_site(site :str ="https://resources.cs.rutgers.edu"):
-    asyncio.run(generate_single_site_report(site))
+    run_async(generate_single_site_report(site))
 
 def run_scan(website:str = "https://resources.cs.rutgers.edu"):
-    asyncio.run(generate_reports(website))
+    run_async(generate_reports(website))
     
 if __name__ == "__main__":
     # run_scan(website="https://services.cs.rutgers.edu")
@@ -2,18 +2,36 @@
 Celery tasks for website and site scanning.
 These tasks are executed by Celery workers in the background.
 """
-import asyncio
 from typing import List
 from datetime import datetime, timedelta
+from celery.signals import worker_process_init, worker_process_shutdown
+from celery.utils import uuid
+from sqlalchemy import select
 from celery_app import celery
+from config import REPORT_BACKFILL_BATCH_SIZE, REPORT_COMPRESSION_BATCH_SIZE, SCANNER_CRAWL_MODE, SCANNER_PAGE_BATCH_SIZE
+from scanner.browser.pool import init_browser_pool, run_async, shutdown_browser_pool
 from scanner.log import log_message
 from models import db
-from models.website import Site, Website
+from models.website import Site, Website, WebsiteReportCounts
 from models.report import Report
+from models.report_violation import ReportViolation
 from scanner.scan import generate_reports as async_generate_reports, generate_single_site_report as async_generate_single_site_report
+from scanner.scan import begin_distributed_crawl, finalize_crawl, generate_page_batch as async_generate_page_batch
+from scanner.utils.distributed import SharedFrontier, split_batches
 from mail.emails import ScanFinishedEmail
 
 
+@worker_process_init.connect
+def start_browser_pool(**kwargs):
+    """Give every worker process its own long-lived browsers for the tasks it runs."""
+    init_browser_pool()
+
+
+@worker_process_shutdown.connect
+def stop_browser_pool(**kwargs):
+    shutdown_browser_pool()
+
+
 @celery.task(name='scanner.tasks.check_and_queue_scans')
 def check_and_queue_scans():
     """
@@ -43,7 +61,11 @@ def check_and_queue_scans():
 
             if website.current_task_id:
                 websiteTask = scan_website.AsyncResult(website.current_task_id)
-                if websiteTask.state in ['PENDING', 'PROGRESS']:
+                if websiteTask.state == 'PROGRESS' and SCANNER_CRAWL_MODE == 'distributed' \
+                        and not SharedFrontier(website.id).active():
+                    # A distributed crawl whose Redis state expired before it finished
+                    log_message(f"Distributed crawl {website.current_task_id} of {website.url} was abandoned", 'warning')
+                elif websiteTask.state in ['PENDING', 'PROGRESS']:
                     continue
                 
             if should_scan:
@@ -70,12 +92,18 @@ def scan_website(self, website_url: str):
     Celery task to scan an entire website and all its pages.
     Reports are saved to the database incrementally as each page is scanned.
     
+    With SCANNER_CRAWL_MODE=distributed the crawl is fanned out as page batch
+    tasks instead, see start_distributed_scan.
+    
     Args:
         website_url: The base URL of the website to scan
         
     Returns:
         dict: Result summary including number of reports generated
     """
+    if SCANNER_CRAWL_MODE == 'distributed':
+        return start_distributed_scan(self, website_url)
+
     try:
         log_message(f"[Celery Task {self.request.id}] Starting website scan for {website_url}", 'info')
         
@@ -96,39 +124,34 @@ def scan_website(self, website_url: str):
             self.update_state(state='PROGRESS', meta=meta)
             log_message(f"[Celery Task {self.request.id}] Progress: {current}/{total}", 'debug')
         
-        # Run the async scanning function
+        # Run the async scanning function on the worker's browser pool loop
         # Reports are committed to DB incrementally as they're generated
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            results = loop.run_until_complete(
-                async_generate_reports(
-                    website_url, 
-                    progress_callback=update_progress,
-                    task_id=self.request.id  # Pass the task ID
-                )
+        results = run_async(
+            async_generate_reports(
+                website_url, 
+                progress_callback=update_progress,
+                task_id=self.request.id  # Pass the task ID
             )
-            
-            self.update_state(state='SUCCESS', meta={
-                'status': 'Scan completed',
-                'current': len(results),
-                'total': len(results)
-            })
-            
-            log_message(
-                f"[Celery Task {self.request.id}] Completed website scan for {website_url}. "
-                f"Generated {len(results)} reports",
-                'info'
-            )
-            
-            return {
-                'status': 'completed',
-                'website_url': website_url,
-                'reports_generated': len(results),
-                'sites_scanned': len(results)
-            }
-        finally:
-            loop.close()
+        )
+        
+        self.update_state(state='SUCCESS', meta={
+            'status': 'Scan completed',
+            'current': len(results),
+            'total': len(results)
+        })
+        
+        log_message(
+            f"[Celery Task {self.request.id}] Completed website scan for {website_url}. "
+            f"Generated {len(results)} reports",
+            'info'
+        )
+        
+        return {
+            'status': 'completed',
+            'website_url': website_url,
+            'reports_generated': len(results),
+            'sites_scanned': len(results)
+        }
             
     except Exception as e:
         log_message(f"[Celery Task {self.request.id}] Error scanning website {website_url}: {str(e)}", 'error')
@@ -136,6 +159,143 @@ def scan_website(self, website_url: str):
         raise
 
 
+def start_distributed_scan(task, website_url: str) -> dict:
+    """
+    Start a distributed crawl: seed the shared frontier with the root URL and
+    queue the first page batch.
+
+    The crawl is tracked under its own ID, which becomes the website's
+    current_task_id. Page batches report PROGRESS on that ID and the finalizer
+    runs with it as its task ID, so the status endpoints follow the whole crawl
+    rather than this short lived task.
+    """
+    crawl_id = uuid()
+    log_message(f"[Celery Task {task.request.id}] Starting distributed crawl {crawl_id} for {website_url}", 'info')
+
+    crawl = begin_distributed_crawl(website_url, crawl_id)
+    if crawl is None:
+        return {'status': 'aborted', 'website_url': website_url, 'reports_generated': 0, 'sites_scanned': 0}
+    website_id, seeds = crawl
+
+    # begin_distributed_crawl started the frontier
+    frontier = SharedFrontier(website_id)
+    seeds = frontier.claim(seeds)
+    batches = split_batches(seeds, SCANNER_PAGE_BATCH_SIZE)
+    # The root batch is already counted by start()
+    frontier.spawn(len(batches))
+    celery.backend.store_result(crawl_id, {'status': 'Initializing scan...', 'current': 0, 'total': len(seeds) + 1}, 'PROGRESS')
+    for batch in [[website_url]] + batches:
+        scan_page_batch.delay(website_id, batch, crawl_id)
+
+    return {'status': 'dispatched', 'website_url': website_url, 'crawl_id': crawl_id}
+
+
+# Acknowledged once done, a batch whose worker is lost (hard time limit, OOM) is
+# delivered again instead of leaving the crawl waiting for it until its state expires
+@celery.task(bind=True, name='scanner.tasks.scan_page_batch', ignore_result=True, acks_late=True, reject_on_worker_lost=True)
+def scan_page_batch(self, website_id: int, urls: List[str], crawl_id: str):
+    """
+    Celery task scanning a few pages of a distributed crawl.
+    
+    Links found on the pages are claimed in the shared frontier and queued as
+    new batches. The batch that leaves no work outstanding queues the
+    finalizer. Batches of another crawl than the website's active one are
+    dropped.
+    
+    Args:
+        website_id: The database ID of the website being crawled
+        urls: The pages to scan
+        crawl_id: The crawl the batch belongs to
+    """
+    frontier = SharedFrontier(website_id)
+    if frontier.crawl_id != crawl_id:
+        log_message(f"[Celery Task {self.request.id}] Dropping pages {urls} of website {website_id}, crawl {crawl_id} is no longer running", 'warning')
+        return
+    found: List[str] = []
+    try:
+        results, links = run_async(async_generate_page_batch(website_id, urls))
+        found = [r['url'] for r in results if r.get('url')]
+
+        batches = split_batches(frontier.claim(links), SCANNER_PAGE_BATCH_SIZE)
+        if batches:
+            # Count the new batches before this one finishes so the crawl can't look drained
+            frontier.spawn(len(batches))
+            for batch in batches:
+                scan_page_batch.delay(website_id, batch, crawl_id)
+    except Exception as e:
+        log_message(f"[Celery Task {self.request.id}] Error scanning pages {urls} of website {website_id}: {str(e)}", 'error')
+    finally:
+        remaining = frontier.finish(crawl_id, self.request.id, len(urls), found)
+        if remaining is None:
+            log_message(f"[Celery Task {self.request.id}] Crawl {crawl_id} of website {website_id} is gone or already counted this batch, not finalizing", 'warning')
+        elif remaining > 0:
+            current, total = frontier.progress()
+            celery.backend.store_result(crawl_id, {
+                'status': f'Scanning page {current} of {total}',
+                'current': current,
+                'total': total,
+            }, 'PROGRESS')
+        else:
+            finalize_website_scan.apply_async(args=[website_id], task_id=crawl_id)
+
+
+@celery.task(bind=True, name='scanner.tasks.finalize_website_scan')
+def finalize_website_scan(self, website_id: int):
+    """
+    Celery task finishing a distributed crawl once every page batch is done:
+    removes orphaned sites, marks the website scanned and sends the scan email.
+    
+    Args:
+        website_id: The database ID of the crawled website
+        
+    Returns:
+        dict: Result summary
+    """
+    from app import create_app
+    app = create_app()
+    frontier = SharedFrontier(website_id)
+    found_urls = frontier.found()
+    sites_scanned, _ = frontier.progress()
+    
+    try:
+        with app.app_context():
+            website = db.session.get(Website, website_id)
+            if not website:
+                raise ValueError(f"Website with ID {website_id} not found")
+            website_url = website.url
+            
+            websitesToScan = finalize_crawl(website, found_urls)
+            ScanFinishedEmail(db.session.get(Website, website_id)).send()
+        
+        for url in websitesToScan:
+            log_message(f"Queueing website {url} for scan as it was linked by a site no longer associated with {website_url}", 'info')
+            scan_website.delay(url)
+        
+        log_message(f"[Celery Task {self.request.id}] Finished distributed crawl of {website_url}: {len(found_urls)} reports", 'info')
+        return {
+            'status': 'completed',
+            'website_url': website_url,
+            'reports_generated': len(found_urls),
+            'sites_scanned': sites_scanned
+        }
+    except Exception as e:
+        log_message(f"[Celery Task {self.request.id}] Error finalizing crawl of website {website_id}: {str(e)}", 'error')
+        with app.app_context():
+            website = db.session.get(Website, website_id)
+            if website:
+                website.current_task_id = None
+                db.session.add(website)
+                db.session.commit()
+        raise
+    finally:
+        frontier.clear()
+        with app.app_context():
+            try:
+                db.session.remove()
+            except:
+                pass
+
+
 @celery.task(bind=True, name='scanner.tasks.scan_site')
 def scan_site(self, site_url: str):
     """
@@ -153,20 +313,15 @@ def scan_site(self, site_url: str):
         # Update task state
         self.update_state(state='PROGRESS', meta={'status': 'Scanning site...', 'url': site_url})
         
-        # Run the async scanning function
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            result = loop.run_until_complete(async_generate_single_site_report(site_url))
-            log_message(f"[Celery Task {self.request.id}] Completed site scan for {site_url}", 'info')
-            
-            return {
-                'status': 'completed',
-                'site_url': site_url,
-                'report_generated': True
-            }
-        finally:
-            loop.close()
+        # Run the async scanning function on the worker's browser pool loop
+        result = run_async(async_generate_single_site_report(site_url))
+        log_message(f"[Celery Task {self.request.id}] Completed site scan for {site_url}", 'info')
+        
+        return {
+            'status': 'completed',
+            'site_url': site_url,
+            'report_generated': True
+        }
             
     except Exception as e:
         log_message(f"[Celery Task {self.request.id}] Error scanning site {site_url}: {str(e)}", 'error')
@@ -248,3 +403,85 @@ def rescan_site(self, site_id: int):
                 db.session.remove()
             except:
                 pass
+
+
+@celery.task(bind=True, name='scanner.tasks.compress_reports', ignore_result=True)
+def compress_reports(self, after_id: int = 0, batch_size: int = REPORT_COMPRESSION_BATCH_SIZE):
+    """
+    Celery task compressing the stored JSON of existing reports, one batch at a time.
+    
+    Each run converts the reports after after_id and queues the next batch, so
+    the conversion doesn't hold a worker or a long transaction. Reports are
+    readable throughout, compressed or not. Start it with
+    `celery -A celery_app.celery call scanner.tasks.compress_reports`.
+    
+    Args:
+        after_id: Reports with a greater ID are converted
+        batch_size: Reports looked at per batch
+    """
+    last_id, converted = Report.compress_batch(after_id, batch_size)
+    if last_id is None:
+        log_message(f"[Celery Task {self.request.id}] Report compression complete", 'info')
+        return
+    log_message(f"[Celery Task {self.request.id}] Compressed {converted} reports up to ID {last_id}", 'info')
+    compress_reports.delay(last_id, batch_size)
+
+
+@celery.task(bind=True, name='scanner.tasks.backfill_report_violations', ignore_result=True)
+def backfill_report_violations(self, after_id: int = 0, batch_size: int = REPORT_BACKFILL_BATCH_SIZE):
+    """
+    Celery task adding the report_violation rows of reports that have none,
+    one batch at a time, queueing the next batch until every report is
+    covered. The migration adding the rows of older reports does the same
+    once. Start it with
+    `celery -A celery_app.celery call scanner.tasks.backfill_report_violations`.
+    
+    Args:
+        after_id: Reports with a greater ID are backfilled
+        batch_size: Reports looked at per batch
+    """
+    last_id, added = ReportViolation.backfill_batch(after_id, batch_size)
+    if last_id is None:
+        log_message(f"[Celery Task {self.request.id}] Report violation backfill complete", 'info')
+        return
+    log_message(f"[Celery Task {self.request.id}] Added {added} report violations up to report ID {last_id}", 'info')
+    backfill_report_violations.delay(last_id, batch_size)
+
+
+@celery.task(bind=True, name='scanner.tasks.refresh_website_report_counts', ignore_result=True)
+def refresh_website_report_counts(self):
+    """
+    Celery task recomputing the report counts of every website from the latest
+    reports of its pages, for websites from before the counts were kept or
+    counts that drifted. Start it with
+    `celery -A celery_app.celery call scanner.tasks.refresh_website_report_counts`.
+    """
+    website_ids = db.session.execute(select(Website.id).order_by(Website.id)).scalars().all()
+    for website_id in website_ids:
+        WebsiteReportCounts.refresh(website_id)
+        db.session.commit()
+    log_message(f"[Celery Task {self.request.id}] Refreshed the report counts of {len(website_ids)} websites", 'info')
+
+
+@celery.task(bind=True, name='scanner.tasks.repair_latest_reports', ignore_result=True)
+def repair_latest_reports(self, after_id: int = 0, batch_size: int = REPORT_BACKFILL_BATCH_SIZE):
+    """
+    Celery task pointing every site at its latest report again, one batch of
+    sites at a time, then recomputing the website report counts. Start it with
+    `celery -A celery_app.celery call scanner.tasks.repair_latest_reports`.
+    
+    Args:
+        after_id: Sites with a greater ID are repaired
+        batch_size: Sites per batch
+    """
+    site_ids = db.session.execute(
+        select(Site.id).where(Site.id > after_id).order_by(Site.id).limit(batch_size)
+    ).scalars().all()
+    if not site_ids:
+        log_message(f"[Celery Task {self.request.id}] Latest report repair complete", 'info')
+        refresh_website_report_counts.delay()
+        return
+    changed = Site.repair_latest_reports(site_ids)
+    db.session.commit()
+    log_message(f"[Celery Task {self.request.id}] Repaired {changed} sites up to ID {site_ids[-1]}", 'info')
+    repair_latest_reports.delay(site_ids[-1], batch_size)
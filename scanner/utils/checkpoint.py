@@ -0,0 +1,83 @@
+"""
+Periodic checkpoints of a website crawl.
+
+The checkpoint holds the frontier (pending + done URLs) and the URLs that
+produced a report. It is written every ``SCANNER_CHECKPOINT_INTERVAL``
+seconds while the crawl runs, so a task that dies mid-crawl loses at most
+that much work. The next scan of the website restores it and carries on.
+"""
+import asyncio
+from datetime import timedelta
+from typing import List, Set
+
+from config import SCANNER_CHECKPOINT_INTERVAL, SCANNER_CHECKPOINT_MAX_AGE
+from models import db
+from models.crawl import CrawlCheckpoint
+from scanner.browser.report import AccessibilitySummary
+from scanner.log import log_message
+from scanner.utils.db import commit_with_retry
+from scanner.utils.queue import CrawlFrontier
+
+
+class CrawlCheckpointer():
+
+    def __init__(self, app, website_id: int, frontier: CrawlFrontier, results: List[AccessibilitySummary], interval: int = SCANNER_CHECKPOINT_INTERVAL):
+        self.app = app
+        self.website_id = website_id
+        self.frontier = frontier
+        self.results = results
+        self.interval = interval
+        # pages scanned by an earlier, interrupted run of this crawl
+        self.resumed_found: Set[str] = set()
+
+    def restore(self) -> bool:
+        """Load a recent checkpoint into the frontier. Returns True when the crawl resumes."""
+        with self.app.app_context():
+            try:
+                checkpoint = CrawlCheckpoint.get_resumable(self.website_id, timedelta(hours=SCANNER_CHECKPOINT_MAX_AGE))
+                if checkpoint is None:
+                    return False
+                for url in checkpoint.done:
+                    self.frontier.mark_done(url)
+                self.frontier.add_many(checkpoint.pending)
+                self.resumed_found = set(checkpoint.found)
+                log_message(
+                    f"Resuming crawl of website {self.website_id} from checkpoint: "
+                    f"{len(checkpoint.done)} done, {len(checkpoint.pending)} pending",
+                    'info'
+                )
+                return True
+            finally:
+                db.session.remove()
+
+    def found_urls(self) -> Set[str]:
+        return self.resumed_found | {r['url'] for r in self.results if r.get('url')}
+
+    def _write(self, pending: List[str], done: List[str], found: List[str]):
+        with self.app.app_context():
+            try:
+                CrawlCheckpoint.save(self.website_id, pending, done, found)
+                commit_with_retry()
+            except Exception as e:
+                log_message(f"Error saving crawl checkpoint for website {self.website_id}: {e}", 'warning')
+                db.session.rollback()
+            finally:
+                db.session.remove()
+
+    async def save(self):
+        # Snapshot on the loop so the frontier can't change underneath the writer thread
+        pending = self.frontier.urls('queued', 'in_flight')
+        done = self.frontier.urls('done')
+        found = list(self.found_urls())
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._write, pending, done, found)
+
+    async def run(self):
+        """Save a checkpoint every ``interval`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.save()
+
+    def clear(self):
+        """Drop the checkpoint once the crawl has finished. Call inside an app context."""
+        CrawlCheckpoint.clear(self.website_id)
@@ -0,0 +1,158 @@
+"""
+Adaptive crawl concurrency.
+
+Instead of a fixed number of pages in flight, the crawl asks a
+ConcurrencyController for a slot before loading each page. The controller
+grows the limit by one while pages load quickly and the host has headroom,
+and halves it when page latency climbs, host memory runs low, too many
+Chromium renderers are alive or the target server starts failing.
+"""
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, List
+
+from config import (
+    SCANNER_LATENCY_FACTOR,
+    SCANNER_MAX_ERROR_RATE,
+    SCANNER_MAX_RENDERERS,
+    SCANNER_MIN_FREE_MEMORY,
+)
+from scanner.log import log_message
+
+
+def available_memory_fraction() -> float | None:
+    """Fraction of host memory still available, None when /proc/meminfo can't be read."""
+    try:
+        meminfo = {}
+        with open('/proc/meminfo') as f:
+            for line in f:
+                key, value = line.split(':', 1)
+                meminfo[key] = int(value.split()[0])
+        return meminfo['MemAvailable'] / meminfo['MemTotal']
+    except (OSError, KeyError, ValueError, ZeroDivisionError):
+        return None
+
+
+def chromium_renderer_count() -> int | None:
+    """Number of Chromium renderer processes on the host, None when /proc can't be read."""
+    try:
+        pids = [pid for pid in os.listdir('/proc') if pid.isdigit()]
+    except OSError:
+        return None
+
+    count = 0
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                cmdline = f.read()
+        except OSError:
+            continue
+        if b'--type=renderer' in cmdline and b'chrom' in cmdline:
+            count += 1
+    return count
+
+
+class ConcurrencyController():
+    """Additive-increase / multiplicative-decrease limit on in-flight pages."""
+
+    def __init__(
+        self,
+        min_limit: int,
+        max_limit: int,
+        latency_factor: float = SCANNER_LATENCY_FACTOR,
+        max_error_rate: float = SCANNER_MAX_ERROR_RATE,
+        min_free_memory: float = SCANNER_MIN_FREE_MEMORY,
+        max_renderers: int = SCANNER_MAX_RENDERERS,
+        memory_reader: Callable[[], float | None] = available_memory_fraction,
+        renderer_reader: Callable[[], int | None] = chromium_renderer_count,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = self.min_limit
+        self.in_flight = 0
+        self.latency_factor = latency_factor
+        self.max_error_rate = max_error_rate
+        self.min_free_memory = min_free_memory
+        self.max_renderers = max_renderers
+        self._memory_reader = memory_reader
+        self._renderer_reader = renderer_reader
+        # fastest average window latency seen so far, used as the "healthy" reference
+        self.baseline_latency: float | None = None
+        self._latencies: List[float] = []
+        self._errors = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def release(self, latency: float, error: bool = False):
+        async with self._condition:
+            self.in_flight -= 1
+            self.record(latency, error)
+            self._condition.notify_all()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold a slot while loading one page. The caller marks failures with ``outcome['error'] = True``."""
+        await self.acquire()
+        outcome = {'error': False}
+        start = time.monotonic()
+        try:
+            yield outcome
+        except Exception:
+            outcome['error'] = True
+            raise
+        finally:
+            await self.release(time.monotonic() - start, outcome['error'])
+
+    def record(self, latency: float, error: bool = False):
+        self._latencies.append(latency)
+        if error:
+            self._errors += 1
+        # Re-evaluate once per "round" of pages at the current limit
+        if len(self._latencies) >= max(self.limit, 3):
+            self.adjust()
+
+    def adjust(self) -> int:
+        samples = len(self._latencies)
+        if not samples:
+            return self.limit
+
+        avg_latency = sum(self._latencies) / samples
+        error_rate = self._errors / samples
+        self._latencies = []
+        self._errors = 0
+
+        if self.baseline_latency is None or avg_latency < self.baseline_latency:
+            self.baseline_latency = avg_latency
+
+        reason = None
+        if error_rate > self.max_error_rate:
+            reason = f"error rate {error_rate:.0%}"
+        elif avg_latency > self.baseline_latency * self.latency_factor:
+            reason = f"latency {avg_latency:.1f}s vs baseline {self.baseline_latency:.1f}s"
+        else:
+            free_memory = self._memory_reader()
+            if free_memory is not None and free_memory < self.min_free_memory:
+                reason = f"free memory {free_memory:.0%}"
+            else:
+                renderers = self._renderer_reader()
+                if renderers is not None and renderers > self.max_renderers:
+                    reason = f"{renderers} renderer processes"
+
+        previous = self.limit
+        if reason:
+            self.limit = max(self.min_limit, self.limit // 2)
+        else:
+            self.limit = min(self.max_limit, self.limit + 1)
+
+        if self.limit != previous:
+            log_message(
+                f"Crawl concurrency {previous} -> {self.limit}" + (f" ({reason})" if reason else ""),
+                'info'
+            )
+        return self.limit
@@ -0,0 +1,26 @@
+import time
+
+from models import db
+from scanner.log import log_message
+from sqlalchemy.exc import OperationalError
+
+
+def commit_with_retry(max_retries=3, retry_delay=1):
+    """
+    Commit database changes with retry logic for handling database locks.
+    Useful for SQLite which can have concurrent access issues.
+    """
+    for attempt in range(max_retries):
+        try:
+            db.session.commit()
+            return True
+        except OperationalError as e:
+            if 'database is locked' in str(e) and attempt < max_retries - 1:
+                log_message(f"Database locked, retrying in {retry_delay}s (attempt {attempt + 1}/{max_retries})", 'warning')
+                db.session.rollback()
+                time.sleep(retry_delay)
+            else:
+                log_message(f"Database commit failed after {attempt + 1} attempts: {str(e)}", 'error')
+                db.session.rollback()
+                raise
+    return False
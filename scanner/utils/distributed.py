@@ -0,0 +1,137 @@
+"""
+Shared frontier for distributed website crawls.
+
+In distributed mode a website crawl is not one long Celery task but a stream of
+``scan_page_batch`` tasks, each scanning a few pages, spread over every worker
+node. The batches share the crawl's state in Redis:
+
+- ``seen``: every URL ever queued, so each page is scanned once across workers
+- ``found``: URLs that produced a report, for the orphaned site cleanup
+- ``outstanding``: page batches queued or running
+- ``done``: pages finished, for progress reporting
+- ``finished``: task IDs of the batches already counted as finished
+
+A batch adds the batches it spawns to ``outstanding`` before removing itself,
+so the counter only reaches zero once the whole crawl has drained, and exactly
+one batch sees that and queues the finalizer.
+
+Batches carry the ID of their crawl. A crawl can't be started while another one
+of the website is active, and a batch of another crawl (left over from one
+that expired) or one counted already (redelivered after its worker was lost)
+changes nothing.
+"""
+from typing import Iterable, List, Set, Tuple
+
+import redis
+
+from config import SCANNER_CRAWL_STATE_TTL, SCANNER_REDIS_URL
+
+_KEY_PREFIX = "a11y:crawl"
+
+
+def split_batches(urls: List[str], size: int) -> List[List[str]]:
+    size = max(1, size)
+    return [urls[i:i + size] for i in range(0, len(urls), size)]
+
+
+class SharedFrontier():
+    """Redis backed crawl state for one website, shared by every worker scanning it."""
+
+    def __init__(self, website_id: int, redis_url: str = SCANNER_REDIS_URL, ttl: int = SCANNER_CRAWL_STATE_TTL):
+        self.website_id = website_id
+        self.ttl = ttl
+        self._redis = redis.Redis.from_url(redis_url)
+
+    def _key(self, name: str) -> str:
+        return f"{_KEY_PREFIX}:{self.website_id}:{name}"
+
+    @property
+    def _keys(self) -> List[str]:
+        return [self._key(name) for name in ('meta', 'seen', 'found', 'outstanding', 'done', 'finished')]
+
+    def _touch(self, pipe):
+        # An abandoned crawl (every worker lost) expires instead of blocking the website forever
+        for key in self._keys:
+            pipe.expire(key, self.ttl)
+
+    def start(self, crawl_id: str, root: str) -> bool:
+        """Reset the crawl state with the root URL as its only outstanding batch.
+
+        Returns False, changing nothing, while another crawl of the website is active.
+        """
+        if not self._redis.hsetnx(self._key('meta'), 'crawl_id', crawl_id):
+            return False
+        with self._redis.pipeline() as pipe:
+            pipe.delete(*[key for key in self._keys if key != self._key('meta')])
+            pipe.hset(self._key('meta'), 'root', root)
+            pipe.sadd(self._key('seen'), root)
+            pipe.set(self._key('outstanding'), 1)
+            pipe.set(self._key('done'), 0)
+            self._touch(pipe)
+            pipe.execute()
+        return True
+
+    @property
+    def crawl_id(self) -> str | None:
+        value = self._redis.hget(self._key('meta'), 'crawl_id')
+        return value.decode() if value is not None else None
+
+    def active(self) -> bool:
+        return bool(self._redis.exists(self._key('meta')))
+
+    def claim(self, urls: Iterable[str]) -> List[str]:
+        """Mark URLs as seen. Returns the ones no worker had seen before, in order."""
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return []
+        with self._redis.pipeline() as pipe:
+            for url in urls:
+                pipe.sadd(self._key('seen'), url)
+            added = pipe.execute()
+        return [url for url, was_added in zip(urls, added) if was_added]
+
+    def spawn(self, batches: int):
+        """Count batches about to be queued. Call before finishing the batch that found them."""
+        self._redis.incrby(self._key('outstanding'), batches)
+
+    def finish(self, crawl_id: str, batch_id: str, pages: int, found: Iterable[str]) -> int | None:
+        """Record a finished batch. Returns the batches still outstanding, 0 when the crawl is over.
+
+        Returns None, changing nothing, when the batch isn't part of the active
+        crawl or was recorded already.
+        """
+        found = list(found)
+        with self._redis.pipeline() as pipe:
+            while True:
+                try:
+                    # the crawl can't be replaced, nor the batch recorded, between the checks and the update
+                    pipe.watch(self._key('meta'), self._key('finished'))
+                    current = pipe.hget(self._key('meta'), 'crawl_id')
+                    if current is None or current.decode() != crawl_id or pipe.sismember(self._key('finished'), batch_id):
+                        pipe.reset()
+                        return None
+                    pipe.multi()
+                    pipe.sadd(self._key('finished'), batch_id)
+                    if found:
+                        pipe.sadd(self._key('found'), *found)
+                    pipe.incrby(self._key('done'), pages)
+                    pipe.decr(self._key('outstanding'))
+                    self._touch(pipe)
+                    results = pipe.execute()
+                    return int(results[3 if found else 2])
+                except redis.WatchError:
+                    continue
+
+    def progress(self) -> Tuple[int, int]:
+        """Pages done and pages seen so far."""
+        with self._redis.pipeline() as pipe:
+            pipe.get(self._key('done'))
+            pipe.scard(self._key('seen'))
+            done, seen = pipe.execute()
+        return int(done or 0), int(seen or 0)
+
+    def found(self) -> Set[str]:
+        return {url.decode() for url in self._redis.smembers(self._key('found'))}
+
+    def clear(self):
+        self._redis.delete(*self._keys)
@@ -0,0 +1,101 @@
+"""
+Incremental rescans: skip pages that did not change since their last report.
+
+Before rendering a page the scanner sends a cheap conditional GET with the
+ETag / Last-Modified recorded at its last scan. A page counts as unchanged
+when the server answers 304, or when the served HTML hashes the same after
+normalisation (many servers send no validators). The previous report is then
+carried forward, as long as the rule set the website is scanned with and the
+bundled axe-core version haven't changed either.
+
+The content hash covers the HTML the server sends rather than the rendered
+DOM, since hashing the rendered DOM would need the render we want to skip.
+Scripts, styles, comments and nonces are stripped so per-request tokens in
+them don't defeat the comparison.
+"""
+import hashlib
+import json
+import re
+from typing import List, TypedDict
+
+import requests
+
+from scanner.accessibility.ace import get_axe_version
+from scanner.browser.report import ACCESSIBILITY_USER_AGENT
+from scanner.log import log_message
+
+_SCRIPT_STYLE = re.compile(r"<(script|style|noscript)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+_NONCE = re.compile(r"""\s(nonce|integrity|data-csrf[\w-]*)\s*=\s*("[^"]*"|'[^']*'|\S+)""", re.IGNORECASE)
+_CSRF_INPUT = re.compile(r"""<input\b[^>]*name\s*=\s*["']?[\w-]*(csrf|token)[\w-]*[^>]*>""", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+class PageValidators(TypedDict, total=False):
+    """What a Site remembers about the version of the page its last report describes."""
+    etag: str | None
+    last_modified: str | None
+    content_hash: str | None
+    rules_fingerprint: str | None
+
+
+class PageProbe(PageValidators, total=False):
+    status: int
+    # True when the server or the content hash says the page is the one last scanned
+    unchanged: bool
+
+
+def normalize_html(html: str) -> str:
+    html = _SCRIPT_STYLE.sub("", html)
+    html = _COMMENT.sub("", html)
+    html = _CSRF_INPUT.sub("", html)
+    html = _NONCE.sub("", html)
+    return _WHITESPACE.sub(" ", html).strip()
+
+
+def content_hash(html: str) -> str:
+    return hashlib.sha256(normalize_html(html).encode("utf-8")).hexdigest()
+
+
+def rules_fingerprint(tags: List[str], ace_config: str, profile: str = "full") -> str:
+    """Identifies the rule set, axe-core version and scan profile a page is scanned with, a change forces a full rescan."""
+    fields = {"tags": sorted(tags), "config": ace_config or "", "axe": get_axe_version(), "profile": profile}
+    payload = json.dumps(fields, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def probe_page(url: str, previous: PageValidators | None = None) -> PageProbe:
+    """Conditional GET of a page against the validators of its last scan."""
+    previous = previous or {}
+    headers = {'User-Agent': ACCESSIBILITY_USER_AGENT}
+    if previous.get('etag'):
+        headers['If-None-Match'] = previous['etag']
+    if previous.get('last_modified'):
+        headers['If-Modified-Since'] = previous['last_modified']
+
+    try:
+        response = requests.get(url, headers=headers, timeout=15, verify=False)
+    except requests.RequestException as e:
+        log_message(f"Probe of {url} failed: {e}", 'debug')
+        return {'status': 0, 'unchanged': False}
+
+    if response.status_code == 304:
+        return {
+            'status': 304,
+            'etag': response.headers.get('ETag', previous.get('etag')),
+            'last_modified': response.headers.get('Last-Modified', previous.get('last_modified')),
+            'content_hash': previous.get('content_hash'),
+            'unchanged': True,
+        }
+
+    probe: PageProbe = {
+        'status': response.status_code,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'content_hash': None,
+        'unchanged': False,
+    }
+    if response.status_code == 200 and 'html' in response.headers.get('Content-Type', 'text/html'):
+        probe['content_hash'] = content_hash(response.text)
+        probe['unchanged'] = bool(previous.get('content_hash')) and probe['content_hash'] == previous['content_hash']
+    return probe
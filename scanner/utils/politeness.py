@@ -0,0 +1,169 @@
+"""
+Per-host and per-Domain politeness for crawls.
+
+Before loading a page the crawler waits on two token buckets: one for the
+page's host and one for the Domain the website belongs to. Buckets live in
+Redis so every Celery worker scanning the same origin shares them. When Redis
+is unreachable each process falls back to in-memory buckets, which still keeps
+a single worker polite.
+
+A host's robots.txt ``Crawl-delay`` lowers its rate to one page per delay.
+"""
+import asyncio
+import time
+from typing import Dict, Tuple
+from urllib.robotparser import RobotFileParser
+
+import redis.asyncio as aioredis
+import requests
+from redis.exceptions import RedisError
+
+from config import (
+    SCANNER_DOMAIN_BURST,
+    SCANNER_DOMAIN_RATE,
+    SCANNER_HOST_BURST,
+    SCANNER_HOST_RATE,
+    SCANNER_REDIS_URL,
+)
+from scanner.browser.report import ACCESSIBILITY_USER_AGENT
+from scanner.log import log_message
+from utils.urls import get_netloc, get_website_url
+
+# Reserve one token and return how long the caller has to wait for it. Tokens
+# may go negative so concurrent callers queue up behind each other.
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate) - 1
+local wait = 0
+if tokens < 0 then
+    wait = -tokens / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity / rate + wait) * 1000) + 60000)
+return tostring(wait)
+"""
+
+_KEY_PREFIX = "a11y:politeness"
+
+
+class TokenBucket():
+    """In-memory token bucket with the same reservation semantics as the Redis script."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, now: float | None = None) -> float:
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate) - 1
+        self.updated = now
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+
+# Shared by every crawl in this process so the fallback still spans concurrent scans
+_local_buckets: Dict[Tuple[str, float, float], TokenBucket] = {}
+
+
+def _local_reserve(key: str, rate: float, capacity: float) -> float:
+    bucket = _local_buckets.get((key, rate, capacity))
+    if bucket is None:
+        bucket = _local_buckets[(key, rate, capacity)] = TokenBucket(rate, capacity)
+    return bucket.reserve()
+
+
+def fetch_crawl_delay(origin: str) -> float | None:
+    """Crawl-delay robots.txt sets for our user agent, None when unset or unreachable."""
+    try:
+        response = requests.get(
+            f"{origin}/robots.txt", timeout=10, verify=False,
+            headers={'User-Agent': ACCESSIBILITY_USER_AGENT}
+        )
+        if response.status_code >= 400:
+            return None
+        parser = RobotFileParser()
+        parser.parse(response.text.splitlines())
+        delay = parser.crawl_delay(ACCESSIBILITY_USER_AGENT)
+        return float(delay) if delay else None
+    except Exception as e:
+        log_message(f"Could not read robots.txt for {origin}: {e}", 'debug')
+        return None
+
+
+class PolitenessScheduler():
+    """Rate limits page loads of one crawl against shared per-host and per-Domain buckets."""
+
+    def __init__(
+        self,
+        domain: str | None = None,
+        host_rate: float = SCANNER_HOST_RATE,
+        host_burst: float = SCANNER_HOST_BURST,
+        domain_rate: float = SCANNER_DOMAIN_RATE,
+        domain_burst: float = SCANNER_DOMAIN_BURST,
+        redis_url: str | None = SCANNER_REDIS_URL,
+    ):
+        self.domain = domain
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.domain_rate = domain_rate
+        self.domain_burst = domain_burst
+        self._redis = aioredis.from_url(redis_url) if redis_url else None
+        self._script = self._redis.register_script(_TOKEN_BUCKET_LUA) if self._redis else None
+        self._crawl_delays: Dict[str, float | None] = {}
+        self.waited = 0.0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        if self._redis is not None:
+            try:
+                await self._redis.aclose()
+            except Exception:
+                pass
+            self._redis = None
+
+    async def crawl_delay(self, url: str) -> float | None:
+        origin = get_website_url(url)
+        if origin not in self._crawl_delays:
+            loop = asyncio.get_running_loop()
+            self._crawl_delays[origin] = await loop.run_in_executor(None, fetch_crawl_delay, origin)
+            if self._crawl_delays[origin]:
+                log_message(f"Honouring Crawl-delay of {self._crawl_delays[origin]}s for {origin}", 'info')
+        return self._crawl_delays[origin]
+
+    async def _reserve(self, key: str, rate: float, capacity: float) -> float:
+        if self._script is not None:
+            try:
+                return float(await self._script(keys=[f"{_KEY_PREFIX}:{key}"], args=[rate, capacity]))
+            except (RedisError, OSError) as e:
+                log_message(f"Politeness buckets unavailable in Redis, using local buckets: {e}", 'warning')
+                await self.close()
+                self._script = None
+        return _local_reserve(key, rate, capacity)
+
+    async def wait(self, url: str) -> float:
+        """Sleep until both the host and the Domain allow another page load. Returns the time waited."""
+        host_rate, host_burst = self.host_rate, self.host_burst
+        delay = await self.crawl_delay(url)
+        if delay:
+            host_rate, host_burst = min(host_rate, 1 / delay), 1
+
+        wait = await self._reserve(f"host:{get_netloc(url)}", host_rate, host_burst)
+        if self.domain:
+            wait = max(wait, await self._reserve(f"domain:{self.domain}", self.domain_rate, self.domain_burst))
+
+        if wait > 0:
+            self.waited += wait
+            await asyncio.sleep(wait)
+        return wait
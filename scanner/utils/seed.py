@@ -0,0 +1,128 @@
+"""
+Seed URLs for a website crawl.
+
+Starting a crawl from the root URL alone leaves every worker but one idle
+until the root page's links are known. The crawl is seeded instead with:
+
+- the pages listed in the website's sitemaps (from robots.txt ``Sitemap:``
+  lines, falling back to ``/sitemap.xml``), following sitemap indexes
+- the pages the website already has as ``Site`` rows from earlier scans
+
+Seeds are normalised the same way links found on pages are (same origin, no
+fragment or query, no document/media files), so the frontier deduplicates
+them against discovered links. Pages that aren't listed anywhere are still
+found by link discovery.
+"""
+import gzip
+import re
+import xml.etree.ElementTree as ET
+from typing import Iterable, List, Set
+
+import requests
+
+from config import SCANNER_SEED_LIMIT
+from scanner.browser.parse import SKIPPED_FILES_PATTERN
+from scanner.browser.report import ACCESSIBILITY_USER_AGENT
+from scanner.log import log_message
+from utils.urls import get_website_url
+
+# Same file types link discovery drops
+_SKIPPED_FILES = re.compile(SKIPPED_FILES_PATTERN)
+# Nested sitemap indexes are followed this deep
+_MAX_SITEMAP_DEPTH = 3
+
+
+def normalize_seed(url: str, origin: str) -> str | None:
+    """A seed URL as link discovery would have produced it, None when the crawl would skip it."""
+    url = url.strip()
+    if not url.startswith(origin) or '#' in url:
+        return None
+    url = url.split('?')[0]
+    if url in (origin, origin + '/') or _SKIPPED_FILES.search(url):
+        return None
+    return url
+
+
+def _get(url: str) -> requests.Response | None:
+    try:
+        response = requests.get(url, timeout=15, verify=False, headers={'User-Agent': ACCESSIBILITY_USER_AGENT})
+    except requests.RequestException as e:
+        log_message(f"Could not fetch {url}: {e}", 'debug')
+        return None
+    return response if response.status_code < 400 else None
+
+
+def robots_sitemaps(origin: str) -> List[str]:
+    """Sitemap URLs listed in the origin's robots.txt."""
+    response = _get(f"{origin}/robots.txt")
+    if response is None:
+        return []
+    return [
+        line.split(':', 1)[1].strip()
+        for line in response.text.splitlines()
+        if line.lower().startswith('sitemap:')
+    ]
+
+
+def parse_sitemap(content: bytes) -> tuple[List[str], List[str]]:
+    """Returns the page URLs and the nested sitemap URLs of a sitemap or sitemap index."""
+    if content[:2] == b'\x1f\x8b':
+        content = gzip.decompress(content)
+    try:
+        root = ET.fromstring(content)
+    except ET.ParseError:
+        return [], []
+
+    locs = [element.text.strip() for element in root.iter() if element.tag.endswith('loc') and element.text]
+    if root.tag.endswith('sitemapindex'):
+        return [], locs
+    return locs, []
+
+
+def sitemap_urls(origin: str, limit: int = SCANNER_SEED_LIMIT) -> List[str]:
+    """Page URLs listed in the origin's sitemaps, up to ``limit``."""
+    pending = robots_sitemaps(origin) or [f"{origin}/sitemap.xml"]
+    pending = [(url, 0) for url in pending]
+    visited: Set[str] = set()
+    pages: List[str] = []
+
+    while pending and len(pages) < limit:
+        url, depth = pending.pop(0)
+        if url in visited:
+            continue
+        visited.add(url)
+        response = _get(url)
+        if response is None:
+            continue
+        found, nested = parse_sitemap(response.content)
+        pages.extend(found[:limit - len(pages)])
+        if depth < _MAX_SITEMAP_DEPTH:
+            pending.extend((nested_url, depth + 1) for nested_url in nested)
+    return pages
+
+
+def seed_urls(website_url: str, known_urls: Iterable[str] = (), limit: int = SCANNER_SEED_LIMIT) -> List[str]:
+    """
+    URLs to queue next to the root URL when a crawl starts: the website's known
+    pages first, then its sitemap pages, normalised and deduplicated.
+    """
+    origin = get_website_url(website_url)
+    seeds: dict[str, None] = {}
+    for url in known_urls:
+        normalized = normalize_seed(url, origin)
+        if normalized:
+            seeds[normalized] = None
+
+    try:
+        listed = sitemap_urls(origin, limit)
+    except Exception as e:
+        log_message(f"Error reading sitemaps of {origin}: {e}", 'warning')
+        listed = []
+    for url in listed:
+        normalized = normalize_seed(url, origin)
+        if normalized:
+            seeds[normalized] = None
+
+    seeds = list(seeds)[:limit]
+    log_message(f"Seeding crawl of {website_url} with {len(seeds)} URLs ({len(listed)} listed in sitemaps)", 'info')
+    return seeds
@@ -0,0 +1,173 @@
+"""
+Single writer for the reports of a crawl.
+
+Scanning workers hand finished page reports to a ReportWriter instead of each
+opening their own transaction. The writer drains its queue in batches, flushing
+once ``batch_size`` reports are waiting or ``flush_interval`` seconds after the
+first one arrived. Each batch resolves or creates its Site rows in bulk and
+inserts its Report rows in one transaction, so a crawl makes a handful of
+commits per second instead of one per page, and SQLite sees a single writer.
+"""
+import asyncio
+import time
+from typing import List, Tuple
+
+from sqlalchemy.exc import OperationalError
+
+from config import SCANNER_WRITE_BATCH_SIZE, SCANNER_WRITE_FLUSH_INTERVAL
+from models import db
+from models.report import Report
+from models.website import Site, Website
+from scanner.browser.report import AccessibilityReport
+from scanner.log import log_message
+from scanner.utils.incremental import PageValidators
+from utils.urls import get_netloc
+
+PendingReport = Tuple[AccessibilityReport, PageValidators | None]
+
+_MAX_RETRIES = 3
+_RETRY_DELAY = 1
+
+
+class ReportWriter():
+
+    def __init__(self, app, website, batch_size: int = SCANNER_WRITE_BATCH_SIZE, flush_interval: float = SCANNER_WRITE_FLUSH_INTERVAL):
+        """``website`` only needs ``id`` and ``url`` (a WebsiteProxy)."""
+        self.app = app
+        self.website = website
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        # bounded so reports (screenshots included) can't pile up if the database falls behind
+        self.queue: asyncio.Queue[PendingReport | None] = asyncio.Queue(maxsize=self.batch_size * 4)
+        self._task: asyncio.Task | None = None
+        self._netloc = get_netloc(website.url)
+        # metrics
+        self.written = 0
+        self.failed = 0
+        self.skipped = 0
+        self.batches = 0
+        self.write_time = 0.0
+        self.max_write_time = 0.0
+        self.max_queue_depth = 0
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def put(self, report: AccessibilityReport, validators: PageValidators | None = None):
+        """Queue a finished page report. Waits while the queue is full."""
+        if get_netloc(report['url']) != self._netloc:
+            log_message(f"Skipping site {report['url']} as it is not part of the website domain {self._netloc}", 'warning')
+            self.skipped += 1
+            return
+        await self.queue.put((report, validators))
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+
+    async def close(self):
+        """Write everything still queued and stop the writer."""
+        if self._task is None:
+            return
+        await self.queue.put(None)
+        await self._task
+        self._task = None
+        log_message(f"Report writer for website {self.website.id}: {self.stats()}", 'info')
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            item = await self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+            await self.flush(batch)
+
+    async def flush(self, batch: List[PendingReport]):
+        depth = self.queue.qsize()
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        written = await loop.run_in_executor(None, self._write, batch)
+        elapsed = time.perf_counter() - started
+
+        self.batches += 1
+        self.written += written
+        self.failed += len(batch) - written
+        self.write_time += elapsed
+        self.max_write_time = max(self.max_write_time, elapsed)
+        log_message(f"Wrote {written}/{len(batch)} reports in {elapsed * 1000:.0f}ms, {depth} waiting", 'debug')
+
+    def _write(self, batch: List[PendingReport]) -> int:
+        with self.app.app_context():
+            try:
+                try:
+                    return self._write_batch(batch)
+                except Exception as e:
+                    if len(batch) == 1:
+                        log_message(f"Error storing report for {batch[0][0].get('url')}: {str(e)}", 'error')
+                        return 0
+                    # Isolate the report that broke the batch, the others still get stored
+                    log_message(f"Error storing a batch of {len(batch)} reports, retrying one by one: {str(e)}", 'warning')
+                    return sum(self._write([item]) for item in batch)
+            finally:
+                db.session.remove()
+
+    def _write_batch(self, batch: List[PendingReport]) -> int:
+        for attempt in range(_MAX_RETRIES):
+            try:
+                website = db.session.get(Website, self.website.id)
+                if website is None:
+                    log_message(f"Website {self.website.id} not found in database", 'error')
+                    return 0
+
+                sites = Site.get_or_create_many([report['url'] for report, _ in batch], website)
+                # one call for the batch, it takes the locks of all its pages in order
+                Site.record_reports([(sites[report['url']], Report(report, site_id=sites[report['url']].id)) for report, _ in batch])
+                for report, validators in batch:
+                    site = sites[report['url']]
+                    site.last_scanned = db.func.current_timestamp()
+                    site.scanning = False
+                    if validators:
+                        site.set_validators(validators)
+                db.session.commit()
+                return len(batch)
+            except OperationalError as e:
+                db.session.rollback()
+                if 'database is locked' not in str(e) or attempt == _MAX_RETRIES - 1:
+                    raise
+                log_message(f"Database locked, retrying report batch in {_RETRY_DELAY}s (attempt {attempt + 1}/{_MAX_RETRIES})", 'warning')
+                time.sleep(_RETRY_DELAY)
+            except Exception:
+                db.session.rollback()
+                raise
+        return 0
+
+    def stats(self) -> dict:
+        return {
+            'written': self.written,
+            'failed': self.failed,
+            'skipped': self.skipped,
+            'batches': self.batches,
+            'avg_write_ms': round(self.write_time / self.batches * 1000, 1) if self.batches else 0.0,
+            'max_write_ms': round(self.max_write_time * 1000, 1),
+            'max_queue_depth': self.max_queue_depth,
+        }
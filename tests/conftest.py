@@ -147,7 +147,7 @@ def add_report(app):
             "tags": ["wcag2a"],
         }
         report = Report(data, site.id)
-        db.session.add(report)
+        site.record_report(report)
         db.session.commit()
         return report
 
@@ -175,3 +175,39 @@ def jwt_header(app):
         return {"Authorization": f"Bearer {token}"}
 
     return _make
+
+
+@pytest.fixture()
+def render_pages():
+    """Run ``check(page)`` in headless Chromium on fixture HTML served for example.com URLs.
+
+    ``pages`` maps URLs to their HTML, the first one is opened and other
+    requests are aborted. Skipped when Playwright's Chromium isn't installed.
+    """
+    import asyncio
+
+    from playwright.async_api import async_playwright
+    from scanner.browser.pool import CHROMIUM_ARGS
+
+    async def _render(pages, check):
+        async def serve(route):
+            html = pages.get(route.request.url)
+            if html is None:
+                await route.abort()
+            else:
+                await route.fulfill(body=html, content_type="text/html")
+
+        async with async_playwright() as p:
+            try:
+                browser = await p.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+            except Exception as e:
+                pytest.skip(f"Chromium is not available: {str(e).splitlines()[0]}")
+            try:
+                page = await browser.new_page()
+                await page.route("**/*", serve)
+                await page.goto(next(iter(pages)))
+                return await check(page)
+            finally:
+                await browser.close()
+
+    return lambda pages, check: asyncio.run(_render(pages, check))
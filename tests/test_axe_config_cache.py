@@ -0,0 +1,71 @@
+"""Compiled axe configs cached per tag set and rules version."""
+from models.rules import Check, Rule, get_compiled_axe_config
+
+
+def _rule(name, tags, check=None):
+    rule = Rule(name=name, description=f"{name} description", help=f"{name} help", tags=tags)
+    if check is not None:
+        rule.any = [check]
+    rule.save()
+    return rule
+
+
+def test_config_compiled_once_per_rules_version(app, make_user, make_website, monkeypatch):
+    from models import db
+
+    check = Check(name="has-label", evaluate="(node) => node.hasAttribute('aria-label')", pass_text="ok", fail_text="missing", incomplete_text="unknown")
+    check.save()
+    _rule("custom-label", ["custom", "wcag2a"], check)
+    _rule("custom-other", ["other"])
+
+    compiled = []
+    for_tags = Rule.for_tags
+    monkeypatch.setattr(Rule, "for_tags", staticmethod(lambda tags: compiled.append(tags) or for_tags(tags)))
+
+    website = make_website(make_user())
+    website.tags = "custom"
+    config = website.get_ace_config()
+    assert '"custom-label"' in config and '"has-label"' in config and "custom-other" not in config
+    # same tags in another order or with spacing hit the cache
+    assert get_compiled_axe_config([f" {tag} " for tag in reversed(website.get_tags())]) == config
+    assert len(compiled) == 1
+
+    # editing a rule changes the rules version
+    rule = db.session.query(Rule).filter_by(name="custom-other").one()
+    rule.tags = "custom"
+    rule.save()
+    assert "custom-other" in get_compiled_axe_config(["custom"])
+    assert len(compiled) == 2
+
+    db.session.delete(rule)
+    db.session.commit()
+    assert get_compiled_axe_config(["custom"]) == config
+    assert len(compiled) == 3
+    assert get_compiled_axe_config([]) == ""
+
+
+def test_every_rule_change_bumps_the_rules_version(app, client, make_user, jwt_header):
+    from models import db
+    from models.rules import rules_version
+
+    first, second = _rule("custom-first", ["custom"]), _rule("custom-second", ["other"])
+    version = rules_version()
+    assert '"custom-second"' not in get_compiled_axe_config(["custom"])
+
+    # edits within the same second as the last one still change the version
+    first.help = "first help"
+    db.session.commit()
+    second.tags = "custom"
+    db.session.commit()
+    assert int(rules_version()) == int(version) + 2
+    assert '"custom-second"' in get_compiled_axe_config(["custom"])
+
+    # filling in the cached json isn't a change to the rules
+    second.json = None
+    db.session.commit()
+    version = rules_version()
+    second.to_js_object(update=True, force=True)
+    assert rules_version() == version
+
+    res = client.get("/api/settings/", headers=jwt_header(make_user("admin", is_admin=True)))
+    assert res.status_code == 200 and "rules_version" not in res.get_json()
@@ -0,0 +1,81 @@
+"""The bundled axe-core, registered per browser context instead of fetched per page."""
+import asyncio
+
+from scanner.accessibility.ace import get_accessibility_report, get_axe_source, get_axe_version
+from scanner.browser.context_pool import ContextPool
+
+
+class FakeContext():
+
+    def __init__(self):
+        self.init_scripts = []
+
+    async def add_init_script(self, script):
+        self.init_scripts.append(script)
+
+    async def new_page(self):
+        return None
+
+    async def clear_cookies(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+class FakeBrowser():
+
+    def __init__(self):
+        self.contexts = []
+
+    def is_connected(self):
+        return True
+
+    async def new_context(self, **kwargs):
+        self.contexts.append(FakeContext())
+        return self.contexts[-1]
+
+
+class FakePage():
+    url = "https://example.com/"
+
+    def __init__(self, axe_version=None):
+        self.axe_version = axe_version
+        self.injected = False
+
+    async def evaluate(self, script, arg=None):
+        if script == get_axe_source():
+            self.injected = True
+            self.axe_version = get_axe_version()
+            return True
+        if "window.axe.version === version" in script:
+            return {'loaded': self.axe_version == arg, 'config': None}
+        return {'violations': [], 'passes': [], 'incomplete': [], 'inapplicable': []}
+
+
+def test_bundled_version_is_pinned():
+    assert get_axe_version() == "4.9.1"
+
+
+def test_contexts_register_axe_once():
+    browser = FakeBrowser()
+
+    async def run():
+        async with ContextPool(browser) as pool:
+            for _ in range(3):
+                async with pool.page():
+                    pass
+
+    asyncio.run(run())
+    assert len(browser.contexts) == 1
+    assert browser.contexts[0].init_scripts.count(get_axe_source()) == 1
+
+
+def test_report_injects_only_when_axe_is_missing_or_replaced():
+    registered = FakePage(get_axe_version())
+    assert 'error' not in asyncio.run(get_accessibility_report(registered, tags=['wcag2a']))
+    assert not registered.injected
+
+    for page in (FakePage(), FakePage("1.0.0")):
+        assert 'error' not in asyncio.run(get_accessibility_report(page, tags=['wcag2a']))
+        assert page.injected
@@ -0,0 +1,51 @@
+"""Runs on the pool's shared loop don't leave tasks behind for the next one."""
+import asyncio
+
+import pytest
+
+from scanner.browser import pool
+
+
+@pytest.fixture()
+def browser_pool(monkeypatch):
+    # no browsers are needed to run coroutines on the pool's loop
+    shared = pool.BrowserPool(size=1)
+    monkeypatch.setattr(pool, "_pool", shared)
+    yield shared
+    pool.cancel_leftover_tasks(shared.loop)
+    shared.loop.close()
+
+
+def test_tasks_left_by_a_failed_run_are_cancelled(browser_pool):
+    cancelled = []
+
+    async def worker(name):
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            cancelled.append(name)
+            raise
+
+    async def driver():
+        # stands in for the Playwright connection, started with the pool
+        await asyncio.sleep(3600)
+
+    browser_pool._own = {browser_pool.loop.create_task(driver())}
+
+    async def crawl():
+        asyncio.create_task(worker("a"))
+        asyncio.create_task(worker("b"))
+        await asyncio.sleep(0)
+        raise RuntimeError("soft time limit")
+
+    with pytest.raises(RuntimeError):
+        pool.run_async(crawl())
+
+    assert sorted(cancelled) == ["a", "b"]
+    assert asyncio.all_tasks(browser_pool.loop) == browser_pool._own
+
+    async def next_task():
+        return "done"
+
+    assert pool.run_async(next_task()) == "done"
+    assert len(cancelled) == 2
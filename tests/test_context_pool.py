@@ -0,0 +1,91 @@
+"""Browser context reuse across the pages of a crawl."""
+import asyncio
+
+from scanner.browser.context_pool import ContextPool
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    async def evaluate(self, script):
+        self.context.resets += 1
+        return self.context.heap
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self):
+        self.heap = 10 * 1024 * 1024
+        self.resets = 0
+        self.cookie_clears = 0
+        self.closed = False
+        self.init_scripts = []
+
+    async def new_page(self):
+        return FakePage(self)
+
+    async def add_init_script(self, script):
+        self.init_scripts.append(script)
+
+    async def clear_cookies(self):
+        self.cookie_clears += 1
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+
+    def is_connected(self):
+        return True
+
+    async def new_context(self, **kwargs):
+        context = FakeContext()
+        self.contexts.append(context)
+        return context
+
+
+def _scan(pool, pages):
+    async def run():
+        for _ in range(pages):
+            async with pool.page():
+                pass
+    asyncio.run(run())
+
+
+def test_contexts_are_reset_reused_and_recycled():
+    browser = FakeBrowser()
+    pool = ContextPool(browser, max_pages=3)
+    _scan(pool, 7)
+
+    # 7 pages over contexts serving at most 3 pages each
+    assert len(browser.contexts) == 3
+    first = browser.contexts[0]
+    assert first.closed and first.resets == 3 and first.cookie_clears == 3
+    assert pool.recycled == 2
+
+    asyncio.run(pool.close())
+    assert all(context.closed for context in browser.contexts)
+
+
+def test_heap_growth_recycles_context():
+    browser = FakeBrowser()
+    pool = ContextPool(browser, max_pages=100, max_heap_growth=50)
+
+    async def run():
+        async with pool.page() as page:
+            pass
+        async with pool.page() as page:
+            page.context.heap += 80 * 1024 * 1024
+
+    asyncio.run(run())
+    assert browser.contexts[0].closed and pool.recycled == 1
@@ -0,0 +1,51 @@
+"""Crawl checkpoints: an interrupted crawl resumes from its saved frontier."""
+import asyncio
+
+from scanner.utils.checkpoint import CrawlCheckpointer
+from scanner.utils.queue import CrawlFrontier
+
+
+def _interrupted_crawl(app, website_id):
+    """Scan one page of three, leave one in flight and persist the checkpoint."""
+
+    async def run():
+        frontier = CrawlFrontier()
+        results = []
+        checkpointer = CrawlCheckpointer(app, website_id, frontier, results)
+        frontier.add_many(["https://example.com", "https://example.com/a", "https://example.com/b"])
+        root = await frontier.get()
+        results.append({"url": root})
+        frontier.task_done(root)
+        await frontier.get()  # /a is in flight when the worker dies
+        await checkpointer.save()
+
+    asyncio.run(run())
+
+
+def test_resume_restores_frontier_and_found_pages(app, make_user, make_website):
+    website = make_website(make_user())
+    _interrupted_crawl(app, website.id)
+
+    frontier = CrawlFrontier()
+    checkpointer = CrawlCheckpointer(app, website.id, frontier, [])
+    assert checkpointer.restore()
+
+    assert frontier.state("https://example.com") == "done"
+    assert frontier.state("https://example.com/a") == "queued"
+    assert frontier.state("https://example.com/b") == "queued"
+    assert frontier.queued == 2 and frontier.done == 1
+    # the root page is not scanned again but still counts as found for the orphan cleanup
+    assert not frontier.add("https://example.com")
+    assert checkpointer.found_urls() == {"https://example.com"}
+
+
+def test_clear_starts_next_crawl_fresh(app, make_user, make_website):
+    from models import db
+
+    website = make_website(make_user())
+    _interrupted_crawl(app, website.id)
+
+    CrawlCheckpointer(app, website.id, CrawlFrontier(), []).clear()
+    db.session.commit()
+
+    assert not CrawlCheckpointer(app, website.id, CrawlFrontier(), []).restore()
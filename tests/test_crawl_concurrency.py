@@ -0,0 +1,94 @@
+"""Unit tests for the adaptive crawl concurrency controller and the website limits feeding it."""
+import asyncio
+
+from scanner.utils.concurrency import ConcurrencyController
+
+
+def _controller(memory=0.5, renderers=0, min_limit=2, max_limit=6):
+    return ConcurrencyController(
+        min_limit=min_limit,
+        max_limit=max_limit,
+        memory_reader=lambda: memory,
+        renderer_reader=lambda: renderers,
+    )
+
+
+def _feed(controller, latency, rounds=1, error=False):
+    for _ in range(rounds):
+        for _ in range(max(controller.limit, 3)):
+            controller.record(latency, error)
+
+
+def test_grows_to_max_while_healthy():
+    controller = _controller()
+    _feed(controller, 1.0, rounds=10)
+    assert controller.limit == 6
+
+
+def test_backs_off_on_errors_latency_and_memory():
+    controller = _controller()
+    _feed(controller, 1.0, rounds=10)
+
+    _feed(controller, 1.0, error=True)
+    assert controller.limit == 3
+
+    _feed(controller, 1.0, rounds=3)
+    assert controller.limit == 6
+    _feed(controller, 5.0)
+    assert controller.limit == 3
+
+    low_memory = _controller(memory=0.05)
+    _feed(low_memory, 1.0, rounds=3)
+    assert low_memory.limit == 2
+
+    busy_host = _controller(renderers=100)
+    _feed(busy_host, 1.0, rounds=3)
+    assert busy_host.limit == 2
+
+
+def test_slots_never_exceed_limit():
+    controller = _controller(min_limit=2, max_limit=2)
+    peak = 0
+
+    async def page():
+        nonlocal peak
+        async with controller.slot():
+            peak = max(peak, controller.in_flight)
+            await asyncio.sleep(0.01)
+
+    async def crawl():
+        await asyncio.gather(*(page() for _ in range(10)))
+
+    asyncio.run(crawl())
+    assert peak == 2
+    assert controller.in_flight == 0
+
+
+def test_website_limits_are_validated_before_they_are_set(app, client, make_user, make_website, jwt_header):
+    from blueprints.website import update_website
+    from models import db
+    from models.website import Website
+
+    admin = make_user(is_admin=True)
+    website = make_website(admin)
+    headers = jwt_header(admin)
+
+    def patch(**limits):
+        res = client.patch(f"/api/websites/{website.id}/", json=limits, headers=headers)
+        db.session.expire_all()
+        limits = db.session.get(Website, website.id)
+        return res.status_code, (limits.min_concurrency, limits.max_concurrency)
+
+    assert patch(min_concurrency=2, max_concurrency=4) == (200, (2, 4))
+    # booleans are not integers here, true would otherwise be stored as 1
+    assert patch(min_concurrency=True) == (400, (2, 4))
+    assert patch(max_concurrency=False) == (400, (2, 4))
+    assert patch(min_concurrency=6, max_concurrency=3) == (400, (2, 4))
+    assert patch(max_concurrency=None) == (200, (2, None))
+
+    # a rejected pair never reaches the session the request would go on to commit
+    for limits in ({"min_concurrency": 6, "max_concurrency": 3}, {"min_concurrency": 3, "max_concurrency": True}):
+        with app.test_request_context(f"/api/websites/{website.id}/", method="PATCH", json=limits, headers=headers):
+            _, status = update_website(website.id)
+            assert status == 400
+            assert (website.min_concurrency, website.max_concurrency) == (2, None)
@@ -0,0 +1,62 @@
+"""Unit tests for the crawl frontier used by website scans."""
+import asyncio
+
+from scanner.utils.queue import CrawlFrontier
+
+
+def test_add_dedupes_across_states():
+    async def run():
+        frontier = CrawlFrontier()
+        assert frontier.add("https://example.com/a")
+        assert not frontier.add("https://example.com/a")
+
+        url = await frontier.get()
+        assert frontier.state(url) == "in_flight"
+        assert not frontier.add(url)
+
+        frontier.task_done(url)
+        assert frontier.state(url) == "done"
+        assert not frontier.add(url)
+        return frontier
+
+    frontier = asyncio.run(run())
+    assert (frontier.queued, frontier.in_flight, frontier.done, frontier.total) == (0, 0, 1, 1)
+
+
+def test_counters_track_a_crawl():
+    async def run():
+        frontier = CrawlFrontier()
+        frontier.add("https://example.com/")
+        url = await frontier.get()
+        assert frontier.add_many(["https://example.com/a", "https://example.com/b", "https://example.com/a"]) == 2
+        assert (frontier.queued, frontier.in_flight, frontier.done) == (2, 1, 0)
+        frontier.task_done(url)
+
+        while frontier.queued:
+            frontier.task_done(await frontier.get())
+        await asyncio.wait_for(frontier.join(), timeout=1)
+        return frontier
+
+    frontier = asyncio.run(run())
+    assert (frontier.queued, frontier.in_flight, frontier.done, frontier.total) == (0, 0, 3, 3)
+
+
+def test_close_wakes_workers():
+    async def run():
+        frontier = CrawlFrontier()
+        results = []
+
+        async def worker():
+            while (url := await frontier.get()) is not None:
+                results.append(url)
+                frontier.task_done(url)
+            frontier.task_done(None)
+
+        workers = [asyncio.create_task(worker()) for _ in range(3)]
+        frontier.add_many(f"https://example.com/{i}" for i in range(10))
+        await frontier.join()
+        await frontier.close(len(workers))
+        await asyncio.wait_for(asyncio.gather(*workers), timeout=1)
+        return results
+
+    assert len(asyncio.run(run())) == 10
@@ -0,0 +1,46 @@
+"""Crawl seeding from sitemaps and a website's known pages."""
+import gzip
+
+import scanner.utils.seed as seed
+from scanner.utils.seed import parse_sitemap, seed_urls
+
+
+class _Response:
+    def __init__(self, body: bytes):
+        self.content = body
+        self.text = body.decode("utf-8", "ignore")
+
+
+INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://example.com/pages.xml.gz</loc></sitemap>
+</sitemapindex>"""
+
+PAGES = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://example.com/about</loc></url>
+  <url><loc>https://example.com/news?page=2</loc></url>
+  <url><loc>https://example.com/syllabus.pdf</loc></url>
+  <url><loc>https://other.org/elsewhere</loc></url>
+</urlset>"""
+
+
+def test_parse_sitemap_and_index():
+    assert parse_sitemap(INDEX) == ([], ["https://example.com/pages.xml.gz"])
+    pages, nested = parse_sitemap(gzip.compress(PAGES))
+    assert nested == [] and len(pages) == 4
+    assert parse_sitemap(b"<html>not a sitemap") == ([], [])
+
+
+def test_seeds_follow_robots_sitemaps_and_known_pages(monkeypatch):
+    responses = {
+        "https://example.com/robots.txt": b"User-agent: *\nSitemap: https://example.com/index.xml\n",
+        "https://example.com/index.xml": INDEX,
+        "https://example.com/pages.xml.gz": gzip.compress(PAGES),
+    }
+    monkeypatch.setattr(seed, "_get", lambda url: _Response(responses[url]) if url in responses else None)
+
+    seeds = seed_urls("https://example.com", known_urls=["https://example.com/", "https://example.com/contact"])
+
+    # known pages first, then sitemap pages normalised like discovered links
+    assert seeds == ["https://example.com/contact", "https://example.com/about", "https://example.com/news"]
@@ -0,0 +1,239 @@
+"""Distributed crawls: page batching, the shared frontier protocol and the orphaned site cleanup."""
+import pytest
+
+from scanner.scan import finalize_crawl
+from scanner.utils import distributed
+from scanner.utils.distributed import SharedFrontier, split_batches
+
+
+class FakeRedis:
+    """The Redis commands the shared frontier uses, in memory, for one client."""
+
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def expire(self, key, ttl):
+        return int(key in self.data)
+
+    def get(self, key):
+        value = self.data.get(key)
+        return None if value is None else str(value).encode()
+
+    def set(self, key, value):
+        self.data[key] = int(value)
+
+    def incrby(self, key, amount):
+        self.data[key] = self.data.get(key, 0) + amount
+        return self.data[key]
+
+    def decr(self, key):
+        return self.incrby(key, -1)
+
+    def hget(self, key, field):
+        value = self.data.get(key, {}).get(field)
+        return None if value is None else value.encode()
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        fields = dict(mapping or {})
+        if field is not None:
+            fields[field] = value
+        self.data.setdefault(key, {}).update(fields)
+
+    def hsetnx(self, key, field, value):
+        if field in self.data.get(key, {}):
+            return 0
+        self.hset(key, field, value)
+        return 1
+
+    def sadd(self, key, *members):
+        values = self.data.setdefault(key, set())
+        added = [member for member in dict.fromkeys(members) if member not in values]
+        values.update(added)
+        return len(added)
+
+    def sismember(self, key, member):
+        return int(member in self.data.get(key, set()))
+
+    def scard(self, key):
+        return len(self.data.get(key, set()))
+
+    def smembers(self, key):
+        return {member.encode() for member in self.data.get(key, set())}
+
+
+class FakePipeline:
+    """Buffers commands until execute, or runs them at once between watch and multi."""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+        self.watching = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.reset()
+
+    def watch(self, *keys):
+        self.watching = True
+
+    def multi(self):
+        self.watching = False
+
+    def reset(self):
+        self.commands = []
+        self.watching = False
+
+    def execute(self):
+        results = [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+        self.reset()
+        return results
+
+    def __getattr__(self, name):
+        command = getattr(self.client, name)
+
+        def call(*args, **kwargs):
+            if self.watching:
+                return command(*args, **kwargs)
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return call
+
+
+@pytest.fixture()
+def fake_redis(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(distributed.redis.Redis, "from_url", staticmethod(lambda url: client))
+    return client
+
+
+def test_split_batches():
+    urls = [f"https://example.com/{i}" for i in range(7)]
+    assert split_batches(urls, 3) == [urls[0:3], urls[3:6], urls[6:7]]
+    assert split_batches([], 3) == []
+    assert split_batches(urls[:2], 0) == [[urls[0]], [urls[1]]]
+
+
+def test_finalize_crawl_removes_sites_not_found(app, make_user, make_website, add_site):
+    from models import db
+    from models.website import Site
+
+    owner = make_user()
+    website = make_website(owner)
+    kept = add_site(website, page="/kept")
+    add_site(website, page="/gone")
+    # a page shared with another website only loses its association
+    other = make_website(owner, base="https://other.example.com")
+    shared = add_site(website, page="/shared")
+    shared.websites.append(other)
+    db.session.commit()
+
+    rescan = finalize_crawl(website, {kept.url, "https://elsewhere.org/kept"})
+
+    assert rescan == {other.url}
+    assert {s.url for s in website.sites} == {kept.url}
+    assert db.session.query(Site).filter_by(url="https://example.com/gone").first() is None
+    assert db.session.get(Site, shared.id).websites.all() == [other]
+    assert website.last_scanned is not None and website.current_task_id is None
+
+
+def test_crawl_finishes_when_every_spawned_batch_has(fake_redis):
+    frontier = SharedFrontier(1)
+    assert frontier.start("crawl", "https://example.com")
+    assert frontier.claim(["https://example.com", "https://example.com/a", "https://example.com/b"]) == [
+        "https://example.com/a", "https://example.com/b",
+    ]
+
+    # the root batch finds two pages, counted before it finishes
+    frontier.spawn(2)
+    assert frontier.finish("crawl", "root", 1, ["https://example.com"]) == 2
+    assert frontier.finish("crawl", "a", 1, ["https://example.com/a"]) == 1
+    assert frontier.finish("crawl", "b", 1, []) == 0
+
+    assert frontier.found() == {"https://example.com", "https://example.com/a"}
+    assert frontier.progress() == (3, 3)
+
+
+def test_crawl_is_not_restarted_while_active(fake_redis):
+    frontier = SharedFrontier(1)
+    assert frontier.start("first", "https://example.com")
+    frontier.spawn(1)
+
+    assert not frontier.start("second", "https://example.com")
+    assert frontier.crawl_id == "first"
+    assert frontier.finish("first", "root", 1, []) == 1
+
+    frontier.clear()
+    assert frontier.start("second", "https://example.com")
+    assert frontier.crawl_id == "second"
+
+
+def test_finish_ignores_other_crawls_and_repeated_batches(fake_redis):
+    frontier = SharedFrontier(1)
+    frontier.start("crawl", "https://example.com")
+    frontier.spawn(1)
+
+    assert frontier.finish("earlier", "stale", 1, ["https://example.com/stale"]) is None
+    assert frontier.finish("crawl", "root", 1, []) == 1
+    # redelivered after its worker was lost once it had finished
+    assert frontier.finish("crawl", "root", 1, []) is None
+    assert frontier.found() == set()
+    assert frontier.progress() == (1, 1)
+
+
+def test_page_batches_finalize_the_crawl_once(app, fake_redis, make_user, make_website, monkeypatch):
+    from scanner import tasks
+
+    website = make_website(make_user())
+    links = {
+        "https://example.com": ["https://example.com/a", "https://example.com/b"],
+        "https://example.com/a": ["https://example.com/b", "https://example.com/c"],
+        "https://example.com/b": [],
+        "https://example.com/c": ["https://example.com"],
+    }
+    queued, finalized, cleaned = [], [], []
+
+    def scan_pages(website_id, urls):
+        return [{"url": url} for url in urls], [link for url in urls for link in links[url]]
+
+    monkeypatch.setattr(tasks, "SCANNER_PAGE_BATCH_SIZE", 1)
+    monkeypatch.setattr(tasks, "run_async", lambda result: result)
+    monkeypatch.setattr(tasks, "async_generate_page_batch", scan_pages)
+    monkeypatch.setattr(tasks.scan_page_batch, "delay", lambda *args: queued.append(args))
+    monkeypatch.setattr(tasks.finalize_website_scan, "apply_async", lambda args, task_id: finalized.append((args, task_id)))
+    monkeypatch.setattr(tasks.celery.backend, "store_result", lambda *args: None)
+    monkeypatch.setattr(tasks, "finalize_crawl", lambda website, found: cleaned.append(found) or set())
+    monkeypatch.setattr(tasks.ScanFinishedEmail, "send", lambda self: None)
+
+    frontier = SharedFrontier(website.id)
+    frontier.start("crawl", website.url)
+    queued.append((website.id, [website.url], "crawl"))
+    # a batch of an earlier crawl of the website, still in the queue
+    queued.append((website.id, ["https://example.com/old"], "earlier"))
+
+    batch = 0
+    while queued:
+        args = queued.pop(0)
+        assert not finalized
+        batch += 1
+        tasks.scan_page_batch.apply(args=args, task_id=f"batch-{batch}", throw=True)
+        if batch == 2:
+            # the root batch, delivered again after its worker was lost
+            tasks.scan_page_batch.apply(args=(website.id, [website.url], "crawl"), task_id="batch-1", throw=True)
+
+    assert finalized == [([website.id], "crawl")]
+    tasks.finalize_website_scan.apply(args=[website.id], task_id="crawl", throw=True)
+
+    assert cleaned == [set(links)]
+    assert not frontier.active()
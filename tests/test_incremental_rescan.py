@@ -0,0 +1,59 @@
+"""Incremental rescans: unchanged pages keep their previous report."""
+import asyncio
+
+import scanner.scan as scan
+from scanner.scan import WebsiteProxy, carry_forward
+from scanner.utils.incremental import content_hash, rules_fingerprint
+
+
+def test_content_hash_ignores_scripts_nonces_and_whitespace():
+    page = '<html><body><h1>News</h1>\n  <p>Hello</p><script nonce="a1">var t = 1;</script></body></html>'
+    same = '<html><body><h1>News</h1> <p>Hello</p><script nonce="b2">var t = 2;</script><!-- built 10:02 --></body></html>'
+    changed = '<html><body><h1>News</h1><p>Goodbye</p></body></html>'
+    assert content_hash(page) == content_hash(same)
+    assert content_hash(page) != content_hash(changed)
+
+
+def _site_with_report(make_user, make_website, add_site, add_report, fingerprint):
+    from models import db
+
+    website = make_website(make_user())
+    website.incremental_rescan = True
+    site = add_site(website, page="/about")
+    report = add_report(site)
+    report.links = ["https://example.com/contact"]
+    site.set_validators({'etag': '"v1"', 'content_hash': None, 'rules_fingerprint': fingerprint})
+    db.session.commit()
+    return website, site
+
+
+def test_unchanged_page_is_carried_forward(app, make_user, make_website, add_site, add_report, monkeypatch):
+    fingerprint = rules_fingerprint(["wcag2a"], "")
+    website, site = _site_with_report(make_user, make_website, add_site, add_report, fingerprint)
+    sent = []
+
+    def fake_probe(url, previous):
+        sent.append(previous['etag'])
+        return {'status': 304, 'etag': '"v1"', 'last_modified': None, 'content_hash': None, 'unchanged': True}
+
+    monkeypatch.setattr(scan, "probe_page", fake_probe)
+    proxy = WebsiteProxy(website.id, website.url, incremental=True, rules_fingerprint=fingerprint)
+    res, _ = asyncio.run(carry_forward(site.url, proxy, app))
+
+    assert sent == ['"v1"']
+    assert res['carried_forward'] and res['links'] == ["https://example.com/contact"]
+
+
+def test_rule_change_forces_full_scan(app, make_user, make_website, add_site, add_report, monkeypatch):
+    website, site = _site_with_report(make_user, make_website, add_site, add_report, rules_fingerprint(["wcag2a"], ""))
+    monkeypatch.setattr(scan, "probe_page", lambda url, previous: {
+        'status': 304, 'etag': '"v1"', 'last_modified': None, 'content_hash': None, 'unchanged': True,
+    })
+
+    new_rules = rules_fingerprint(["wcag2a", "wcag2aa"], "")
+    proxy = WebsiteProxy(website.id, website.url, incremental=True, rules_fingerprint=new_rules)
+    res, validators = asyncio.run(carry_forward(site.url, proxy, app))
+
+    assert res is None
+    # stored with the new report once the full scan succeeds
+    assert validators['rules_fingerprint'] == new_rules and validators['etag'] == '"v1"'
@@ -0,0 +1,84 @@
+"""Sites point at their latest report, set as reports are stored."""
+from datetime import datetime, timedelta, timezone
+
+
+def test_latest_report_pointer_follows_stored_reports(app, make_user, make_site, add_report):
+    site = make_site(make_user("owner"))
+    assert site.get_recent_report() is None
+    assert site.get_full_current_report() is None
+
+    now = datetime.now(timezone.utc)
+    first = add_report(site, when=now - timedelta(days=1))
+    assert site.latest_report_id == first.id
+
+    latest = add_report(site, when=now, violations=[])
+    # stored later but scanned earlier, not the latest
+    add_report(site, when=now - timedelta(days=3))
+
+    assert site.latest_report_id == latest.id
+    recent = site.get_recent_report()
+    assert recent["id"] == latest.id
+    assert recent["report_counts"]["violations"]["total"] == 0
+    assert site.get_full_current_report().id == latest.id
+
+
+def test_repair_points_sites_at_their_latest_report(app, make_user, make_site, add_report):
+    from models import db
+    from models.website import Site
+
+    site = make_site(make_user("owner"))
+    now = datetime.now(timezone.utc)
+    add_report(site, when=now - timedelta(days=1))
+    latest = add_report(site, when=now)
+    site.latest_report_id = None
+    site.latest_report_at = None
+    site.latest_report_counts = None
+    db.session.commit()
+
+    assert Site.repair_latest_reports([site.id]) == 1
+    assert site.latest_report_id == latest.id
+    assert site.latest_report_counts == latest.report_counts
+    assert Site.repair_latest_reports([site.id]) == 0
+
+    # a site from before the pointer gets it back when its next report is stored
+    site.latest_report_id = None
+    db.session.commit()
+    newest = add_report(site, when=now + timedelta(days=1))
+    assert site.latest_report_id == newest.id
+
+
+def test_deleted_site_takes_its_reports(app, make_user, make_site, add_report):
+    from models import db
+    from models.report import Report
+
+    site = make_site(make_user("owner"))
+    add_report(site)
+    site.delete()
+    assert db.session.query(Report).count() == 0
+
+
+def test_record_report_reads_the_pointer_again(app, make_user, make_website, add_site, add_report):
+    from models import db
+    from models.website import Site, WebsiteReportCounts
+    from sqlalchemy import update
+
+    website = make_website(make_user("owner"))
+    site = add_site(website)
+    now = datetime.now(timezone.utc)
+    first = add_report(site, when=now - timedelta(days=2))
+    assert site.latest_report_id == first.id
+
+    # another worker stores a newer report of the page, this session still holds the old pointer
+    other = add_report(site, when=now - timedelta(days=1), violations=[])
+    db.session.execute(
+        update(Site).where(Site.id == site.id).values(
+            latest_report_id=other.id, latest_report_at=other.timestamp, latest_report_counts=other.report_counts,
+        ).execution_options(synchronize_session=False)
+    )
+    site.__dict__['latest_report_counts'] = first.report_counts
+
+    add_report(site, when=now)
+
+    # the newest report replaced the stored counts, not the stale ones
+    assert WebsiteReportCounts.get(website.id)["violations"]["total"] == 1
+    assert WebsiteReportCounts.refresh(website.id)["violations"]["total"] == 1
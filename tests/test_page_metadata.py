@@ -0,0 +1,56 @@
+"""Page metadata collected by one in-page script."""
+import asyncio
+import re
+
+from scanner.browser.parse import PAGE_METADATA_JS, SKIPPED_FILES_PATTERN, get_page_metadata
+
+
+class FakePage():
+    url = "https://example.com/news/index.html"
+
+    def __init__(self):
+        self.calls = []
+
+    async def evaluate(self, script, arg=None):
+        self.calls.append((script, arg))
+        return {'links': ["https://example.com/about"], 'videos': [], 'imgs': ["https://example.com/a.png"], 'has_video': False, 'has_img': True}
+
+
+def test_metadata_is_one_round_trip():
+    page = FakePage()
+    metadata = asyncio.run(get_page_metadata(page))
+
+    assert page.calls == [(PAGE_METADATA_JS, ["https://example.com", SKIPPED_FILES_PATTERN])]
+    assert metadata['links'] == ["https://example.com/about"] and metadata['has_img']
+
+
+def test_skipped_files_need_an_extension():
+    skipped = re.compile(SKIPPED_FILES_PATTERN)
+    assert skipped.search("https://example.com/files/report.pdf")
+    assert skipped.search("https://example.com/logo.svg")
+    # the dot is literal, pages that merely end in an extension's letters are crawled
+    assert not skipped.search("https://example.com/topics/ppt")
+    assert not skipped.search("https://example.com/apng")
+
+
+_NEWS_PAGE = """<!doctype html><html><body>
+<a href="/about">About</a>
+<a href="/about?ref=nav">About again</a>
+<a href="/contact#form">Contact form</a>
+<a href="https://other.org/page">Elsewhere</a>
+<a href="/">Home</a>
+<a href="/files/report.pdf">Report</a>
+<a href="/topics/ppt">Slides topic</a>
+<img src="/a.png" alt=""><img src="/a.png" alt="again"><img src="/b.jpg" alt="b">
+<video src="/intro.mp4"></video>
+</body></html>"""
+
+
+def test_metadata_script_extracts_links_and_media(render_pages):
+    metadata = render_pages({"https://example.com/news/index.html": _NEWS_PAGE}, get_page_metadata)
+
+    # same website only, without anchors, parameters, the home page or files
+    assert metadata['links'] == ["https://example.com/about", "https://example.com/topics/ppt"]
+    assert metadata['imgs'] == ["https://example.com/a.png", "https://example.com/b.jpg"]
+    assert metadata['videos'] == ["https://example.com/intro.mp4"]
+    assert metadata['has_img'] and metadata['has_video']
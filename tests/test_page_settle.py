@@ -0,0 +1,34 @@
+"""Adaptive page settle budgets learned from a website's settle timings."""
+from scanner.browser.wait import DOM_TIMEOUT, NETWORKIDLE_TIMEOUT, SettleTracker
+
+
+def test_fixed_timeouts_until_enough_samples():
+    tracker = SettleTracker(min_samples=5)
+    for _ in range(4):
+        tracker.record(800, 300)
+    assert tracker.network_budget() == NETWORKIDLE_TIMEOUT
+    assert tracker.dom_budget() == DOM_TIMEOUT
+
+
+def test_budget_follows_p95_and_grows_back_on_timeouts():
+    tracker = SettleTracker({'network': [1000] * 18 + [3000] * 2, 'dom': [200] * 20}, min_samples=5)
+    # 1.5 x p95 + 500ms, with a floor
+    assert tracker.network_budget() == 5000
+    assert tracker.dom_budget() == 1000
+
+    # pages hitting the budget record it, pushing the percentile up
+    for _ in range(20):
+        tracker.record(tracker.network_budget(), 200)
+    assert tracker.network_budget() == NETWORKIDLE_TIMEOUT
+    assert len(tracker.new_network) == 20
+
+
+def test_website_keeps_recent_samples(app, make_user, make_website):
+    from config import SCANNER_SETTLE_HISTORY
+
+    website = make_website(make_user())
+    website.record_settle_samples([1] * SCANNER_SETTLE_HISTORY, [1] * SCANNER_SETTLE_HISTORY)
+    website.record_settle_samples([2, 3], [4])
+    assert len(website.settle_stats['network']) == SCANNER_SETTLE_HISTORY
+    assert website.settle_stats['network'][-2:] == [2, 3]
+    assert website.settle_stats['dom'][-1] == 4
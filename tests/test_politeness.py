@@ -0,0 +1,47 @@
+"""Unit tests for the crawl politeness scheduler (local bucket fallback)."""
+import asyncio
+
+import scanner.utils.politeness as politeness
+from scanner.utils.politeness import PolitenessScheduler, TokenBucket
+
+
+def test_token_bucket_allows_burst_then_spaces_requests():
+    bucket = TokenBucket(rate=2.0, capacity=2)
+    assert bucket.reserve(now=bucket.updated) == 0
+    assert bucket.reserve(now=bucket.updated) == 0
+    # third request in the same instant has to wait half a second (rate 2/s)
+    assert bucket.reserve(now=bucket.updated) == 0.5
+    # and the one after queues behind it
+    assert bucket.reserve(now=bucket.updated) == 1.0
+
+
+def test_crawl_delay_limits_host_rate(monkeypatch):
+    monkeypatch.setattr(politeness, "_local_buckets", {})
+    monkeypatch.setattr(politeness, "fetch_crawl_delay", lambda origin: 30.0)
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(politeness.asyncio, "sleep", fake_sleep)
+
+    async def run():
+        async with PolitenessScheduler(redis_url=None, host_rate=10, host_burst=10) as scheduler:
+            await scheduler.wait("https://example.com/a")
+            await scheduler.wait("https://example.com/b")
+
+    asyncio.run(run())
+    assert len(sleeps) == 1 and 29 < sleeps[0] <= 30
+
+
+def test_falls_back_to_local_buckets_without_redis(monkeypatch):
+    monkeypatch.setattr(politeness, "_local_buckets", {})
+    monkeypatch.setattr(politeness, "fetch_crawl_delay", lambda origin: None)
+
+    async def run():
+        # nothing listens on port 1, the scheduler must degrade instead of failing the crawl
+        async with PolitenessScheduler(domain="example.com", redis_url="redis://127.0.0.1:1/0") as scheduler:
+            return await scheduler.wait("https://example.com/a")
+
+    assert asyncio.run(run()) == 0
+    assert any(key.startswith("domain:example.com") for key, _, _ in politeness._local_buckets)
@@ -0,0 +1,89 @@
+"""Report JSON is stored compressed, and rows from before are read and converted in place."""
+import json
+
+from sqlalchemy import LargeBinary, select, type_coerce, update
+
+
+def _stored(report_id, column):
+    from models import db
+    from models.report import Report
+
+    table = Report.__table__
+    return db.session.execute(
+        select(type_coerce(table.c[column], LargeBinary)).where(table.c.id == report_id)
+    ).scalar_one()
+
+
+def _store_plain(report_id, **values):
+    """Write columns as the uncompressed JSON text of reports saved before compression."""
+    from models import db
+    from models.report import Report
+
+    table = Report.__table__
+    db.session.execute(
+        update(table).where(table.c.id == report_id).values(
+            {name: type_coerce(json.dumps(value).encode(), LargeBinary) for name, value in values.items()}
+        )
+    )
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def test_compress_json_roundtrip():
+    from models.types import compress_json, decompress_json, is_compressed
+
+    value = {"violations": [{"id": "color-contrast", "nodes": [{"html": "<p>é</p>"}] * 50}]}
+    data = compress_json(value)
+    assert is_compressed(data)
+    assert len(data) < len(json.dumps(value))
+    assert decompress_json(data) == value
+    # level 0 writes plain JSON
+    assert decompress_json(compress_json(value, level=0)) == value
+    assert not is_compressed(compress_json(value, level=0))
+    assert decompress_json(json.dumps(value)) == value
+
+
+def test_report_columns_are_stored_compressed(app, make_user, make_site, add_report):
+    from models import db
+    from models.report import Report
+
+    site = make_site(make_user("owner"))
+    report = add_report(site)
+    report_id = report.id
+    db.session.expunge_all()
+
+    for column in ("report", "links", "imgs"):
+        assert _stored(report_id, column)[:1] == b"\x01"
+
+    loaded = db.session.get(Report, report_id)
+    assert loaded.report["violations"][0]["id"] == "color-contrast"
+    assert loaded.links == [] and loaded.imgs == []
+
+
+def test_uncompressed_reports_are_read_and_converted(app, make_user, make_site, add_report):
+    from models import db
+    from models.report import Report
+
+    site = make_site(make_user("owner"))
+    legacy = add_report(site, url=site.url + "?legacy")
+    current = add_report(site)
+    legacy_id, current_id = legacy.id, current.id
+    _store_plain(legacy_id, report={"violations": [{"id": "image-alt"}]}, links=["https://example.com/a"], imgs=[])
+    assert _stored(legacy_id, "report")[:1] == b"{"
+
+    loaded = db.session.get(Report, legacy_id)
+    assert loaded.report == {"violations": [{"id": "image-alt"}]}
+    assert loaded.links == ["https://example.com/a"]
+    db.session.expunge_all()
+
+    assert Report.compress_batch(0, batch_size=1) == (legacy_id, 1)
+    # already compressed, looked at but not rewritten
+    assert Report.compress_batch(legacy_id, batch_size=10) == (current_id, 0)
+    assert Report.compress_batch(current_id) == (None, 0)
+
+    for column in ("report", "links", "imgs"):
+        assert _stored(legacy_id, column)[:1] == b"\x01"
+    db.session.expunge_all()
+    loaded = db.session.get(Report, legacy_id)
+    assert loaded.report == {"violations": [{"id": "image-alt"}]}
+    assert loaded.links == ["https://example.com/a"]
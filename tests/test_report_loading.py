@@ -0,0 +1,135 @@
+"""Heavy report columns are only read by the endpoints that return them."""
+import re
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+_SELECT_LIST = re.compile(r"^SELECT (.*?)\sFROM ", re.S)
+
+
+@contextmanager
+def captured_sql():
+    from models import db
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+
+
+def _columns(statements):
+    """Report columns selected across the statements."""
+    columns = set()
+    for statement in statements:
+        select = _SELECT_LIST.match(statement)
+        if select:
+            columns.update(re.findall(r"\breport\.(\w+)", select.group(1)))
+    return columns
+
+
+def _get(client, url, headers):
+    with captured_sql() as statements:
+        res = client.get(url, headers=headers)
+    assert res.status_code == 200, res.get_json()
+    return statements
+
+
+def _website(make_user, make_website, add_site, add_report, pages=3):
+    from models import db
+
+    user = make_user()
+    website = make_website(user)
+    reports = [add_report(add_site(website, page=f"/p{i}")) for i in range(pages)]
+    for report in reports:
+        # a megabyte of legacy screenshot no listing should touch
+        report.photo = b"\0" * (1024 * 1024)
+    db.session.commit()
+    # read what the requests below need before the objects are detached
+    ids = [(report.id, report.site_id) for report in reports]
+    website.id, user.id
+    # start the requests from an empty identity map, like a fresh request session
+    db.session.expunge_all()
+    return user, website, ids
+
+
+def test_report_list_reads_no_content_or_photos(client, make_user, make_website, add_site, add_report, jwt_header):
+    user, _, _ = _website(make_user, make_website, add_site, add_report, pages=3)
+    few = _get(client, "/api/reports/", jwt_header(user))
+
+    assert 'links' in _columns(few)
+    assert not _columns(few) & {'report', 'tab_order', 'photo'}
+
+    # no per-row loads, the query count doesn't grow with the number of reports
+    _website(lambda: make_user("bob"), lambda owner: make_website(owner, base="https://example.org"), add_site, add_report, pages=6)
+    many = _get(client, "/api/reports/", jwt_header(user))
+    assert len(many) == len(few)
+
+
+def test_single_report_endpoints_read_what_they_return(client, make_user, make_website, add_site, add_report, jwt_header, make_api_key):
+    user, website, reports = _website(make_user, make_website, add_site, add_report, pages=2)
+    report_id, site_id = reports[0]
+    headers = jwt_header(user)
+    _, token = make_api_key(user)
+    key = {"X-API-Key": token}
+
+    for url, headers in (
+        (f"/api/reports/{report_id}/", headers),
+        (f"/api/v1/reports/{report_id}?format=markdown", key),
+        (f"/api/v1/sites/{site_id}/reports/latest", key),
+    ):
+        statements = _get(client, url, headers)
+        columns = _columns(statements)
+        assert 'report' in columns and 'photo' not in columns, url
+        # content and links come with the report, no lazy load afterwards
+        assert sum(1 for s in statements if 'report.report' in s) == 1, url
+
+    body = client.get(f"/api/reports/{report_id}/", headers=jwt_header(user)).get_json()
+    script = _get(client, f"/api/reports/script/{body['script_token']}/", {})
+    assert 'report' in _columns(script) and not _columns(script) & {'links', 'photo'}
+
+    latest = _get(client, f"/api/v1/websites/{website.id}/reports/latest", key)
+    assert 'photo' not in _columns(latest)
+    # the latest report of every page in one query, no lazy loads on top
+    assert sum(1 for s in latest if 'report.report' in s) == 1
+
+
+def test_pdf_and_url_lookup_read_what_they_return(client, make_user, make_website, add_site, add_report, jwt_header, make_api_key):
+    from models import db
+    from models.report import Report
+
+    user, _, reports = _website(make_user, make_website, add_site, add_report, pages=2)
+    report_id = reports[0][0]
+    url = db.session.get(Report, report_id).url
+    db.session.expunge_all()
+    _, token = make_api_key(user)
+    key = {"X-API-Key": token}
+
+    for path, headers, photo in (
+        (f"/api/reports/{report_id}/pdf/", jwt_header(user), True),
+        (f"/api/v1/reports/{report_id}?format=pdf", key, True),
+        (f"/api/v1/reports/latest?url={url}", key, False),
+        (f"/api/v1/reports/latest?url={url}&format=pdf", key, True),
+    ):
+        statements = _get(client, path, headers)
+        assert 'report' in _columns(statements), path
+        assert sum(1 for s in statements if 'report.report' in s) == 1, path
+        # the PDF embeds the screenshot, read once; the JSON never touches it
+        assert sum(1 for s in statements if 'photo' in _columns([s])) == int(photo), path
+
+
+def test_report_list_rows_keep_an_empty_tab_order(client, make_user, make_website, add_site, add_report, jwt_header):
+    user, _, _ = _website(make_user, make_website, add_site, add_report, pages=1)
+    rows = client.get("/api/reports/", headers=jwt_header(user)).get_json()["items"]
+    assert rows and all('tab_order' in row and row['tab_order'] is None for row in rows)
+
+
+def test_photo_endpoint_reads_only_the_photo(client, make_user, make_website, add_site, add_report, jwt_header):
+    user, _, reports = _website(make_user, make_website, add_site, add_report, pages=1)
+    columns = _columns(_get(client, f"/api/reports/{reports[0][0]}/photo/", jwt_header(user)))
+    assert 'photo' in columns and not columns & {'report', 'links'}
@@ -0,0 +1,110 @@
+"""Violated rules are written to report_violation with their report, and queried from there."""
+
+
+def _violation(rule_id, impact, targets=("main",)):
+    return {
+        "id": rule_id,
+        "impact": impact,
+        "description": f"Ensures {rule_id}",
+        "help": f"Fix {rule_id}",
+        "helpUrl": f"https://example.com/rules/{rule_id}",
+        "nodes": [{"target": [target], "html": "<div></div>"} for target in targets],
+    }
+
+
+def test_report_rows_are_written_with_the_report(app, make_user, make_site, add_report):
+    from models import db
+    from models.report_violation import ReportViolation
+
+    site = make_site(make_user("owner"))
+    report = add_report(site, violations=[
+        _violation("color-contrast", "serious", targets=("a", "b")),
+        _violation("image-alt", "critical"),
+    ])
+
+    rows = db.session.query(ReportViolation).order_by(ReportViolation.rule_id).all()
+    assert [(r.report_id, r.site_id, r.rule_id, r.impact, r.node_count) for r in rows] == [
+        (report.id, site.id, "color-contrast", "serious", 2),
+        (report.id, site.id, "image-alt", "critical", 1),
+    ]
+    # the same failing elements in another order are the same issue
+    again = add_report(site, violations=[_violation("color-contrast", "serious", targets=("b", "a"))])
+    assert again.violation_rows[0].fingerprint == rows[0].fingerprint
+    assert add_report(site, violations=[_violation("color-contrast", "serious", targets=("c",))]).violation_rows[0].fingerprint != rows[0].fingerprint
+
+    site.delete()
+    assert db.session.query(ReportViolation).count() == 0
+
+
+def test_report_list_filters_and_sorts_by_violations(client, make_user, make_website, add_site, add_report, jwt_header):
+    from datetime import datetime, timezone
+
+    user = make_user("owner")
+    website = make_website(user)
+    when = datetime(2026, 10, 18, tzinfo=timezone.utc)
+    one = add_report(add_site(website, page="/one"), when=when, violations=[_violation("image-alt", "critical")])
+    none = add_report(add_site(website, page="/none"), when=when, violations=[])
+    two = add_report(add_site(website, page="/two"), when=when, violations=[
+        _violation("image-alt", "serious"), _violation("label", "minor"),
+    ])
+    ids = one.id, none.id, two.id
+    headers = jwt_header(user)
+
+    def listed(query=""):
+        res = client.get(f"/api/reports/{query}", headers=headers)
+        assert res.status_code == 200
+        body = res.get_json()
+        assert body['count'] == len(body['items'])
+        return [item['id'] for item in body['items']]
+
+    one_id, none_id, two_id = ids
+    assert (one.violations_total, none.violations_total, two.violations_total) == (1, 0, 2)
+    # same timestamp, most violations first, from the stored count
+    assert listed() == [two_id, one_id, none_id]
+    assert listed("?rule=image-alt") == [two_id, one_id]
+    assert listed("?impact=critical") == [one_id]
+    assert listed("?rule=image-alt&impact=minor") == []
+
+
+def test_website_pages_filter_by_the_rules_of_their_latest_report(client, make_user, make_website, add_site, add_report, jwt_header):
+    from datetime import datetime, timedelta, timezone
+
+    user = make_user("owner")
+    website = make_website(user)
+    now = datetime.now(timezone.utc)
+    home, about = add_site(website, page="/"), add_site(website, page="/about")
+    add_report(home, when=now, violations=[_violation("image-alt", "critical"), _violation("label", "minor")])
+    # fixed since, the older report doesn't count
+    add_report(about, when=now - timedelta(days=1), violations=[_violation("image-alt", "critical")])
+    add_report(about, when=now, violations=[_violation("region", "moderate")])
+    headers = jwt_header(user)
+
+    def listed(query=""):
+        res = client.get(f"/api/websites/{website.id}/sites/{query}", headers=headers)
+        assert res.status_code == 200
+        return sorted(item['url'] for item in res.get_json()['items'])
+
+    assert listed() == [home.url, about.url]
+    assert listed("?rule=image-alt") == [home.url]
+    assert listed("?impact=moderate") == [about.url]
+    assert listed("?rule=label&impact=critical") == []
+
+
+def test_backfill_adds_rows_to_reports_without_them(app, make_user, make_site, add_report):
+    from models import db
+    from models.report_violation import ReportViolation
+
+    site = make_site(make_user("owner"))
+    old = add_report(site, violations=[_violation("label", "minor"), _violation("region", "moderate")])
+    new = add_report(site, violations=[_violation("image-alt", "critical")])
+    old_id, new_id = old.id, new.id
+    db.session.query(ReportViolation).filter_by(report_id=old_id).delete()
+    db.session.commit()
+    db.session.expunge_all()
+
+    assert ReportViolation.backfill_batch(0, batch_size=1) == (old_id, 2)
+    # already has its rows
+    assert ReportViolation.backfill_batch(old_id) == (new_id, 0)
+    assert ReportViolation.backfill_batch(new_id) == (None, 0)
+    rules = db.session.query(ReportViolation.rule_id).filter_by(report_id=old_id).order_by(ReportViolation.rule_id)
+    assert [rule for (rule,) in rules] == ["label", "region"]
@@ -0,0 +1,48 @@
+"""Batched report persistence through the crawl's single writer."""
+import asyncio
+
+from scanner.scan import WebsiteProxy
+from scanner.utils.writer import ReportWriter
+
+
+def _report(url):
+    return {
+        "url": url,
+        "base_url": "https://example.com",
+        "timestamp": "2026-01-01T00:00:00Z",
+        "report": {"violations": [], "incomplete": [], "inaccessible": [], "passes": []},
+        "links": [],
+        "videos": [],
+        "imgs": [],
+        "tabable": True,
+        "photo": None,
+        "tags": ["wcag2a"],
+    }
+
+
+def test_writer_batches_reports_and_resolves_sites(app, make_user, make_website, add_site):
+    from models import db
+    from models.report import Report
+    from models.website import Site
+
+    website = make_website(make_user())
+    existing = add_site(website, page="/about")
+    urls = [existing.url, "https://example.com/news", "https://example.com/contact", "https://other.org/page"]
+
+    async def crawl():
+        writer = ReportWriter(app, WebsiteProxy(website.id, website.url), batch_size=2, flush_interval=60)
+        async with writer:
+            for url in urls:
+                await writer.put(_report(url), {"etag": '"v1"'})
+        return writer
+
+    writer = asyncio.run(crawl())
+
+    # the off-domain report never reaches the queue
+    assert writer.written == 3 and writer.failed == 0 and writer.skipped == 1
+    assert writer.batches == 2
+    assert {s.url for s in website.sites} == set(urls[:3])
+    assert db.session.query(Site).filter_by(url=existing.url).count() == 1
+    assert db.session.query(Report).count() == 3
+    assert db.session.query(Site).filter_by(url="https://example.com/news").one().etag == '"v1"'
+    assert writer.stats()["max_queue_depth"] >= 1
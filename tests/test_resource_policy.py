@@ -0,0 +1,30 @@
+"""Request interception policies for page loads."""
+from scanner.browser.resources import ResourcePolicy, is_tracker
+
+
+def test_tracker_hosts_match_on_suffix():
+    assert is_tracker("https://www.google-analytics.com/g/collect?v=2")
+    assert is_tracker("https://static.hotjar.com/c/hotjar.js")
+    assert not is_tracker("https://cs.rutgers.edu/analytics.html")
+    assert not is_tracker("https://notdoubleclick.net/ad.js")
+
+
+def test_policies_keep_what_axe_needs():
+    balanced = ResourcePolicy('balanced')
+    assert balanced.decide('document', "https://cs.rutgers.edu/") == 'continue'
+    assert balanced.decide('stylesheet', "https://cs.rutgers.edu/site.css") == 'continue'
+    assert balanced.decide('image', "https://cs.rutgers.edu/logo.png") == 'continue'
+    assert balanced.decide('media', "https://cs.rutgers.edu/intro.mp4") == 'abort'
+    assert balanced.decide('eventsource', "https://cs.rutgers.edu/poll") == 'abort'
+    assert balanced.decide('script', "https://www.googletagmanager.com/gtm.js") == 'stub'
+
+    strict = ResourcePolicy('strict')
+    assert strict.decide('stylesheet', "https://cs.rutgers.edu/site.css") == 'continue'
+    assert strict.decide('font', "https://cs.rutgers.edu/font.woff2") == 'abort'
+    assert strict.decide('image', "https://cs.rutgers.edu/logo.png") == 'stub'
+
+    off = ResourcePolicy('off')
+    assert off.decide('media', "https://cs.rutgers.edu/intro.mp4") == 'continue'
+    assert off.decide('script', "https://www.googletagmanager.com/gtm.js") == 'continue'
+
+    assert ResourcePolicy('nonsense').name == 'off'
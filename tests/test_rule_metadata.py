@@ -0,0 +1,146 @@
+"""Reports store axe results without the rule metadata kept in the rule dictionary."""
+import pytest
+
+from sqlalchemy import LargeBinary, select, type_coerce
+
+AXE_VERSION = "4.9.1"
+
+
+@pytest.fixture(autouse=True)
+def empty_dictionary(app):
+    # the process cache outlives the per-test database
+    from models import rule_metadata
+
+    rule_metadata._dictionary.clear()
+    yield
+    rule_metadata._dictionary.clear()
+
+
+def _result(rule_id, impact="serious", help_text=None):
+    return {
+        "id": rule_id,
+        "impact": impact,
+        "description": f"Ensures {rule_id}",
+        "help": help_text or f"Fix {rule_id}",
+        "helpUrl": f"https://dequeuniversity.com/rules/axe/4.9/{rule_id}",
+        "tags": ["wcag2a"],
+        "nodes": [{"target": ["main"], "html": "<main></main>", "failureSummary": "Fix it"}],
+    }
+
+
+def _data(url, report):
+    return {
+        "url": url,
+        "base_url": "https://example.com",
+        "timestamp": "2026-10-18T12:00:00+00:00",
+        "report": report,
+        "links": [],
+        "videos": [],
+        "imgs": [],
+        "tabable": True,
+        "axe_version": AXE_VERSION,
+    }
+
+
+def _stored_report(report_id):
+    from models import db
+    from models.report import Report
+    from models.types import decompress_json
+
+    table = Report.__table__
+    return decompress_json(db.session.execute(
+        select(type_coerce(table.c.report, LargeBinary)).where(table.c.id == report_id)
+    ).scalar_one())
+
+
+def _save(site_id, url, report):
+    from models import db
+    from models.report import Report
+
+    saved = Report(_data(url, report), site_id)
+    db.session.add(saved)
+    db.session.commit()
+    report_id = saved.id
+    db.session.expunge_all()
+    return report_id
+
+
+def test_reports_store_rules_once(app, make_user, make_site):
+    from models import db
+    from models.report import Report
+    from models.rule_metadata import RuleMetadata
+
+    site = make_site(make_user("owner"))
+    site_id, url = site.id, site.url
+    first = {"violations": [_result("color-contrast")], "passes": [_result("image-alt", impact=None)]}
+    second = {"violations": [_result("color-contrast", impact="critical")], "passes": []}
+    first_id = _save(site_id, url, first)
+    second_id = _save(site_id, url + "?2", second)
+
+    rows = db.session.query(RuleMetadata).order_by(RuleMetadata.rule_id).all()
+    assert [(r.axe_version, r.rule_id) for r in rows] == [(AXE_VERSION, "color-contrast"), (AXE_VERSION, "image-alt")]
+    assert rows[0].help_url == "https://dequeuniversity.com/rules/axe/4.9/color-contrast"
+
+    stored = _stored_report(second_id)["violations"][0]
+    assert set(stored) == {"id", "impact", "nodes"}
+    assert stored["impact"] == "critical"
+
+    # read back as axe returned them
+    assert db.session.get(Report, first_id).report == first
+    assert db.session.get(Report, second_id).report == second
+
+
+def test_changed_rule_metadata_stays_in_the_report(app, make_user, make_site):
+    from models import db
+    from models.report import Report
+
+    site = make_site(make_user("owner"))
+    site_id, url = site.id, site.url
+    _save(site_id, url, {"violations": [_result("custom-rule")]})
+    edited = {"violations": [_result("custom-rule", help_text="Edited help")]}
+    report_id = _save(site_id, url + "?2", edited)
+
+    stored = _stored_report(report_id)["violations"][0]
+    assert stored["help"] == "Edited help"
+    assert "description" not in stored
+    assert db.session.get(Report, report_id).report == edited
+
+
+def test_rules_of_a_rolled_back_report_are_not_cached(app, make_user, make_site):
+    from models import db
+    from models.report import Report
+    from models.rule_metadata import RuleMetadata, rule_metadata
+
+    site = make_site(make_user("owner"))
+    site_id, url = site.id, site.url
+    db.session.add(Report(_data(url, {"violations": [_result("label")]}), site_id))
+    # a second report of the transaction reloads the dictionary, with the uncommitted rule
+    db.session.add(Report(_data(url + "?2", {"violations": [_result("label"), _result("region")]}), site_id))
+    db.session.rollback()
+
+    assert "label" not in rule_metadata(AXE_VERSION)
+    report_id = _save(site_id, url, {"violations": [_result("label")]})
+    assert db.session.query(RuleMetadata).filter_by(rule_id="label").count() == 1
+    assert db.session.get(Report, report_id).report["violations"][0]["help"] == "Fix label"
+
+
+def test_compress_batch_compacts_stored_reports(app, make_user, make_site):
+    from models import db
+    from models.report import Report
+    from models.types import compress_json
+
+    site = make_site(make_user("owner"))
+    site_id, url = site.id, site.url
+    full = {"violations": [_result("color-contrast")], "passes": []}
+    report_id = _save(site_id, url, {"violations": [], "passes": []})
+    # stored by an earlier version, with the metadata inline
+    table = Report.__table__
+    db.session.execute(table.update().where(table.c.id == report_id).values(
+        report=type_coerce(compress_json(full), LargeBinary)))
+    db.session.commit()
+
+    assert Report.compress_batch(0) == (report_id, 1)
+    assert set(_stored_report(report_id)["violations"][0]) == {"id", "impact", "nodes"}
+    assert Report.compress_batch(0) == (report_id, 0)
+    db.session.expunge_all()
+    assert db.session.get(Report, report_id).report == full
@@ -0,0 +1,61 @@
+"""Per-website scan profiles limiting the detail axe collects."""
+import pytest
+
+from models.report import Report
+from scanner.accessibility.ace import get_axe_js, get_axe_source
+from scanner.utils import incremental
+from scanner.utils.incremental import rules_fingerprint
+
+
+_FORM_PAGE = """<!doctype html>
+<html lang="en"><head><title>Contact</title></head>
+<body><main>
+<h1>Contact</h1>
+<img src="data:," alt="Logo"><img src="data:,">
+<form><label>Name <input name="name"></label><input name="email"></form>
+<p><a href="/a">About</a> <a href="/b">Help</a> <a href="/c">News</a></p>
+</main></body></html>"""
+
+
+def _scan_profiles(render_pages):
+    async def check(page):
+        errors = []
+        page.on("pageerror", lambda error: errors.append(str(error)))
+        await page.add_script_tag(content=get_axe_source())
+        if not await page.evaluate("() => !!window.axe && typeof window.axe.run === 'function'"):
+            pytest.skip(f"the bundled axe-core doesn't load in Chromium: {errors[:1]}")
+        return {profile: await page.evaluate(get_axe_js(['wcag2a'], profile)) for profile in ('full', 'issues', 'violations')}
+
+    return render_pages({"https://example.com/contact": _FORM_PAGE}, check)
+
+
+def test_profiles_limit_node_detail_but_not_the_counts(render_pages):
+    reports = _scan_profiles(render_pages)
+    counts = {profile: Report({"url": "https://example.com/contact", "timestamp": "2026-01-01T00:00:00Z", "report": report}, None).report_counts
+              for profile, report in reports.items()}
+
+    assert counts['full']['violations']['total'] > 0 and counts['full']['passes']['total'] > 0
+    assert counts['issues'] == counts['full'] and counts['violations'] == counts['full']
+
+    def nodes(report, key):
+        return [len(result['nodes']) for result in report[key]]
+
+    for profile in ('issues', 'violations'):
+        assert nodes(reports[profile], 'violations') == nodes(reports['full'], 'violations')
+    assert max(nodes(reports['full'], 'passes')) > 1
+    assert max(nodes(reports['issues'], 'passes')) == 1
+    assert set(nodes(reports['violations'], 'passes')) == {0}
+
+
+def test_profile_and_axe_version_are_part_of_the_rules_fingerprint(app, make_user, make_website, monkeypatch):
+    full = rules_fingerprint(["wcag2a"], "")
+    assert rules_fingerprint(["wcag2a"], "", "violations") != full
+
+    # upgrading the bundled axe-core changes the rule set pages are checked against
+    monkeypatch.setattr(incremental, "get_axe_version", lambda: "99.0.0")
+    assert rules_fingerprint(["wcag2a"], "") != full
+
+    website = make_website(make_user())
+    assert website.get_scan_profile() == 'full'
+    website.scan_profile = 'violations'
+    assert website.to_dict()['scan_profile'] == 'violations'
@@ -0,0 +1,68 @@
+"""Screenshot encoding and the content-addressed screenshot store."""
+import asyncio
+import io
+
+from PIL import Image
+
+from utils import screenshots
+from utils.screenshots import BlobStore, encode_screenshot, store_screenshot_async
+
+
+def _png(width=200, height=3000):
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(out, format="PNG")
+    return out.getvalue()
+
+
+def test_encoding_caps_height_and_shrinks():
+    png = _png()
+    webp, extension = encode_screenshot(png, fmt="webp", quality=60, max_height=1000)
+    assert extension == "webp" and len(webp) < len(png)
+    assert Image.open(io.BytesIO(webp)).size == (200, 1000)
+
+    jpeg, extension = encode_screenshot(png, fmt="jpeg", quality=60, max_height=0)
+    assert extension == "jpeg" and Image.open(io.BytesIO(jpeg)).size == (200, 3000)
+
+
+def test_pages_too_long_for_webp_fall_back_to_jpeg():
+    # SCREENSHOT_MAX_HEIGHT=0 leaves long pages uncapped
+    jpeg, extension = encode_screenshot(_png(100, 20000), fmt="webp", quality=60, max_height=0)
+    assert extension == "jpeg" and Image.open(io.BytesIO(jpeg)).size == (100, 20000)
+
+    webp, extension = encode_screenshot(_png(100, 16383), fmt="webp", quality=60, max_height=0)
+    assert extension == "webp" and Image.open(io.BytesIO(webp)).size == (100, 16383)
+
+    jpeg, extension = encode_screenshot(_png(10, 70000), fmt="jpeg", quality=60, max_height=0)
+    assert extension == "jpeg" and Image.open(io.BytesIO(jpeg)).size == (10, 65500)
+
+
+def test_identical_screenshots_are_stored_once(tmp_path):
+    store = BlobStore(str(tmp_path))
+    first = asyncio.run(store_screenshot_async(_png(), store))
+    second = asyncio.run(store_screenshot_async(_png(), store))
+
+    assert first == second and first.endswith(".webp")
+    assert len([p for p in tmp_path.rglob("*") if p.is_file()]) == 1
+    assert store.get(first) is not None and store.get("0" * 64 + ".webp") is None
+
+
+def test_photo_endpoint_serves_stored_and_legacy_photos(app, client, make_user, make_site, add_report, jwt_header, tmp_path, monkeypatch):
+    from models import db
+
+    monkeypatch.setattr(screenshots, "SCREENSHOT_STORE_PATH", str(tmp_path))
+    user = make_user()
+    site = make_site(user)
+    stored, legacy, missing = add_report(site), add_report(site), add_report(site)
+    data, extension = encode_screenshot(_png())
+    stored.photo_key = BlobStore().put(data, extension)
+    legacy.photo = _png(10, 10)
+    db.session.commit()
+
+    res = client.get(f"/api/reports/{stored.id}/photo/", headers=jwt_header(user))
+    assert res.status_code == 200 and res.mimetype == "image/webp" and res.data == data
+    assert "immutable" in res.headers["Cache-Control"]
+
+    res = client.get(f"/api/reports/{legacy.id}/photo/", headers=jwt_header(user))
+    assert res.status_code == 200 and res.mimetype == "image/png"
+
+    assert client.get(f"/api/reports/{missing.id}/photo/", headers=jwt_header(user)).status_code == 404
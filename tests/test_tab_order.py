@@ -0,0 +1,131 @@
+"""Tab order computed in one pass and validated with a few real Tab presses."""
+import asyncio
+
+from scanner.browser.tabbable import _CHECK_JS, _FOCUS_JS, _TAB_ORDER_JS, analyze_tab_order, sample_indices
+
+
+class FakeKeyboard():
+
+    def __init__(self, page):
+        self.page = page
+
+    async def press(self, key):
+        assert key == 'Tab'
+        self.page.presses += 1
+        if self.page.focused not in self.page.trapped:
+            self.page.focused += 1
+
+
+class FakePage():
+    """A page whose focus order is a list of elements, some of which swallow Tab."""
+
+    def __init__(self, count, trapped=()):
+        self.count = count
+        self.trapped = set(trapped)
+        self.focused = None
+        self.presses = 0
+        self.evaluations = 0
+        self.keyboard = FakeKeyboard(self)
+
+    async def evaluate(self, script, arg=None):
+        self.evaluations += 1
+        if script == _TAB_ORDER_JS:
+            return {'count': self.count, 'order': [f"a#link{i}" for i in range(min(self.count, arg))], 'positive_tabindex': 0}
+        if script == _FOCUS_JS:
+            self.focused = arg
+            return True
+        if script == _CHECK_JS:
+            if self.focused == arg:
+                return 'same'
+            return 'next' if self.focused == arg + 1 else 'other'
+        return None
+
+
+def test_sample_indices_spread_over_order():
+    assert sample_indices(0, 8) == []
+    assert sample_indices(1, 8) == []
+    assert sample_indices(4, 8) == [0, 1, 2]
+    indices = sample_indices(1000, 8)
+    assert len(indices) == 8 and indices[0] == 0 and indices[-1] < 999
+
+
+def test_analysis_finds_traps_with_few_round_trips():
+    page = FakePage(2000, trapped={249})
+    order = asyncio.run(analyze_tab_order(page, samples=8))
+
+    assert order['count'] == 2000 and len(order['order']) == 500
+    assert order['validated'] == 8 and page.presses == 8
+    assert order['traps'] == ['a#link249'] and not order['tabbable']
+    # order script, focus + check per sample and the final blur
+    assert page.evaluations == 1 + 8 * 2 + 1
+
+    clean = asyncio.run(analyze_tab_order(FakePage(3), samples=8))
+    assert clean['tabbable'] and clean['traps'] == [] and clean['mismatches'] == 0
+    assert not asyncio.run(analyze_tab_order(FakePage(0)))['tabbable']
+
+
+_ORDER_PAGE = """<!doctype html><html><body>
+<a id="first" href="/a">A</a>
+<button id="pos2" tabindex="2">P2</button>
+<button id="pos1" tabindex="1">P1</button>
+<div inert><a id="inert" href="/inert">inert</a></div>
+<div style="visibility: hidden"><a id="invisible" href="/invisible">invisible</a></div>
+<a id="undisplayed" href="/undisplayed" style="display: none">undisplayed</a>
+<details><summary id="closed">More</summary><a id="in-closed" href="/closed">closed</a></details>
+<details open><summary id="opened">Open</summary><a id="in-open" href="/open">open</a></details>
+<input type="hidden" id="hidden-input"><button id="disabled" disabled>disabled</button>
+<a id="no-href">no href</a><span id="negative" tabindex="-1">negative</span>
+<div id="host"><a id="slotted" href="/slotted">slotted</a></div>
+<iframe id="frame" src="https://example.com/frame.html"></iframe>
+<iframe id="empty" src="https://example.com/empty.html"></iframe>
+<a id="last" href="/z">Z</a>
+<script>
+document.getElementById('host').attachShadow({mode: 'open'}).innerHTML =
+    '<button id="shadowed">S</button><slot></slot><button id="shadow-pos" tabindex="1">SP</button>';
+</script>
+</body></html>"""
+
+_FRAME_PAGE = """<!doctype html><html><body>
+<a id="framed" href="/framed">framed</a><a id="frame-pos" href="/first" tabindex="1">first in frame</a>
+</body></html>"""
+
+_EMPTY_PAGE = """<!doctype html><html><body><p>Nothing to focus</p></body></html>"""
+
+_TRAP_PAGE = """<!doctype html><html><body>
+<a id="one" href="/1">1</a>
+<button id="first" tabindex="1">first</button>
+<a id="trap" href="/2">2</a>
+<a id="last" href="/3">3</a>
+<script>
+document.getElementById('trap').addEventListener('keydown', (e) => { if (e.key === 'Tab') e.preventDefault(); });
+</script>
+</body></html>"""
+
+
+def test_order_script_follows_the_browser_rules(render_pages):
+    async def order(page):
+        return await page.evaluate(_TAB_ORDER_JS, 500), await analyze_tab_order(page, samples=50)
+
+    result, pressed = render_pages({
+        "https://example.com/": _ORDER_PAGE,
+        "https://example.com/frame.html": _FRAME_PAGE,
+        "https://example.com/empty.html": _EMPTY_PAGE,
+    }, order)
+
+    # positive tabindex first within each document, shadow root and slot, then document order.
+    # The frame with links isn't a stop itself, the empty one is
+    assert result['order'] == [
+        'button#pos1', 'button#pos2', 'a#first', 'summary#closed', 'summary#opened', 'a#in-open',
+        'button#shadow-pos', 'button#shadowed', 'a#slotted', 'a#frame-pos', 'a#framed', 'iframe#empty', 'a#last',
+    ]
+    assert result['count'] == 13 and result['positive_tabindex'] == 4
+    # a real Tab press from every element but the last lands where predicted
+    assert pressed['validated'] == 12 and pressed['mismatches'] == 0 and pressed['tabbable']
+
+
+def test_real_tab_presses_confirm_the_order_and_find_traps(render_pages):
+    order = render_pages({"https://example.com/": _TRAP_PAGE}, lambda page: analyze_tab_order(page, samples=8))
+
+    assert order['order'] == ['button#first', 'a#one', 'a#trap', 'a#last']
+    assert order['validated'] == 3 and order['mismatches'] == 0
+    assert order['traps'] == ['a#trap'] and not order['tabbable']
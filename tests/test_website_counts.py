@@ -0,0 +1,169 @@
+"""Website report counts are kept in website_report_counts as reports are stored."""
+from datetime import datetime, timedelta, timezone
+
+
+def _violation(rule_id, impact):
+    return {"id": rule_id, "impact": impact, "nodes": [{"target": ["main"], "html": "<main></main>"}]}
+
+
+def _violations(counts):
+    return counts["violations"]
+
+
+def _recomputed(website_id):
+    from models.website import WebsiteReportCounts
+
+    return WebsiteReportCounts.refresh(website_id)
+
+
+def test_counts_follow_the_latest_report_of_each_page(app, make_user, make_website, add_site, add_report):
+    from models.website import WebsiteReportCounts
+
+    website = make_website(make_user("owner"))
+    home, about = add_site(website, page="/"), add_site(website, page="/about")
+    now = datetime.now(timezone.utc)
+
+    add_report(home, when=now - timedelta(days=2), violations=[_violation("image-alt", "critical")])
+    add_report(about, when=now - timedelta(days=2), violations=[_violation("label", "minor"), _violation("region", "minor")])
+    assert _violations(website.get_report_counts()) == {"total": 3, "critical": 1, "serious": 0, "moderate": 0, "minor": 2}
+
+    # a rescan replaces the page's counts
+    add_report(home, when=now, violations=[_violation("color-contrast", "serious")])
+    # a report older than the latest one doesn't count
+    add_report(about, when=now - timedelta(days=5), violations=[])
+    counts = website.get_report_counts()
+    assert _violations(counts) == {"total": 3, "critical": 0, "serious": 1, "moderate": 0, "minor": 2}
+    assert counts == _recomputed(website.id)
+
+    # the listing sorts from the same row
+    assert WebsiteReportCounts.get(website.id) == counts
+
+
+def test_counts_of_a_website_without_a_row_are_computed_on_read(app, make_user, make_website, add_site, add_report):
+    from models import db
+    from models.website import WebsiteReportCounts
+
+    website = make_website(make_user("owner"))
+    add_report(add_site(website), violations=[_violation("image-alt", "critical")])
+    db.session.query(WebsiteReportCounts).delete()
+    db.session.commit()
+
+    assert _violations(website.get_report_counts())["critical"] == 1
+    # reads don't write, the refresh task stores the row
+    assert not db.session.new and not db.session.dirty
+    db.session.rollback()
+    assert db.session.get(WebsiteReportCounts, website.id) is None
+
+    assert _violations(_recomputed(website.id))["critical"] == 1
+    db.session.commit()
+    assert db.session.get(WebsiteReportCounts, website.id) is not None
+
+
+def test_removed_pages_leave_the_counts(app, make_user, make_website, add_site, add_report):
+    from models import db
+    from models.website import WebsiteReportCounts
+    from scanner.scan import finalize_crawl
+
+    website = make_website(make_user("owner"))
+    kept, gone = add_site(website, page="/kept"), add_site(website, page="/gone")
+    add_report(kept, violations=[_violation("image-alt", "critical")])
+    add_report(gone, violations=[_violation("label", "minor")])
+    assert _violations(website.get_report_counts())["total"] == 2
+
+    finalize_crawl(website, [kept.url])
+    assert _violations(website.get_report_counts()) == {"total": 1, "critical": 1, "serious": 0, "moderate": 0, "minor": 0}
+
+    website_id = website.id
+    website.delete()
+    assert db.session.get(WebsiteReportCounts, website_id) is None
+
+
+def test_website_list_sorts_by_violations(client, make_user, make_website, add_site, add_report, jwt_header):
+    user = make_user("owner")
+    few = make_website(user, base="https://few.example.com")
+    many = make_website(user, base="https://many.example.com")
+    add_report(add_site(few), violations=[_violation("image-alt", "critical")])
+    add_report(add_site(many), violations=[_violation("image-alt", "critical"), _violation("label", "minor")])
+    ids = many.id, few.id
+
+    res = client.get("/api/websites/?orderBy=violations", headers=jwt_header(user))
+    assert res.status_code == 200
+    body = res.get_json()
+    assert [item["id"] for item in body["items"]] == list(ids)
+    assert body["items"][0]["report_counts"]["violations"]["total"] == 2
+
+
+def test_website_list_loads_the_counts_with_the_page(client, make_user, make_website, add_site, add_report, jwt_header):
+    from sqlalchemy import event
+
+    from models import db
+
+    user = make_user("owner")
+    for i in range(3):
+        add_report(add_site(make_website(user, base=f"https://w{i}.example.com")), violations=[_violation("image-alt", "critical")] * (i + 1))
+    headers = jwt_header(user)
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        res = client.get("/api/websites/?orderBy=url", headers=headers)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+
+    assert res.status_code == 200
+    assert [item["report_counts"]["violations"]["total"] for item in res.get_json()["items"]] == [1, 2, 3]
+    # joined into the list query, not one query per website
+    assert not [s for s in statements if "\nFROM website_report_counts" in s]
+    assert [s for s in statements if "LEFT OUTER JOIN website_report_counts" in s]
+
+
+def test_a_batch_locks_its_pages_then_updates_each_website_once(app, make_user, make_website, add_site, add_report):
+    from sqlalchemy import event
+
+    from models import db
+    from models.report import Report
+    from models.website import Site
+
+    owner = make_user("owner")
+    first, second = make_website(owner), make_website(owner, base="https://cs.example.com")
+    shared, other = add_site(first, page="/shared"), add_site(second, page="/other")
+    shared.websites.append(second)
+    db.session.commit()
+    add_report(shared, violations=[_violation("label", "minor")])
+
+    def report(site, violations):
+        return Report({
+            "url": site.url, "base_url": site.url, "timestamp": datetime.now(timezone.utc).isoformat(),
+            "report": {"violations": violations, "incomplete": [], "inaccessible": [], "passes": []},
+            "links": [], "videos": [], "imgs": [], "tabable": True, "photo": None, "tags": ["wcag2a"],
+        }, site.id)
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        # the other page first, the site rows are still locked in id order
+        Site.record_reports([
+            (other, report(other, [_violation("image-alt", "critical")])),
+            (shared, report(shared, [_violation("region", "moderate"), _violation("list", "minor")])),
+        ])
+        db.session.flush()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+    db.session.commit()
+
+    locked = next(i for i, (s, _) in enumerate(statements) if "FROM site" in s and "ORDER BY site.id" in s)
+    counts_updates = [(i, parameters) for i, (s, parameters) in enumerate(statements) if s.startswith("UPDATE website_report_counts")]
+    # one relative update per website in id order, after the pages were locked
+    assert [parameters[-1] for _, parameters in counts_updates] == [first.id, second.id]
+    assert counts_updates[0][0] > locked
+    assert _violations(first.get_report_counts()) == {"total": 2, "critical": 0, "serious": 0, "moderate": 1, "minor": 1}
+    assert _violations(second.get_report_counts()) == {"total": 3, "critical": 1, "serious": 0, "moderate": 1, "minor": 1}
+    assert first.get_report_counts() == _recomputed(first.id) and second.get_report_counts() == _recomputed(second.id)
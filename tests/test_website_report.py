@@ -0,0 +1,116 @@
+"""A website report merges the latest report of each page by rule."""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event
+
+
+def _violation(rule, impact, target):
+    return {
+        "id": rule,
+        "impact": impact,
+        "description": f"{rule} description",
+        "help": f"{rule} help",
+        "helpUrl": f"https://example.com/rules/{rule}",
+        "nodes": [{"target": [target], "html": f"<div class='{target}'></div>", "failureSummary": "Fix it"}],
+    }
+
+
+def test_rules_are_merged_across_pages(app, make_user, make_website, add_site, add_report):
+    website = make_website(make_user("owner"))
+    home = add_site(website, page="/")
+    about = add_site(website, page="/about")
+    now = datetime.now(timezone.utc)
+    # superseded by the next report of the page, not part of the website report
+    add_report(home, when=now - timedelta(days=1), violations=[_violation("region", "moderate", "main")])
+    home_report = add_report(home, when=now, violations=[_violation("image-alt", "critical", "img")])
+    about_report = add_report(about, when=now, violations=[
+        _violation("image-alt", "critical", "img.logo"),
+        _violation("label", "critical", "input"),
+    ])
+
+    violations = website.get_report()["violations"]
+
+    assert [rule["id"] for rule in violations] == ["image-alt", "label"]
+    image_alt = violations[0]
+    assert image_alt["help"] == "image-alt help"
+    assert sorted(page["report_id"] for page in image_alt["reports"]) == sorted([home_report.id, about_report.id])
+    assert {page["url"] for page in image_alt["reports"]} == {home.url, about.url}
+    assert [(page["url"], page["report_id"]) for page in violations[1]["reports"]] == [(about.url, about_report.id)]
+
+
+def test_rules_are_ordered_by_impact(app, make_user, make_website, add_site, add_report):
+    website = make_website(make_user("owner"))
+    add_report(add_site(website), violations=[
+        _violation("region", "moderate", "main"),
+        _violation("heading-order", None, "h3"),
+        _violation("list", "minor", "ul"),
+        _violation("label", "critical", "input"),
+        _violation("color-contrast", "serious", "p"),
+        _violation("button-name", "critical", "button"),
+    ])
+
+    violations = website.get_report()["violations"]
+
+    assert [rule["id"] for rule in violations] == [
+        "button-name", "label", "color-contrast", "region", "list", "heading-order",
+    ]
+
+
+def test_reports_are_read_in_one_query(app, make_user, make_website, add_site, add_report):
+    from models import db
+
+    website = make_website(make_user("owner"))
+    for i in range(5):
+        add_report(add_site(website, page=f"/p{i}"))
+    db.session.expire_all()
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        report = website.get_report()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+
+    assert len(report["violations"][0]["reports"]) == 5
+    assert len([s for s in statements if "report.report" in s]) == 1
+
+
+def test_rule_dictionary_is_loaded_before_the_reports_are_streamed(app, make_user, make_website, add_site):
+    from models import db, rule_metadata
+    from models.report import Report
+
+    website = make_website(make_user("owner"))
+    for i in range(3):
+        site = add_site(website, page=f"/p{i}")
+        site.record_report(Report({
+            "url": site.url,
+            "base_url": "https://example.com",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "axe_version": "4.9.0",
+            "report": {"violations": [_violation("image-alt", "critical", f"img.p{i}")], "passes": [], "incomplete": [], "inapplicable": []},
+            "links": [], "videos": [], "imgs": [], "tabable": True, "photo": None, "tags": ["wcag2a"],
+        }, site.id))
+    db.session.commit()
+    rule_metadata._dictionary.clear()
+    db.session.expire_all()
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        violations = website.get_report()["violations"]
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+
+    # nothing else runs on the connection while the reports are streamed
+    streamed = next(i for i, statement in enumerate(statements) if "report.report" in statement)
+    assert statements[streamed + 1:] == []
+    assert any("FROM rule_metadata" in statement for statement in statements[:streamed])
+    assert violations[0]["help"] == "image-alt help" and len(violations[0]["reports"]) == 3
@@ -14,6 +14,7 @@ import io
 from datetime import datetime
 
 from scanner.accessibility.ace import AxeNode, AxeResult
+from utils.screenshots import load_photo
 from reportlab.graphics import renderPDF
 from reportlab.graphics import renderPM
 from svglib.svglib import svg2rlg
@@ -261,10 +262,11 @@ def generate_pdf(report:Report) -> bytes:
     # Add Images if available
     
     
-    if report.photo:
+    photo = load_photo(report)
+    if photo:
         # put on new page
 
-        img_stream = io.BytesIO(report.photo)
+        img_stream = io.BytesIO(photo[0])
         try:
             pil_image = PILImage.open(img_stream)
             orig_width, orig_height = pil_image.size
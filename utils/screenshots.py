@@ -0,0 +1,117 @@
+"""
+Report screenshots, encoded once and stored by content.
+
+Full-page PNGs used to be stored in the report row, megabytes per page on
+every scan. Screenshots are now:
+
+- capped at SCREENSHOT_MAX_HEIGHT pixels of page height
+- encoded as WebP or JPEG (SCREENSHOT_FORMAT) at SCREENSHOT_QUALITY, on a
+  small thread pool so Pillow doesn't stall the scanner's event loop. Pages
+  taller than WebP's 16383 pixels fall back to JPEG
+- written to a content-addressed store under SCREENSHOT_STORE_PATH, named by
+  the SHA-256 of the encoded image, so a page that looks the same on every
+  scan is stored once. Reports keep the key in ``photo_key``.
+
+Reports from before keep their PNG in ``photo``, ``load_photo`` reads both.
+"""
+import asyncio
+import hashlib
+import io
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple
+
+from PIL import Image
+
+from config import SCREENSHOT_FORMAT, SCREENSHOT_MAX_HEIGHT, SCREENSHOT_QUALITY, SCREENSHOT_STORE_PATH, SCREENSHOT_WORKERS
+
+MIMETYPES = {'webp': 'image/webp', 'jpeg': 'image/jpeg', 'png': 'image/png'}
+# largest side, in pixels, each format can encode
+WEBP_MAX_SIZE = 16383
+JPEG_MAX_SIZE = 65500
+
+_encoder = ThreadPoolExecutor(max_workers=SCREENSHOT_WORKERS, thread_name_prefix="screenshot")
+
+
+class BlobStore():
+    """Files named by the SHA-256 of their content, fanned out over two directory levels."""
+
+    def __init__(self, root: str | None = None):
+        self.root = root or SCREENSHOT_STORE_PATH
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def put(self, data: bytes, extension: str) -> str:
+        key = f"{hashlib.sha256(data).hexdigest()}.{extension}"
+        path = self.path(key)
+        if os.path.exists(path):
+            return key
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write next to the target and rename, readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return key
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            with open(self.path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+
+def encode_screenshot(png: bytes, fmt: str = SCREENSHOT_FORMAT, quality: int = SCREENSHOT_QUALITY, max_height: int = SCREENSHOT_MAX_HEIGHT) -> Tuple[bytes, str]:
+    """Re-encode a PNG screenshot, cropped to max_height. Returns the image and its extension.
+
+    Pages too long for WebP are encoded as JPEG instead, cropped to what JPEG can hold.
+    """
+    fmt = fmt.lower() if fmt.lower() in MIMETYPES else 'webp'
+    image = Image.open(io.BytesIO(png))
+    if max_height and image.height > max_height:
+        image = image.crop((0, 0, image.width, max_height))
+    if fmt == 'webp' and max(image.size) > WEBP_MAX_SIZE:
+        fmt = 'jpeg'
+    if fmt == 'jpeg' and max(image.size) > JPEG_MAX_SIZE:
+        image = image.crop((0, 0, min(image.width, JPEG_MAX_SIZE), min(image.height, JPEG_MAX_SIZE)))
+    if fmt != 'png' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+
+    out = io.BytesIO()
+    if fmt == 'webp':
+        image.save(out, format='WEBP', quality=quality, method=4)
+    elif fmt == 'jpeg':
+        image.save(out, format='JPEG', quality=quality, optimize=True, progressive=True)
+    else:
+        image.save(out, format='PNG', optimize=True)
+    return out.getvalue(), fmt
+
+
+def store_screenshot(png: bytes, store: BlobStore | None = None) -> str:
+    data, extension = encode_screenshot(png)
+    return (store or BlobStore()).put(data, extension)
+
+
+async def store_screenshot_async(png: bytes, store: BlobStore | None = None) -> str:
+    """Encode and store a screenshot on the encoder pool, returns its key."""
+    return await asyncio.get_running_loop().run_in_executor(_encoder, store_screenshot, png, store)
+
+
+def load_photo(report) -> Tuple[bytes, str] | None:
+    """The screenshot of a report and its mimetype, from the store or the legacy ``photo`` column."""
+    if report.photo_key:
+        data = BlobStore().get(report.photo_key)
+        if data is None:
+            return None
+        return data, MIMETYPES.get(report.photo_key.rsplit('.', 1)[-1], 'application/octet-stream')
+    if report.photo:
+        return report.photo, 'image/png'
+    return None